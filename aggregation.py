@@ -0,0 +1,219 @@
+import threading
+import time
+
+from kline_cache import INTERVAL_MS, MAX_KLINES_LIMIT, coerce_kline_row
+
+# 1970-01-01 foi uma quinta-feira; os candles semanais da Binance começam na segunda
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def bucket_start(open_time, interval):
+    """open_time (UTC, ms) do candle de `interval` que contém o instante `open_time`"""
+    offset = WEEK_OFFSET_MS if interval == '1w' else 0
+    return open_time - (open_time - offset) % INTERVAL_MS[interval]
+
+
+def merge_rows(prefix, row, open_time, close_time):
+    """
+    Acrescenta um candle base a um candle agregado (formato /klines numérico)
+
+    Abertura do primeiro candle, fechamento do último, máxima e mínima do
+    período; volumes, número de negociações e volumes taker são somados.
+    """
+    if prefix is None:
+        merged = list(row)
+        merged[0], merged[6] = open_time, close_time
+        return merged
+    return [
+        open_time, prefix[1], max(prefix[2], row[2]), min(prefix[3], row[3]), row[4],
+        prefix[5] + row[5], close_time, prefix[7] + row[7], prefix[8] + row[8],
+        prefix[9] + row[9], prefix[10] + row[10], '0'
+    ]
+
+
+class _BucketState:
+    def __init__(self, open_time, row):
+        """Candle agregado em formação: candles base já fechados + o último recebido"""
+        self.open_time = open_time
+        self.prefix = None
+        self.latest = row
+        # A série base começou no meio do período: o candle agregado ficaria incompleto
+        self.partial = row[0] != open_time
+
+
+class CandleAggregator:
+    def __init__(self, cache, base_interval='1m', intervals=()):
+        """
+        Deriva candles de intervalos maiores a partir de um único intervalo base
+
+        Só o intervalo base é buscado na API (ou recebido pelo stream/coletor);
+        1h, 4h, 1d etc. são montados localmente e de forma incremental, com
+        períodos alinhados em UTC como os da Binance. Os candles derivados são
+        gravados no mesmo KlineCache, em (símbolo, intervalo), então quem já lê
+        o cache pode pedir qualquer intervalo registrado.
+
+        O histórico fechado anterior ao início da série base é buscado uma
+        única vez por intervalo derivado (seed); depois, cada novo intervalo
+        custa apenas CPU.
+
+        Args:
+            cache: KlineCache onde ficam os candles base e os derivados
+            base_interval: Intervalo mais fino, o único buscado na API
+            intervals: Intervalos derivados iniciais (múltiplos do intervalo base)
+        """
+        self.cache = cache
+        self.base_interval = base_interval
+        self.base_ms = INTERVAL_MS[base_interval]
+        self.intervals = []
+        self._states = {}  # (símbolo, intervalo) -> _BucketState
+        self._symbols = set()
+        self._seeded = set()
+        self._lock = threading.RLock()
+        for interval in intervals:
+            self.add_interval(interval)
+
+    def add_interval(self, interval):
+        """Registra um intervalo derivado e o monta a partir dos candles base em cache"""
+        if interval == self.base_interval or interval in self.intervals:
+            return
+        interval_ms = INTERVAL_MS.get(interval)
+        if interval_ms is None or interval_ms % self.base_ms:
+            raise ValueError(f"O intervalo {interval} não é múltiplo de {self.base_interval}")
+
+        with self._lock:
+            self.intervals.append(interval)
+            for symbol in self._symbols:
+                self._rebuild(symbol, interval)
+
+    def history(self, interval):
+        """Candles base necessários para cobrir o candle de `interval` em formação"""
+        return INTERVAL_MS[interval] // self.base_ms
+
+    def ingest(self, symbol, rows):
+        """Insere candles base (formato /klines) e atualiza os intervalos derivados"""
+        if not rows:
+            return
+        rows = sorted((coerce_kline_row(row) for row in rows), key=lambda row: row[0])
+
+        with self._lock:
+            self.cache.update(symbol, self.base_interval, rows)
+            self._symbols.add(symbol)
+            for interval in self.intervals:
+                derived = {}
+                for row in rows:
+                    merged = self._apply(symbol, interval, row)
+                    if merged is not None:
+                        derived[merged[0]] = merged
+                if derived:
+                    self.cache.update(symbol, interval, list(derived.values()))
+
+    def _apply(self, symbol, interval, row):
+        """Aplica um candle base ao período correspondente e retorna o candle agregado"""
+        open_time = bucket_start(row[0], interval)
+        state = self._states.get((symbol, interval))
+
+        if state is None or open_time > state.open_time:
+            state = self._states[(symbol, interval)] = _BucketState(open_time, row)
+        elif row[0] > state.latest[0]:
+            # Novo candle base no mesmo período: o anterior já fechou
+            state.prefix = merge_rows(state.prefix, state.latest, open_time, state.latest[6])
+            state.latest = row
+        elif row[0] == state.latest[0]:
+            # Candle base ainda aberto, atualizado no lugar
+            state.latest = row
+        else:
+            # Correção de um candle base mais antigo: remontar o período a partir do cache
+            return self._rebuild_bucket(symbol, interval, open_time)
+
+        if state.partial:
+            return None
+        return merge_rows(state.prefix, state.latest, open_time,
+                          open_time + INTERVAL_MS[interval] - 1)
+
+    def _members(self, symbol, interval, open_time):
+        end = open_time + INTERVAL_MS[interval]
+        return [row for row in self.cache.rows(symbol, self.base_interval) if open_time <= row[0] < end]
+
+    def _rebuild_bucket(self, symbol, interval, open_time):
+        members = self._members(symbol, interval, open_time)
+        if not members or members[0][0] != open_time:
+            return None
+
+        close_time = open_time + INTERVAL_MS[interval] - 1
+        state = self._states.get((symbol, interval))
+        if state is not None and state.open_time == open_time:
+            prefix = None
+            for row in members[:-1]:
+                prefix = merge_rows(prefix, row, open_time, row[6])
+            state.prefix, state.latest, state.partial = prefix, members[-1], False
+
+        merged = None
+        for row in members:
+            merged = merge_rows(merged, row, open_time, close_time)
+        return merged
+
+    def _rebuild(self, symbol, interval):
+        """Monta um intervalo derivado inteiro a partir dos candles base em cache"""
+        self._states.pop((symbol, interval), None)
+        derived = {}
+        for row in self.cache.rows(symbol, self.base_interval):
+            merged = self._apply(symbol, interval, row)
+            if merged is not None:
+                derived[merged[0]] = merged
+        if derived:
+            self.cache.update(symbol, interval, list(derived.values()))
+
+    def seed(self, symbol, interval, rows, now_ms=None):
+        """
+        Completa um intervalo derivado com candles fechados buscados na API
+
+        Só entram os candles de períodos que ainda não foram montados a partir
+        da série base; candles fechados não mudam, então o resultado é exato.
+        """
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        with self._lock:
+            existing = {row[0] for row in self.cache.rows(symbol, interval)}
+            closed = [row for row in rows if int(row[6]) < now_ms and int(row[0]) not in existing]
+            self.cache.update(symbol, interval, closed)
+            self._seeded.add((symbol, interval))
+
+    def fetch(self, client, symbol, limit, history=0):
+        """
+        Busca os candles base novos de um símbolo e, na primeira vez, o
+        histórico dos intervalos derivados
+
+        O total de candles base pedidos cobre o período em formação do maior
+        intervalo derivado; acima de uma página do /klines, a primeira busca
+        é paginada. Erros de rede são propagados (RequestException).
+
+        Args:
+            client: BinanceClient usado nas requisições
+            symbol: Símbolo buscado
+            limit: Candles desejados em cada intervalo
+            history: Mínimo de candles base na primeira busca (ex: para cobrir
+                intervalos que ainda podem ser registrados depois)
+        """
+        history = max([limit, history] + [self.history(interval) for interval in self.intervals])
+        loaded = symbol in self._symbols
+        self.cache.fetch(client, symbol, self.base_interval, history,
+                         update=lambda rows: self.ingest(symbol, rows))
+        if not loaded:
+            # Histórico carregado do disco (CandleStore) entra no cache sem passar por ingest()
+            with self._lock:
+                self._symbols.add(symbol)
+                for interval in self.intervals:
+                    self._rebuild(symbol, interval)
+
+        for interval in list(self.intervals):
+            if (symbol, interval) not in self._seeded:
+                params = {'symbol': symbol, 'interval': interval, 'limit': min(limit, MAX_KLINES_LIMIT)}
+                self.seed(symbol, interval, client.get('/klines', params=params))
+
+    def rows(self, symbol, interval, limit=None):
+        """Candles de qualquer intervalo (o base ou um derivado, registrado se preciso)"""
+        self.add_interval(interval)
+        return self.cache.rows(symbol, interval, limit)
+
+    def to_dataframe(self, symbol, interval, limit=None):
+        self.add_interval(interval)
+        return self.cache.to_dataframe(symbol, interval, limit)
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from zlib import crc32
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kline_cache import INTERVAL_MS
+from rate_limiter import DEFAULT_WEIGHT_LIMIT, request_weight
+
+API_PREFIX = '/api/v3'
+
+
+def synthetic_price(symbol, open_time):
+    """Preço determinístico de um símbolo em um instante (mesma resposta a cada execução)"""
+    base = 1 + crc32(symbol.encode()) % 50000
+    step = open_time // 60_000
+    return base * (1 + 0.01 * ((step * 7919) % 200 - 100) / 100)
+
+
+def synthetic_kline(symbol, open_time, interval_ms):
+    open_ = synthetic_price(symbol, open_time)
+    close = synthetic_price(symbol, open_time + interval_ms)
+    high, low = max(open_, close) * 1.002, min(open_, close) * 0.998
+    volume = 10 + (open_time // interval_ms) % 97
+    return [
+        open_time, f"{open_:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}", f"{volume:.8f}",
+        open_time + interval_ms - 1, f"{volume * close:.8f}", int(volume * 3),
+        f"{volume / 2:.8f}", f"{volume * close / 2:.8f}", "0"
+    ]
+
+
+def synthetic_ticker(symbol, now_ms):
+    last = synthetic_price(symbol, now_ms)
+    open_ = synthetic_price(symbol, now_ms - 86_400_000)
+    return {
+        'symbol': symbol,
+        'lastPrice': f"{last:.8f}",
+        'openPrice': f"{open_:.8f}",
+        'highPrice': f"{max(last, open_) * 1.01:.8f}",
+        'lowPrice': f"{min(last, open_) * 0.99:.8f}",
+        'volume': f"{1000 + crc32(symbol.encode()) % 100000:.8f}",
+        'quoteVolume': f"{(1000 + crc32(symbol.encode()) % 100000) * last:.8f}",
+        'priceChangePercent': f"{(last - open_) / open_ * 100:.3f}",
+    }
+
+
+class MockBinanceServer:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 weight_limit=DEFAULT_WEIGHT_LIMIT, retry_after=1):
+        """
+        Servidor HTTP local que imita a API REST da Binance para benchmarks
+
+        Atende /api/v3/klines, /api/v3/ticker/24hr e /api/v3/depth com dados
+        sintéticos determinísticos, contabiliza o peso de cada requisição
+        (mesma tabela do rate_limiter) e o informa em X-MBX-USED-WEIGHT-1m.
+        Acima do limite por minuto, ou aleatoriamente com `error_rate`,
+        responde 429 com Retry-After.
+
+        Os contadores podem ser lidos em /mock/stats e zerados em /mock/reset
+        (sem latência nem peso), para uso com o servidor em outro processo.
+
+        Args:
+            host: Endereço de escuta
+            port: Porta (0 escolhe uma porta livre)
+            latency: Atraso fixo em segundos de cada resposta
+            jitter: Atraso adicional aleatório máximo em segundos
+            error_rate: Fração de requisições respondidas com 429
+            weight_limit: Peso máximo por minuto antes de responder 429
+            retry_after: Valor do cabeçalho Retry-After dos 429 aleatórios
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.weight_limit = weight_limit
+        self.retry_after = retry_after
+
+        self._weights = deque()
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.reset_stats()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        """Zera os contadores e a janela de peso (ex: entre cenários)"""
+        with self._lock:
+            self._random.seed(0)  # Mesma sequência de erros simulados em cada cenário
+            self._weights.clear()
+            self.requests = {}
+            self.throttled = 0
+            self.bytes_sent = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'total_requests': sum(self.requests.values()),
+                'throttled': self.throttled,
+                'bytes_sent': self.bytes_sent,
+            }
+
+    def _used_weight(self, weight, now):
+        with self._lock:
+            while self._weights and now - self._weights[0][0] >= 60:
+                self._weights.popleft()
+            used = sum(w for _, w in self._weights) + weight
+            if used <= self.weight_limit:
+                self._weights.append((now, weight))
+            return used
+
+    def handle(self, request):
+        parts = urlsplit(request.path)
+        if parts.path == '/mock/stats':
+            self._send(request, 200, self.stats(), {}, count=False)
+            return
+        if parts.path == '/mock/reset':
+            self.reset_stats()
+            self._send(request, 200, {}, {}, count=False)
+            return
+
+        endpoint = parts.path[len(API_PREFIX):] if parts.path.startswith(API_PREFIX) else parts.path
+        params = dict(parse_qsl(parts.query))
+
+        delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        now = time.time()
+        weight = request_weight(endpoint, params)
+        used = self._used_weight(weight, now)
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            random_error = self.error_rate and self._random.random() < self.error_rate
+
+        if used > self.weight_limit or random_error:
+            with self._lock:
+                self.throttled += 1
+            retry_after = self.retry_after if random_error else 60 - int(now) % 60
+            self._send(request, 429, {'code': -1003, 'msg': 'Too many requests.'},
+                       {'Retry-After': str(retry_after), 'X-MBX-USED-WEIGHT-1m': str(used)})
+            return
+
+        try:
+            status, body = 200, self.route(endpoint, params, int(now * 1000))
+        except (KeyError, ValueError) as e:
+            status, body = 400, {'code': -1100, 'msg': f"Parâmetro inválido: {e}"}
+        if body is None:
+            status, body = 404, {'code': -1, 'msg': 'Not found'}
+        self._send(request, status, body, {'X-MBX-USED-WEIGHT-1m': str(used)})
+
+    def route(self, endpoint, params, now_ms):
+        if endpoint == '/klines':
+            return self.klines(params, now_ms)
+        if endpoint == '/ticker/24hr':
+            if 'symbols' in params:
+                return [synthetic_ticker(symbol, now_ms) for symbol in json.loads(params['symbols'])]
+            return synthetic_ticker(params['symbol'], now_ms)
+        if endpoint == '/depth':
+            return self.depth(params, now_ms)
+        return None
+
+    def klines(self, params, now_ms):
+        symbol = params['symbol']
+        interval_ms = INTERVAL_MS[params.get('interval', '5m')]
+        limit = min(int(params.get('limit', 500)), 1000)
+        current = now_ms - now_ms % interval_ms
+
+        if 'startTime' in params:
+            start = int(params['startTime'])
+            first = start + (-start) % interval_ms
+            last = min(current, int(params.get('endTime', current)), first + (limit - 1) * interval_ms)
+        else:
+            last = min(current, int(params.get('endTime', current)))
+            last -= last % interval_ms
+            first = last - (limit - 1) * interval_ms
+        return [synthetic_kline(symbol, t, interval_ms) for t in range(first, last + 1, interval_ms)]
+
+    def depth(self, params, now_ms):
+        symbol = params['symbol']
+        limit = int(params.get('limit', 100))
+        mid = synthetic_price(symbol, now_ms)
+        tick = mid * 0.0001
+        return {
+            'lastUpdateId': now_ms,
+            'bids': [[f"{mid - (i + 1) * tick:.8f}", f"{1 + i % 7:.8f}"] for i in range(limit)],
+            'asks': [[f"{mid + (i + 1) * tick:.8f}", f"{1 + i % 5:.8f}"] for i in range(limit)],
+        }
+
+    def _send(self, request, status, body, headers, count=True):
+        payload = json.dumps(body, separators=(',', ':')).encode()
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(payload)
+        if count:
+            with self._lock:
+                self.bytes_sent += len(payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API REST da Binance")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Atraso fixo por resposta (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Atraso aleatório adicional máximo (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument('--weight-limit', type=int, default=DEFAULT_WEIGHT_LIMIT)
+    args = parser.parse_args()
+
+    server = MockBinanceServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate, weight_limit=args.weight_limit)
+    print(f"Servidor de testes em {server.base_url}. Pressione Ctrl+C para sair.", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+    finally:
+        server.httpd.server_close()
@@ -0,0 +1,338 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from binance_client import BinanceClient, klines_to_dataframe
+
+DEFAULT_SIZES = (5, 50, 500)
+
+# Métricas em que um valor maior é melhor; nas demais, menor é melhor
+HIGHER_IS_BETTER = {'requests_per_second'}
+
+# Métricas informativas, fora da verificação de regressão
+INFORMATIONAL = {'rss_mb'}
+
+
+def load_script(filename, module_name):
+    """Carrega um script da raiz do repositório cujo nome tem hífen (ex: binance-data-monitor.py)"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_symbols(count):
+    return [f"SYM{i:04d}USDT" for i in range(count)]
+
+
+@contextmanager
+def suppress_output():
+    """Descarta a saída do terminal (inclusive o 'clear' executado via os.system)"""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stdout = stdout
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+class MockServerProcess:
+    def __init__(self, port, latency=0.0, jitter=0.0, error_rate=0.0):
+        """Executa benchmarks/mock_server.py em outro processo (sem disputar o GIL com o cliente)"""
+        self.base = f"http://127.0.0.1:{port}"
+        self.base_url = f"{self.base}/api/v3"
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'benchmarks', 'mock_server.py'),
+             '--port', str(port), '--latency', str(latency), '--jitter', str(jitter),
+             '--error-rate', str(error_rate)],
+            stdout=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                self.reset()
+                break
+            except requests.exceptions.ConnectionError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError("O servidor de testes não iniciou")
+                time.sleep(0.1)
+
+    def reset(self):
+        requests.get(f"{self.base}/mock/reset", timeout=5).raise_for_status()
+
+    def stats(self):
+        return requests.get(f"{self.base}/mock/stats", timeout=5).json()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def new_client(server, symbols):
+    return BinanceClient(base_url=server.base_url, pool_maxsize=max(16, min(len(symbols), 64)))
+
+
+def measure(server, cold_cycle, warm_cycle, cycles):
+    """
+    Mede um ciclo frio (cache vazio) e `cycles` ciclos quentes
+
+    Returns:
+        Dicionário de métricas (tempos em ms, memória em MB)
+    """
+    server.reset()
+    start = time.perf_counter()
+    cold_cycle()
+    cold = time.perf_counter() - start
+    cold_requests = server.stats()['total_requests']
+
+    warm = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        warm_cycle()
+        warm.append(time.perf_counter() - start)
+    stats = server.stats()
+
+    # Ciclo extra só para medir memória (o tracemalloc deixa o código mais lento)
+    tracemalloc.start()
+    warm_cycle()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    warm_sorted = sorted(warm)
+    return {
+        'cold_cycle_ms': cold * 1000,
+        'warm_cycle_ms': statistics.median(warm) * 1000 if warm else 0.0,
+        'warm_cycle_p95_ms': warm_sorted[min(len(warm) - 1, int(len(warm) * 0.95))] * 1000 if warm else 0.0,
+        'requests_per_second': stats['total_requests'] / (cold + sum(warm)),
+        'requests_cold_cycle': cold_requests,
+        'requests_per_warm_cycle': (stats['total_requests'] - cold_requests) / max(cycles, 1),
+        'throttled': stats['throttled'],
+        'mem_peak_mb': peak / 2**20,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def bench_console(module, server, symbols, cycles):
+    """BinanceDataFetcher.display_data (busca + exibição no terminal)"""
+    client = new_client(server, symbols)
+    fetcher = module.BinanceDataFetcher(symbols=symbols, client=client,
+                                        max_workers=min(len(symbols), 8))
+    try:
+        with suppress_output():
+            return measure(server, fetcher.display_data, fetcher.display_data, cycles)
+    finally:
+        client.close()
+
+
+def bench_monitor(module, server, symbols, cycles):
+    """
+    BinanceMonitor.update_data, medido até o ciclo aparecer na tela
+
+    Cada ciclo é pedido pelo botão "Atualizar Agora" (request_update) e só
+    termina quando o CycleSnapshot é aplicado pela thread do Tk, então o
+    tempo inclui a aplicação dos snapshots. Retorna None sem display.
+    """
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Monitor gráfico ignorado (Tk indisponível: {e})")
+        return None
+
+    client = new_client(server, symbols)
+    monitor = None
+
+    def wait_cycle(target):
+        while monitor.cycles_applied < target:
+            root.update()
+            time.sleep(0.001)
+
+    def cold_cycle():
+        # O primeiro ciclo é disparado pela própria inicialização do monitor
+        nonlocal monitor
+        monitor = module.BinanceMonitor(root, symbols=symbols, client=client)
+        wait_cycle(1)
+        monitor.frame_times.clear()
+
+    def warm_cycle():
+        target = monitor.cycles_applied + 1
+        monitor.request_update()
+        wait_cycle(target)
+
+    try:
+        result = measure(server, cold_cycle, warm_cycle, cycles)
+        frames = monitor.frame_time_stats()
+        if frames:
+            result['frame_avg_ms'] = frames['avg']
+            result['frame_max_ms'] = frames['max']
+        return result
+    finally:
+        if monitor is not None:
+            monitor.on_closing()
+        else:
+            root.destroy()
+
+
+def bench_parse(server, repeat=50):
+    """Tempo para converter uma página de 1000 candles do /klines em DataFrame"""
+    response = requests.get(f"{server.base_url}/klines",
+                            params={'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 1000}, timeout=10)
+    page = response.json()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        klines_to_dataframe(page)
+        timings.append(time.perf_counter() - start)
+    return {'parse_page_ms': min(timings) * 1000}
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance, min_delta=1.0):
+    """
+    Compara os resultados com um baseline
+
+    Diferenças absolutas menores que `min_delta` (ex: 1 ms, 1 MB) são
+    consideradas ruído, mesmo que a variação relativa passe da tolerância.
+
+    Returns:
+        Lista de tuplas (métrica, baseline, atual, variação relativa) das regressões
+    """
+    current, previous = flatten(results['scenarios']), flatten(baseline['scenarios'])
+    regressions = []
+    for name, value in sorted(current.items()):
+        metric = name.rsplit('.', 1)[-1]
+        old = previous.get(name)
+        if old is None or metric in INFORMATIONAL:
+            continue
+        if metric in HIGHER_IS_BETTER:
+            change = (old - value) / old if old else 0.0
+        elif old:
+            change = (value - old) / old
+        else:
+            change = 1.0 if value > 0 else 0.0
+        if change > tolerance and abs(value - old) >= min_delta:
+            regressions.append((name, old, value, change))
+    return regressions
+
+
+def print_table(results):
+    for name, sizes in results['scenarios'].items():
+        if name == 'parse':
+            print(f"\nparse: {sizes['parse_page_ms']:.3f} ms por página de 1000 candles")
+            continue
+        print(f"\n{name}")
+        metrics = sorted({metric for values in sizes.values() if values for metric in values})
+        header = f"{'métrica':<26}" + ''.join(f"{size + ' símbolos':>16}" for size in sizes)
+        print(header)
+        print('-' * len(header))
+        for metric in metrics:
+            cells = ''.join(
+                f"{values[metric]:>16.2f}" if values and metric in values else f"{'-':>16}"
+                for values in sizes.values())
+            print(f"{metric:<26}{cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks das ferramentas contra um servidor Binance local")
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help="Quantidades de símbolos testadas (padrão: 5 50 500)")
+    parser.add_argument('--cycles', type=int, default=3, help="Ciclos quentes por cenário (padrão: 3)")
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help="Latência simulada por requisição em segundos (padrão: 0.02)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latência aleatória adicional máxima (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fração de respostas 429 simuladas")
+    parser.add_argument('--port', type=int, default=18080, help="Porta do servidor de testes")
+    parser.add_argument('--skip-monitor', action='store_true', help="Não executa o cenário do monitor gráfico")
+    parser.add_argument('--output', metavar='ARQUIVO', help="Grava os resultados em JSON")
+    parser.add_argument('--baseline', metavar='ARQUIVO',
+                        help="Compara com um resultado anterior e falha se houver regressão")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Piora relativa aceita antes de acusar regressão (padrão: 0.2 = 20%%)")
+    parser.add_argument('--min-delta', type=float, default=1.0,
+                        help="Diferença absoluta mínima para acusar regressão (padrão: 1.0)")
+    args = parser.parse_args()
+
+    console = load_script('binance-api-data-fetcher.py', 'binance_api_data_fetcher')
+    monitor = None
+    if not args.skip_monitor:
+        try:
+            monitor = load_script('binance-data-monitor.py', 'binance_data_monitor')
+        except ImportError as e:
+            # Sem display o matplotlib não carrega o backend TkAgg
+            print(f"Monitor gráfico ignorado ({e})")
+
+    server = MockServerProcess(args.port, latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate)
+    scenarios = {'console': {}, 'monitor': {}}
+    try:
+        scenarios['parse'] = bench_parse(server)
+        for size in args.sizes:
+            symbols = make_symbols(size)
+            print(f"Executando {size} símbolos...", flush=True)
+            scenarios['console'][str(size)] = bench_console(console, server, symbols, args.cycles)
+            if monitor is not None:
+                scenarios['monitor'][str(size)] = bench_monitor(monitor, server, symbols, args.cycles)
+    finally:
+        server.stop()
+
+    if not any(scenarios['monitor'].values()):
+        del scenarios['monitor']
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'cycles': args.cycles,
+        },
+        'scenarios': scenarios,
+    }
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.tolerance:.0%}:")
+            for name, old, new, change in regressions:
+                print(f"  {name}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.tolerance:.0%} em relação a {args.baseline}.")
@@ -1,89 +1,152 @@
+import argparse
 import requests
+import threading
 import time
-import pandas as pd
 from datetime import datetime
 import os
+from functools import partial
+
+from aggregation import CandleAggregator
+from binance_client import BinanceClient, fetch_concurrently, klines_to_dataframe
+from binance_stream import DEFAULT_WS_URL, BinanceStream
+from candle_store import CandleStore
+from collector_daemon import DEFAULT_ADDRESS, CollectorSubscriber
+from indicators import IndicatorEngine
+from kline_cache import INTERVAL_MS, KlineCache
+from metrics import DEFAULT_METRICS_PORT, format_summary, start_http_server
 
 class BinanceDataFetcher:
-    def __init__(self, symbols=None, interval='5m'):
+    def __init__(self, symbols=None, interval='5m', client=None, max_workers=8,
+                 cache_max_length=500, store=None, indicators=None, show_metrics=False,
+                 intervals=None):
         """
         Inicializa o fetcher de dados da Binance
         
         Args:
             symbols: Lista de símbolos de pares de trading (ex: ['BTCUSDT', 'ETHUSDT'])
             interval: Intervalo de tempo para os dados (padrão: 5m)
+            client: Instância de BinanceClient compartilhada (opcional)
+            max_workers: Limite de requisições simultâneas por ciclo (padrão: 8)
+            cache_max_length: Máximo de candles mantidos em cache por símbolo
+            store: CandleStore opcional com o histórico local de candles
+            indicators: IndicatorEngine opcional; se informado, os indicadores
+                técnicos são exibidos junto com os candles
+            show_metrics: Exibe ao fim de cada atualização um resumo das métricas
+                (latência por endpoint, bytes, repetições, peso, caches)
+            intervals: Lista de intervalos exibidos (ex: ['1m', '5m', '1h']); só o
+                mais fino é buscado na API e os demais são derivados localmente.
+                O primeiro é o usado pelos indicadores (padrão: [interval])
         """
         self.base_url = 'https://api.binance.com/api/v3'
         self.symbols = symbols or ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT']
-        self.interval = interval
+        self.intervals = list(intervals or [interval])
+        self.interval = self.intervals[0]
+        self.base_interval = min(self.intervals, key=INTERVAL_MS.get)  # Único intervalo buscado na API
+        self.kline_limit = 5  # Últimos 5 candles
+        self.indicators = indicators
+        self.show_metrics = show_metrics
+        self.indicator_history = 200  # Candles usados para iniciar os indicadores
+        self.kline_cache = KlineCache(max_length=max(cache_max_length, self.kline_limit,
+                                                     self.indicator_history,
+                                                     *(INTERVAL_MS[i] // INTERVAL_MS[self.base_interval]
+                                                       for i in self.intervals)),
+                                      store=store)
+        self.aggregator = CandleAggregator(self.kline_cache, self.base_interval,
+                                           [i for i in self.intervals if i != self.base_interval])
+        self.max_workers = max_workers
+        self.client = client or BinanceClient(base_url=self.base_url,
+                                              pool_maxsize=max(16, max_workers))
+        self.collector_interval = None  # Intervalo anunciado pelo coletor (--attach)
+        self.notice = None  # Aviso exibido no topo de cada atualização da tela
         
-    def get_kline_data(self, symbol):
-        """Obtém dados de candles para um símbolo específico"""
-        endpoint = f'/klines'
-        params = {
-            'symbol': symbol,
-            'interval': self.interval,
-            'limit': 5  # Últimos 5 candles
-        }
+    def get_kline_rows(self, symbol):
+        """
+        Obtém os últimos candles (formato /klines) para um símbolo
+        
+        Apenas os candles posteriores ao último candle fechado em cache são
+        buscados na API; o candle ainda aberto é substituído no cache. Os
+        demais intervalos são derivados localmente dos candles base.
+        """
+        limit = max(self.kline_limit, self.indicator_history) if self.indicators else self.kline_limit
         
         try:
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
-            response.raise_for_status()  # Lança exceção para erros HTTP
-            
-            data = response.json()
-            
-            # Converter para DataFrame
-            df = pd.DataFrame(data, columns=[
-                'open_time', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            # Converter timestamps para datetime
-            df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-            df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-            
-            # Converter valores numéricos
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
-                
-            return df
+            self.aggregator.fetch(self.client, symbol, limit)
+            return self.kline_cache.rows(symbol, self.interval, self.kline_limit)
         
         except requests.exceptions.RequestException as e:
             print(f"Erro ao obter dados para {symbol}: {e}")
             return None
     
-    def get_ticker_data(self, symbol):
-        """Obtém dados atuais de preço e volume para um símbolo"""
-        endpoint = f'/ticker/24hr'
-        params = {
-            'symbol': symbol
-        }
-        
+    def get_kline_data(self, symbol):
+        """Obtém dados de candles para um símbolo específico"""
+        rows = self.get_kline_rows(symbol)
+        if rows is None:
+            return None
+        return klines_to_dataframe(rows)
+    
+    def get_tickers_data(self):
+        """Obtém os tickers de todos os símbolos em requisições agrupadas"""
         try:
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
+            return self.client.get_tickers(self.symbols)
         
         except requests.exceptions.RequestException as e:
-            print(f"Erro ao obter ticker para {symbol}: {e}")
-            return None
+            print(f"Erro ao obter tickers: {e}")
+            return {}
     
+    def fetch_all(self):
+        """
+        Busca ticker e candles de todos os símbolos em paralelo
+
+        Returns:
+            Lista de tuplas (símbolo, ticker, candles) na ordem de self.symbols
+        """
+        calls = [self.get_tickers_data]
+        calls += [partial(self.get_kline_data, symbol) for symbol in self.symbols]
+        results = fetch_concurrently(calls, self.max_workers)
+
+        tickers = results[0]
+        return [(symbol, tickers.get(symbol), klines)
+                for symbol, klines in zip(self.symbols, results[1:])]
+
+    def compute_indicators(self):
+        """
+        Atualiza os indicadores técnicos de todos os símbolos a partir do cache
+
+        Returns:
+            Dicionário símbolo -> valores mais recentes (vazio sem IndicatorEngine)
+        """
+        if self.indicators is None:
+            return {}
+        
+        values = {}
+        for symbol in self.symbols:
+            df = self.kline_cache.to_dataframe(symbol, self.interval, self.indicator_history)
+            values[symbol] = self.indicators.update((symbol, self.interval), df)
+        return values
+
     def display_data(self):
+        """Busca e exibe os dados de todos os símbolos"""
+        results = self.fetch_all()
+        self.kline_cache.flush()
+        self.print_data(results, self.compute_indicators())
+    
+    def print_data(self, results, indicators=None):
         """Exibe os dados obtidos de forma organizada no terminal"""
+        indicators = indicators or {}
         os.system('cls' if os.name == 'nt' else 'clear')  # Limpa a tela
         
         print(f"\n{'='*80}")
         print(f"DADOS DA BINANCE - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*80}")
+        if self.notice:
+            print(self.notice)
         
-        for symbol in self.symbols:
+        for symbol, ticker_data, kline_data in results:
             print(f"\n{'-'*80}")
             print(f"SÍMBOLO: {symbol}")
             print(f"{'-'*80}")
             
-            # Obter e exibir dados de ticker
-            ticker_data = self.get_ticker_data(symbol)
+            # Exibir dados de ticker
             if ticker_data:
                 print(f"Preço atual: {float(ticker_data['lastPrice']):.8f}")
                 print(f"Variação 24h: {float(ticker_data['priceChangePercent']):+.2f}%")
@@ -91,18 +154,52 @@ class BinanceDataFetcher:
                 print(f"Máxima 24h: {float(ticker_data['highPrice']):.8f}")
                 print(f"Mínima 24h: {float(ticker_data['lowPrice']):.8f}")
             
-            # Obter e exibir dados de candles
-            kline_data = self.get_kline_data(symbol)
-            if kline_data is not None and not kline_data.empty:
-                print("\nÚltimos 5 candles:")
+            # Exibir dados de candles (um bloco por intervalo, se houver vários)
+            frames = [(self.interval, kline_data)]
+            if len(self.intervals) > 1 and kline_data is not None:
+                frames += [(interval, self.kline_cache.to_dataframe(symbol, interval, self.kline_limit))
+                           for interval in self.intervals[1:]]
+            
+            for interval, frame in frames:
+                if frame is None or frame.empty:
+                    continue
+                label = f" ({interval})" if len(self.intervals) > 1 else ""
+                print(f"\nÚltimos {len(frame)} candles{label}:")
                 
                 # Criar visualização simplificada do DataFrame
-                view_df = kline_data[['open_time', 'open', 'high', 'low', 'close', 'volume']].copy()
-                view_df['open_time'] = view_df['open_time'].dt.strftime('%H:%M:%S')
+                view_df = frame[['open_time', 'open', 'high', 'low', 'close', 'volume']].copy()
+                time_format = '%H:%M:%S' if INTERVAL_MS[interval] < 86_400_000 else '%Y-%m-%d'
+                view_df['open_time'] = view_df['open_time'].dt.strftime(time_format)
                 
                 print(view_df.to_string(index=False, float_format=lambda x: f"{x:.8f}"))
             
+            # Exibir indicadores técnicos
+            values = indicators.get(symbol)
+            if values:
+                print(f"\nIndicadores: {self.format_indicators(values)}")
+            
             print("")
+        
+        # Resumo das métricas de desempenho
+        if self.show_metrics:
+            print(f"{'-'*80}")
+            print("MÉTRICAS")
+            for line in format_summary():
+                print(line)
+    
+    def format_indicators(self, values):
+        """Formata os valores mais recentes dos indicadores em uma linha"""
+        engine = self.indicators
+        fast, slow, signal = engine.macd_periods
+        fmt = lambda value: "-" if value != value else f"{value:.6f}"  # NaN: janela incompleta
+        rsi = "-" if values['rsi'] != values['rsi'] else f"{values['rsi']:.2f}"
+        return (f"SMA({engine.sma_period}) {fmt(values['sma'])} | "
+                f"EMA({engine.ema_period}) {fmt(values['ema'])} | "
+                f"RSI({engine.rsi_period}) {rsi} | "
+                f"MACD({fast},{slow},{signal}) {fmt(values['macd'])}/{fmt(values['macd_signal'])} | "
+                f"Bollinger [{fmt(values['bb_lower'])}, {fmt(values['bb_upper'])}] | "
+                f"ATR({engine.atr_period}) {fmt(values['atr'])} | "
+                f"VWAP {fmt(values['vwap'])}")
     
     def run(self, interval_seconds=300):
         """
@@ -117,15 +214,194 @@ class BinanceDataFetcher:
                 print(f"\nPróxima atualização em {interval_seconds} segundos. Pressione Ctrl+C para sair.")
                 time.sleep(interval_seconds)
         except KeyboardInterrupt:
+            self.kline_cache.flush()
             print("\nPrograma encerrado pelo usuário.")
+    
+    def load_stream_state(self):
+        """Carrega (ou recarrega após reconexão) o estado inicial via REST"""
+        calls = [self.get_tickers_data]
+        calls += [partial(self.get_kline_rows, symbol) for symbol in self.symbols]
+        results = fetch_concurrently(calls, self.max_workers)
+        
+        with self._stream_lock:
+            self._tickers.update(results[0])
+            self._stream_dirty = True
+    
+    def on_stream_kline(self, symbol, row, is_closed):
+        self.aggregator.ingest(symbol, [row])
+        if is_closed:
+            self.kline_cache.persist(symbol, self.base_interval, [row], now_ms=int(row[6]) + 1)
+        with self._stream_lock:
+            self._stream_dirty = True
+    
+    def on_stream_ticker(self, symbol, ticker):
+        with self._stream_lock:
+            self._tickers[symbol] = ticker
+            self._stream_dirty = True
+    
+    def run_stream(self, ws_url=DEFAULT_WS_URL, refresh_seconds=1):
+        """
+        Exibe os dados a partir dos streams WebSocket em vez de polling REST
+        
+        Args:
+            ws_url: URL base do servidor WebSocket (padrão: stream da Binance)
+            refresh_seconds: Intervalo mínimo em segundos entre redesenhos da tela
+        """
+        self._stream_lock = threading.Lock()
+        self._tickers = {}
+        self._stream_dirty = False
+        
+        self.load_stream_state()
+        stream = BinanceStream(self.symbols, self.base_interval,
+                               on_kline=self.on_stream_kline,
+                               on_ticker=self.on_stream_ticker,
+                               on_reconnect=self.load_stream_state,
+                               ws_url=ws_url)
+        stream.start()
+        
+        try:
+            self.display_loop("Modo streaming ativo.", refresh_seconds)
+        finally:
+            stream.stop()
+    
+    def display_loop(self, footer, refresh_seconds=1):
+        """Redesenha a tela sempre que os dados recebidos mudarem, até Ctrl+C"""
+        try:
+            while True:
+                if self._stream_dirty:
+                    with self._stream_lock:
+                        self._stream_dirty = False
+                        tickers = dict(self._tickers)
+                    
+                    self.print_data([
+                        (symbol, tickers.get(symbol),
+                         self.kline_cache.to_dataframe(symbol, self.interval, self.kline_limit))
+                        for symbol in self.symbols
+                    ], self.compute_indicators())
+                    print(f"\n{footer} Pressione Ctrl+C para sair.")
+                # Candles fechados recebidos desde o último redesenho, gravados de uma vez
+                self.kline_cache.flush()
+                time.sleep(refresh_seconds)
+        except KeyboardInterrupt:
+            self.kline_cache.flush()
+            print("\nPrograma encerrado pelo usuário.")
+    
+    def on_collector_klines(self, symbol, rows):
+        if self.collector_interval != self.base_interval:
+            return  # Candles de outro intervalo: nunca agregar nem gravar sob o intervalo base
+        self.aggregator.ingest(symbol, rows)
+        self.kline_cache.persist(symbol, self.base_interval, rows)
+    
+    def on_collector_cycle(self, time_text, status_text):
+        with self._stream_lock:
+            self._stream_dirty = True
+    
+    def on_collector_hello(self, symbols, interval):
+        """
+        Adota o intervalo do coletor como intervalo base (antes de receber os candles)
+
+        Intervalos que não são múltiplos do intervalo do coletor deixam de ser
+        exibidos; se nenhum restar, é exibido o próprio intervalo do coletor.
+        """
+        self.collector_interval = interval
+        if interval not in INTERVAL_MS:
+            self.notice = f"O coletor publica candles de {interval}, intervalo desconhecido; candles ignorados."
+            return
+        if interval == self.base_interval:
+            return
+        
+        base_ms = INTERVAL_MS[interval]
+        configured = self.base_interval
+        intervals = [i for i in self.intervals if INTERVAL_MS[i] % base_ms == 0]
+        dropped = [i for i in self.intervals if i not in intervals]
+        self.intervals = intervals or [interval]
+        self.interval = self.intervals[0]
+        self.base_interval = interval
+        self.kline_cache.clear()
+        self.aggregator = CandleAggregator(self.kline_cache, interval,
+                                           [i for i in self.intervals if i != interval])
+        self.notice = f"O coletor publica candles de {interval}; usando {interval} como intervalo base."
+        if dropped:
+            self.notice += (f" Intervalos indisponíveis: {', '.join(dropped)} "
+                            f"(use collector_daemon.py --interval {configured}).")
+    
+    def run_attached(self, address=DEFAULT_ADDRESS, refresh_seconds=1):
+        """
+        Exibe os dados publicados por um collector_daemon.py em vez de acessar a API
+        
+        Args:
+            address: Socket Unix ou host:porta TCP do coletor
+            refresh_seconds: Intervalo mínimo em segundos entre redesenhos da tela
+        """
+        self._stream_lock = threading.Lock()
+        self._tickers = {}
+        self._stream_dirty = False
+        
+        subscriber = CollectorSubscriber(address,
+                                         on_klines=self.on_collector_klines,
+                                         on_ticker=self.on_stream_ticker,
+                                         on_cycle=self.on_collector_cycle,
+                                         on_hello=self.on_collector_hello)
+        subscriber.start()
+        
+        try:
+            self.display_loop(f"Conectado ao coletor em {address}.", refresh_seconds)
+        finally:
+            subscriber.stop()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monitor de dados da Binance no terminal")
+    parser.add_argument('--stream', action='store_true',
+                        help="Usa os streams WebSocket em vez de polling a cada 5 minutos")
+    parser.add_argument('--ws-url', default=DEFAULT_WS_URL,
+                        help="URL base do servidor WebSocket (ex: servidor local de testes)")
+    parser.add_argument('--store', metavar='DIR',
+                        help="Diretório do histórico local de candles (ver candle_store.py backfill)")
+    parser.add_argument('--attach', nargs='?', const=DEFAULT_ADDRESS, metavar='ENDEREÇO',
+                        help="Recebe os dados de um collector_daemon.py em vez de acessar a API "
+                             f"(padrão: {DEFAULT_ADDRESS})")
+    parser.add_argument('--indicators', action='store_true',
+                        help="Exibe SMA, EMA, RSI, MACD, Bollinger, ATR e VWAP de cada símbolo")
+    parser.add_argument('--intervals', nargs='+', choices=sorted(INTERVAL_MS, key=INTERVAL_MS.get),
+                        metavar='INTERVALO',
+                        help="Intervalos exibidos (ex: 1m 5m 1h 1d); só o mais fino é buscado na API "
+                             "e os demais são agregados localmente (padrão: 5m)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Exibe um resumo das métricas de desempenho a cada atualização")
+    parser.add_argument('--metrics-port', type=int, nargs='?', const=DEFAULT_METRICS_PORT, metavar='PORTA',
+                        help=f"Exporta métricas no formato Prometheus em http://127.0.0.1:PORTA/metrics "
+                             f"(padrão: {DEFAULT_METRICS_PORT})")
+    parser.add_argument('--max-workers', type=int, default=8, metavar='N',
+                        help="Requisições simultâneas por ciclo de atualização (padrão: 8)")
+    args = parser.parse_args()
+    
+    if args.max_workers <= 0:
+        parser.error("--max-workers deve ser um número positivo")
+    
+    if args.intervals:
+        base_ms = min(INTERVAL_MS[interval] for interval in args.intervals)
+        invalid = [interval for interval in args.intervals if INTERVAL_MS[interval] % base_ms]
+        if invalid:
+            parser.error(f"intervalos que não são múltiplos do mais fino: {', '.join(invalid)}")
+    
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    
     # Lista de símbolos que você deseja monitorar
     symbols_to_monitor = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT']
     
     # Criando instância do fetcher com os símbolos desejados
-    fetcher = BinanceDataFetcher(symbols=symbols_to_monitor)
+    store = CandleStore(root=args.store) if args.store else None
+    indicators = IndicatorEngine() if args.indicators else None
+    fetcher = BinanceDataFetcher(symbols=symbols_to_monitor, store=store, indicators=indicators,
+                                 show_metrics=args.metrics, intervals=args.intervals,
+                                 max_workers=args.max_workers)
     
-    # Iniciar o monitoramento com intervalo de 5 minutos (300 segundos)
-    fetcher.run(interval_seconds=300)
+    if args.attach:
+        fetcher.run_attached(address=args.attach)
+    elif args.stream:
+        fetcher.run_stream(ws_url=args.ws_url)
+    else:
+        # Iniciar o monitoramento com intervalo de 5 minutos (300 segundos)
+        fetcher.run(interval_seconds=300)
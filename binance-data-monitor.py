@@ -1,31 +1,131 @@
+import argparse
+import queue
 import tkinter as tk
 from tkinter import ttk
-import requests
 import threading
 import time
-import pandas as pd
+from collections import deque
 from datetime import datetime
+from functools import partial
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import matplotlib
 matplotlib.use("TkAgg")
 
+from aggregation import CandleAggregator
+from binance_client import BinanceClient, fetch_concurrently, klines_to_dataframe
+from binance_stream import DEFAULT_WS_URL, BinanceStream
+from candle_store import CandleStore
+from chart_renderer import OVERLAY_STYLES, ChartRenderer
+from collector_daemon import DEFAULT_ADDRESS, CollectorSubscriber
+from indicators import IndicatorEngine
+from kline_cache import INTERVAL_MS, MAX_KLINES_LIMIT, KlineCache
+from metrics import DEFAULT_METRICS_PORT, REGISTRY, start_http_server
+from order_book import OrderBookManager
+from snapshots import CycleSnapshot, SnapshotStore, build_snapshot, format_price, passes_thresholds
+from widget_diff import WidgetDiffer
+
+FRAME_SECONDS = REGISTRY.histogram('gui_frame_seconds', 'Tempo de cada quadro que aplicou snapshots na thread do Tk',
+                                   buckets=(0.001, 0.0025, 0.005, 0.01, 0.016, 0.02, 0.033, 0.05, 0.1, 0.25))
+
 class BinanceMonitor:
-    def __init__(self, root):
+    def __init__(self, root, streaming=False, ws_url=DEFAULT_WS_URL, store=None, attach=None,
+                 symbols=None, client=None, chart_history=5000, max_workers=8):
+        """
+        Inicializa o monitor gráfico
+        
+        Args:
+            root: Janela principal do Tk
+            streaming: Usa os streams WebSocket em vez de polling a cada 5 minutos
+            ws_url: URL base do servidor WebSocket (ex: servidor local de testes)
+            store: CandleStore opcional com o histórico local de candles
+            attach: Endereço de um collector_daemon.py; se informado, os dados
+                vêm do coletor e o monitor não acessa a API de candles/tickers
+            symbols: Lista de símbolos monitorados (padrão: 5 pares principais)
+            client: Instância de BinanceClient compartilhada (opcional)
+            chart_history: Candles mantidos por intervalo para o gráfico; com
+                `store`, o histórico é carregado do disco até esse limite (no
+                mínimo um período do maior intervalo, 1440 candles de 1m)
+            max_workers: Limite de requisições simultâneas por ciclo (padrão: 8)
+        """
         self.root = root
         self.root.title("Monitor de Dados Binance")
         self.root.geometry("1200x800")
         self.root.configure(bg="#f0f0f0")
         
         self.base_url = 'https://api.binance.com/api/v3'
-        self.symbols = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT']
-        self.interval = '5m'
+        self.symbols = symbols or ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT']
+        self.interval = '5m'  # Intervalo exibido (selecionável na aba de gráficos)
+        self.base_interval = '1m'  # Único intervalo buscado; os demais são agregados localmente
+        self.chart_intervals = ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d']
+        self.kline_limit = 30  # Últimos 30 candles para a tabela
+        # Candles base da primeira busca: cobrem o candle em formação do maior intervalo
+        self.base_history = max(INTERVAL_MS[interval] // INTERVAL_MS[self.base_interval]
+                                for interval in self.chart_intervals)
+        # Candles mantidos para o gráfico (zoom/deslocamento); nunca menos que o
+        # necessário para agregar o maior intervalo, senão o cache descartaria
+        # candles base de períodos ainda em uso
+        self.chart_history = max(chart_history, self.base_history)
+        # Símbolo da aba de gráficos (cópia lida pelas threads de busca): só ele tem
+        # gráfico, sobreposições e indicadores recalculados a cada ciclo
+        self.chart_symbol = self.symbols[0]
+        self.kline_cache = KlineCache(max_length=self.chart_history, store=store)
+        self.aggregator = CandleAggregator(self.kline_cache, self.base_interval, [self.interval])
+        self.indicators = IndicatorEngine()
         self.update_interval = 300  # 5 minutos em segundos
+        self.max_workers = max_workers  # Requisições simultâneas por ciclo
         self.is_running = True
         
+        # Pipeline produtor/consumidor: as threads de busca publicam snapshots
+        # e a thread do Tk apenas os aplica, dentro de um orçamento por quadro
+        self.updates = queue.Queue()
+        self.frame_budget = 0.02  # 20 ms por quadro
+        self.poll_interval_ms = 50
+        self.frame_times = deque(maxlen=200)
+        self.cycles_applied = 0  # Ciclos completos já exibidos (usado pelos benchmarks)
+        self.differ = WidgetDiffer()  # Só reconfigura widgets cujo conteúdo mudou
+        self._refresh_event = threading.Event()
+        
+        # Último snapshot de cada símbolo, lido pelas tabelas e pelo gráfico
+        # (validade de um ciclo, com folga para a duração da própria busca)
+        self.snapshots = SnapshotStore(ttl=self.update_interval + 60,
+                                       max_entries=max(256, len(self.symbols)))
+        self.client = client or BinanceClient(base_url=self.base_url,
+                                              pool_maxsize=max(16, self.max_workers))
+        
+        # Estado do modo streaming
+        self.streaming = streaming
+        self.ws_url = ws_url
+        self.stream = None
+        self._stream_lock = threading.Lock()
+        self._tickers = {}
+        self._pending_tickers = set()
+        self._pending_klines = set()
+        self.stream_flush_interval = 0.25  # Agrupa as mensagens do stream a cada 250 ms
+        self.stream_status = "Modo streaming: recebendo atualizações em tempo real."
+        
+        # Assinatura de um coletor compartilhado (collector_daemon.py)
+        self.attach = attach
+        self.subscriber = None
+        self.collector_interval = None  # Intervalo anunciado pelo coletor (hello)
+        
+        # Livro de ofertas (iniciado ao abrir a aba pela primeira vez)
+        self.order_books = OrderBookManager(self.client, self.symbols)
+        self.depth_stream = None
+        self.book_started = False
+        self.book_levels = 20  # Níveis exibidos por lado
+        self.book_refresh_ms = 250
+        self.book_poll_interval = 5  # Segundos entre snapshots quando não há stream
+        self._book_version = None
+        
         self.setup_ui()
+        if self.attach:
+            self.start_attached()
+        elif self.streaming:
+            self.start_stream()
         self.start_update_thread()
+        self.root.after(self.poll_interval_ms, self.poll_updates)
 
     def setup_ui(self):
         # Frame principal
@@ -55,7 +155,13 @@ class BinanceMonitor:
         charts_tab = tk.Frame(tab_control, bg="#f0f0f0")
         tab_control.add(charts_tab, text="Gráficos")
         
+        # Aba do livro de ofertas
+        self.book_tab = tk.Frame(tab_control, bg="#f0f0f0")
+        tab_control.add(self.book_tab, text="Livro de Ofertas")
+        
         tab_control.pack(expand=1, fill=tk.BOTH)
+        tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.tab_control = tab_control
         
         # Configuração da aba de visão geral
         self.setup_overview_tab(overview_tab)
@@ -63,6 +169,9 @@ class BinanceMonitor:
         # Configuração da aba de gráficos
         self.setup_charts_tab(charts_tab)
         
+        # Configuração da aba do livro de ofertas
+        self.setup_book_tab(self.book_tab)
+        
         # Barra de status
         status_frame = tk.Frame(main_frame, bg="#34495e", height=30)
         status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
@@ -73,106 +182,271 @@ class BinanceMonitor:
         
         # Botão para atualizar manualmente
         update_button = tk.Button(status_frame, text="Atualizar Agora", 
-                                 command=self.update_data, bg="#3498db", fg="white")
+                                 command=self.request_update, bg="#3498db", fg="white")
         update_button.pack(side=tk.RIGHT, padx=10, pady=2)
 
     def setup_overview_tab(self, parent):
-        # Frame para os cards de cada moeda
-        self.cards_frame = tk.Frame(parent, bg="#f0f0f0")
-        self.cards_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Criando cards para cada símbolo
-        self.symbol_frames = {}
-        for symbol in self.symbols:
-            card = tk.Frame(self.cards_frame, bg="white", relief=tk.RAISED, borderwidth=1)
-            card.pack(fill=tk.X, pady=5, padx=5)
-            
-            # Cabeçalho do card
-            header = tk.Frame(card, bg="#3498db")
-            header.pack(fill=tk.X)
-            
-            name_label = tk.Label(header, text=symbol, font=("Arial", 12, "bold"), 
-                                 bg="#3498db", fg="white")
-            name_label.pack(pady=5)
-            
-            # Conteúdo do card
-            content = tk.Frame(card, bg="white")
-            content.pack(fill=tk.X, padx=10, pady=10)
-            
-            # Layout em grid para os dados
-            content.columnconfigure(0, weight=1)
-            content.columnconfigure(1, weight=1)
-            
-            # Rótulos para os dados
-            price_label = tk.Label(content, text="Preço Atual:", font=("Arial", 10, "bold"), 
-                                  bg="white", anchor="w")
-            price_label.grid(row=0, column=0, sticky="w", pady=2)
-            
-            change_label = tk.Label(content, text="Variação 24h:", font=("Arial", 10, "bold"), 
-                                   bg="white", anchor="w")
-            change_label.grid(row=1, column=0, sticky="w", pady=2)
-            
-            volume_label = tk.Label(content, text="Volume 24h:", font=("Arial", 10, "bold"), 
-                                   bg="white", anchor="w")
-            volume_label.grid(row=2, column=0, sticky="w", pady=2)
-            
-            high_label = tk.Label(content, text="Máxima 24h:", font=("Arial", 10, "bold"), 
-                                 bg="white", anchor="w")
-            high_label.grid(row=3, column=0, sticky="w", pady=2)
-            
-            low_label = tk.Label(content, text="Mínima 24h:", font=("Arial", 10, "bold"), 
-                                bg="white", anchor="w")
-            low_label.grid(row=4, column=0, sticky="w", pady=2)
-            
-            # Valores (serão atualizados)
-            price_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
-                                  bg="white", anchor="e")
-            price_value.grid(row=0, column=1, sticky="e", pady=2)
-            
-            change_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
-                                   bg="white", anchor="e")
-            change_value.grid(row=1, column=1, sticky="e", pady=2)
-            
-            volume_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
-                                   bg="white", anchor="e")
-            volume_value.grid(row=2, column=1, sticky="e", pady=2)
-            
-            high_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
-                                 bg="white", anchor="e")
-            high_value.grid(row=3, column=1, sticky="e", pady=2)
-            
-            low_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
-                                bg="white", anchor="e")
-            low_value.grid(row=4, column=1, sticky="e", pady=2)
-            
-            # Tabela para os últimos candles
-            table_label = tk.Label(card, text="Últimos Candles", font=("Arial", 10, "bold"), 
-                                  bg="white")
-            table_label.pack(pady=(10, 5))
-            
-            # Frame para a tabela
-            table_frame = tk.Frame(card, bg="white")
-            table_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
-            
-            # Treeview para os dados dos candles
-            columns = ("Tempo", "Abertura", "Máxima", "Mínima", "Fechamento", "Volume")
-            tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=5)
+        # Barra de filtro e ordenação
+        controls = tk.Frame(parent, bg="#f0f0f0")
+        controls.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        tk.Label(controls, text="Filtrar:", bg="#f0f0f0").pack(side=tk.LEFT)
+        self.filter_text = tk.StringVar()
+        filter_entry = tk.Entry(controls, textvariable=self.filter_text, width=15)
+        filter_entry.pack(side=tk.LEFT, padx=(5, 15))
+        self.filter_text.trace_add("write", lambda *args: self.refresh_overview())
+        
+        # Limites mínimos de |variação 24h| (%) e de volume 24h na moeda de cotação
+        tk.Label(controls, text="Variação mín. (%):", bg="#f0f0f0").pack(side=tk.LEFT)
+        self.min_change = tk.StringVar()
+        tk.Entry(controls, textvariable=self.min_change, width=6).pack(side=tk.LEFT, padx=(5, 15))
+        self.min_change.trace_add("write", lambda *args: self.refresh_overview())
+        
+        tk.Label(controls, text="Volume mín.:", bg="#f0f0f0").pack(side=tk.LEFT)
+        self.min_volume = tk.StringVar()
+        tk.Entry(controls, textvariable=self.min_volume, width=10).pack(side=tk.LEFT, padx=(5, 15))
+        self.min_volume.trace_add("write", lambda *args: self.refresh_overview())
+        
+        tk.Label(controls, text="Ordenar por:", bg="#f0f0f0").pack(side=tk.LEFT)
+        self.sort_options = {
+            "Símbolo": None,
+            "Maior variação 24h": ("change", True),
+            "Menor variação 24h": ("change", False),
+            "Maior volume 24h": ("volume", True),
+        }
+        self.sort_by = tk.StringVar()
+        self.sort_by.set("Símbolo")
+        sort_dropdown = ttk.Combobox(controls, textvariable=self.sort_by,
+                                     values=list(self.sort_options), state="readonly")
+        sort_dropdown.pack(side=tk.LEFT, padx=5)
+        sort_dropdown.bind("<<ComboboxSelected>>", lambda event: self.refresh_overview())
+        
+        # Lista virtualizada: só existem cards para as linhas visíveis, e eles
+        # são reaproveitados para outros símbolos durante a rolagem
+        container = tk.Frame(parent, bg="#f0f0f0")
+        container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        self.cards_canvas = tk.Canvas(container, bg="#f0f0f0", highlightthickness=0,
+                                      yscrollincrement=20)
+        scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL, command=self.cards_canvas.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.cards_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.card_pool = []
+        self.visible_cards = {}
+        self.overview_rows = list(self.symbols)
+        
+        # Altura de cada linha medida a partir de um card real
+        self.card_pool.append(self.create_card(self.cards_canvas))
+        self.card_pool[0]["frame"].update_idletasks()
+        self.row_height = self.card_pool[0]["frame"].winfo_reqheight() + 10
+        
+        def on_yscroll(first, last):
+            scrollbar.set(first, last)
+            self.layout_overview()
+        
+        self.cards_canvas.configure(yscrollcommand=on_yscroll)
+        self.cards_canvas.bind("<Configure>", lambda event: self.layout_overview())
+        self.cards_canvas.bind("<Enter>", self._bind_mousewheel)
+        self.cards_canvas.bind("<Leave>", self._unbind_mousewheel)
+        
+        self.refresh_overview()
+
+    def create_card(self, parent):
+        """Cria um card reaproveitável (sem símbolo associado)"""
+        card = tk.Frame(parent, bg="white", relief=tk.RAISED, borderwidth=1)
+        
+        # Cabeçalho do card
+        header = tk.Frame(card, bg="#3498db")
+        header.pack(fill=tk.X)
+        
+        name_label = tk.Label(header, text="", font=("Arial", 12, "bold"), 
+                             bg="#3498db", fg="white")
+        name_label.pack(pady=5)
+        
+        # Conteúdo do card
+        content = tk.Frame(card, bg="white")
+        content.pack(fill=tk.X, padx=10, pady=10)
+        
+        # Layout em grid para os dados
+        content.columnconfigure(0, weight=1)
+        content.columnconfigure(1, weight=1)
+        
+        # Rótulos para os dados
+        price_label = tk.Label(content, text="Preço Atual:", font=("Arial", 10, "bold"), 
+                              bg="white", anchor="w")
+        price_label.grid(row=0, column=0, sticky="w", pady=2)
+        
+        change_label = tk.Label(content, text="Variação 24h:", font=("Arial", 10, "bold"), 
+                               bg="white", anchor="w")
+        change_label.grid(row=1, column=0, sticky="w", pady=2)
+        
+        volume_label = tk.Label(content, text="Volume 24h:", font=("Arial", 10, "bold"), 
+                               bg="white", anchor="w")
+        volume_label.grid(row=2, column=0, sticky="w", pady=2)
+        
+        high_label = tk.Label(content, text="Máxima 24h:", font=("Arial", 10, "bold"), 
+                             bg="white", anchor="w")
+        high_label.grid(row=3, column=0, sticky="w", pady=2)
+        
+        low_label = tk.Label(content, text="Mínima 24h:", font=("Arial", 10, "bold"), 
+                            bg="white", anchor="w")
+        low_label.grid(row=4, column=0, sticky="w", pady=2)
+        
+        # Valores (serão atualizados)
+        price_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
+                              bg="white", anchor="e")
+        price_value.grid(row=0, column=1, sticky="e", pady=2)
+        
+        change_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
+                               bg="white", anchor="e")
+        change_value.grid(row=1, column=1, sticky="e", pady=2)
+        
+        volume_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
+                               bg="white", anchor="e")
+        volume_value.grid(row=2, column=1, sticky="e", pady=2)
+        
+        high_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
+                             bg="white", anchor="e")
+        high_value.grid(row=3, column=1, sticky="e", pady=2)
+        
+        low_value = tk.Label(content, text="Carregando...", font=("Arial", 10), 
+                            bg="white", anchor="e")
+        low_value.grid(row=4, column=1, sticky="e", pady=2)
+        
+        # Tabela para os últimos candles
+        table_label = tk.Label(card, text="Últimos Candles", font=("Arial", 10, "bold"), 
+                              bg="white")
+        table_label.pack(pady=(10, 5))
+        
+        # Frame para a tabela
+        table_frame = tk.Frame(card, bg="white")
+        table_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        # Treeview para os dados dos candles
+        columns = ("Tempo", "Abertura", "Máxima", "Mínima", "Fechamento", "Volume")
+        tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=5)
+        
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=80, anchor="center")
+        
+        tree.pack(fill=tk.X)
+        
+        # Armazenamos as referências para atualização posterior
+        card_widgets = {
+            "frame": card,
+            "name": name_label,
+            "price": price_value,
+            "change": change_value,
+            "volume": volume_value,
+            "high": high_value,
+            "low": low_value,
+            "tree": tree,
+            "symbol": None,
+        }
+        card_widgets["window"] = self.cards_canvas.create_window(0, 0, window=card, anchor="nw",
+                                                                  state="hidden")
+        return card_widgets
+
+    def overview_thresholds(self):
+        """Limites de variação e volume digitados na visão geral (None: campo vazio ou inválido)"""
+        limits = []
+        for var in (self.min_change, self.min_volume):
+            try:
+                limits.append(float(var.get().strip().replace(',', '.')))
+            except ValueError:
+                limits.append(None)
+        return limits
+
+    def refresh_overview(self):
+        """Reaplica os filtros e a ordenação da visão geral"""
+        text = self.filter_text.get().strip().upper()
+        min_change, min_volume = self.overview_thresholds()
+        rows = [symbol for symbol in self.symbols
+                if text in symbol and passes_thresholds(self.snapshots.peek(symbol), min_change, min_volume)]
+        
+        sort_option = self.sort_options.get(self.sort_by.get())
+        if sort_option:
+            field, descending = sort_option
             
-            for col in columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=80, anchor="center")
+            def sort_key(symbol):
+                snapshot = self.snapshots.peek(symbol)
+                value = getattr(snapshot, field) if snapshot is not None else None
+                # Símbolos ainda sem dados ficam no fim da lista
+                if value is None:
+                    return (1, 0)
+                return (0, -value if descending else value)
             
-            tree.pack(fill=tk.X)
+            rows.sort(key=sort_key)
+        
+        self.overview_rows = rows
+        self.cards_canvas.configure(scrollregion=(0, 0, 0, len(rows) * self.row_height))
+        self.layout_overview(rebind=True)
+
+    def layout_overview(self, rebind=False):
+        """Posiciona os cards do pool nas linhas visíveis e os associa aos símbolos"""
+        canvas = self.cards_canvas
+        height = max(canvas.winfo_height(), self.row_height)
+        width = canvas.winfo_width()
+        
+        # Cards suficientes para preencher a área visível (mais um parcialmente visível)
+        while len(self.card_pool) < height // self.row_height + 2:
+            self.card_pool.append(self.create_card(canvas))
+        
+        first = max(0, int(canvas.canvasy(0) // self.row_height))
+        self.visible_cards = {}
+        for offset, card in enumerate(self.card_pool):
+            row = first + offset
+            if row >= len(self.overview_rows):
+                canvas.itemconfigure(card["window"], state="hidden")
+                card["symbol"] = None
+                continue
             
-            # Armazenamos as referências para atualização posterior
-            self.symbol_frames[symbol] = {
-                "price": price_value,
-                "change": change_value,
-                "volume": volume_value,
-                "high": high_value,
-                "low": low_value,
-                "tree": tree
-            }
+            symbol = self.overview_rows[row]
+            canvas.coords(card["window"], 5, row * self.row_height + 5)
+            canvas.itemconfigure(card["window"], width=max(width - 10, 1), state="normal")
+            if rebind or card["symbol"] != symbol:
+                self.bind_card(card, symbol)
+            self.visible_cards[symbol] = card
+
+    def bind_card(self, card, symbol):
+        """Associa um card do pool a um símbolo e exibe o último snapshot conhecido"""
+        card["symbol"] = symbol
+        self.differ.set_label(card["name"], symbol)
+        
+        snapshot = self.snapshots.get(symbol)
+        if snapshot is None or snapshot.ticker is None:
+            for field in ("price", "change", "volume", "high", "low"):
+                self.differ.set_label(card[field], "Carregando...", "black")
+        if snapshot is None or snapshot.candles is None:
+            self.differ.set_rows(card["tree"], [])
+        if snapshot is not None:
+            self.apply_card(card, snapshot)
+
+    def apply_card(self, card, snapshot):
+        if snapshot.ticker:
+            for field, text, color in snapshot.ticker:
+                self.differ.set_label(card[field], text, color or "black")
+        
+        if snapshot.candles:
+            # Rolar a tabela: inserir o candle novo no topo e remover o mais antigo
+            self.differ.set_rows(card["tree"], snapshot.candles)
+
+    def _bind_mousewheel(self, event):
+        self.cards_canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.cards_canvas.bind_all("<Button-4>", self._on_mousewheel)
+        self.cards_canvas.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.cards_canvas.unbind_all(sequence)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.cards_canvas.yview_scroll(-1, "units")
+        else:
+            self.cards_canvas.yview_scroll(1, "units")
 
     def setup_charts_tab(self, parent):
         # Frame para gráficos
@@ -191,7 +465,37 @@ class BinanceMonitor:
         symbol_dropdown = ttk.Combobox(selector_frame, textvariable=self.selected_symbol, 
                                       values=self.symbols, state="readonly")
         symbol_dropdown.pack(side=tk.LEFT, padx=10)
-        symbol_dropdown.bind("<<ComboboxSelected>>", self.update_chart)
+        symbol_dropdown.bind("<<ComboboxSelected>>", self.change_chart_symbol)
+        
+        # Dropdown para o tipo de gráfico
+        tk.Label(selector_frame, text="Tipo:", bg="#f0f0f0").pack(side=tk.LEFT)
+        
+        self.chart_styles = {"Linha": "line", "Candles": "candles"}
+        self.selected_style = tk.StringVar()
+        self.selected_style.set("Linha")
+        
+        style_dropdown = ttk.Combobox(selector_frame, textvariable=self.selected_style, 
+                                     values=list(self.chart_styles), state="readonly", width=10)
+        style_dropdown.pack(side=tk.LEFT, padx=10)
+        style_dropdown.bind("<<ComboboxSelected>>", self.change_chart_style)
+        
+        # Dropdown para o intervalo dos candles (derivado do intervalo base, sem novas buscas por ciclo)
+        tk.Label(selector_frame, text="Intervalo:", bg="#f0f0f0").pack(side=tk.LEFT)
+        
+        self.selected_interval = tk.StringVar()
+        self.selected_interval.set(self.interval)
+        
+        self.interval_dropdown = interval_dropdown = ttk.Combobox(selector_frame, textvariable=self.selected_interval,
+                                        values=self.chart_intervals, state="readonly", width=5)
+        interval_dropdown.pack(side=tk.LEFT, padx=10)
+        interval_dropdown.bind("<<ComboboxSelected>>", self.change_interval)
+        
+        # Sobreposição dos indicadores técnicos
+        self.show_indicators = tk.BooleanVar(value=False)
+        tk.Checkbutton(selector_frame, text="Indicadores", variable=self.show_indicators,
+                       command=self.toggle_indicators, bg="#f0f0f0").pack(side=tk.LEFT, padx=10)
+        self.indicator_label = tk.Label(selector_frame, text="", bg="#f0f0f0", fg="#555555")
+        self.indicator_label.pack(side=tk.LEFT, padx=10)
         
         # Frame para o gráfico
         self.chart_frame = tk.Frame(charts_container, bg="white")
@@ -201,179 +505,424 @@ class BinanceMonitor:
         self.fig = Figure(figsize=(5, 4), dpi=100)
         self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
+        
+        # Barra de ferramentas para zoom e deslocamento
+        toolbar = NavigationToolbar2Tk(self.canvas, self.chart_frame, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Renderizador incremental (artistas persistentes + blitting)
+        self.renderer = ChartRenderer(self.fig, self.ax, self.canvas)
+        
         # Inicialmente o gráfico está vazio
-        self.ax.set_title(f"Carregando dados para {self.selected_symbol.get()}")
-        self.fig.tight_layout()
-        self.canvas.draw()
+        self.renderer.show_message(f"Carregando dados para {self.selected_symbol.get()}")
 
-    def get_ticker_data(self, symbol):
-        """Obtém dados atuais de preço e volume para um símbolo"""
-        endpoint = f'/ticker/24hr'
-        params = {'symbol': symbol}
+    def setup_book_tab(self, parent):
+        container = tk.Frame(parent, bg="#f0f0f0")
+        container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        try:
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Erro ao obter ticker para {symbol}: {e}")
-            return None
-    
-    def get_kline_data(self, symbol):
-        """Obtém dados de candles para um símbolo específico"""
-        endpoint = f'/klines'
-        params = {
-            'symbol': symbol,
-            'interval': self.interval,
-            'limit': 30  # Últimos 30 candles para o gráfico
-        }
+        # Seleção da moeda
+        selector_frame = tk.Frame(container, bg="#f0f0f0")
+        selector_frame.pack(fill=tk.X, pady=(0, 10))
         
-        try:
-            response = requests.get(f"{self.base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+        tk.Label(selector_frame, text="Selecione a moeda:", bg="#f0f0f0").pack(side=tk.LEFT)
+        
+        self.book_symbol = tk.StringVar()
+        self.book_symbol.set(self.symbols[0])
+        # Cópia lida pela thread de snapshots (variáveis do Tk só na thread do Tk)
+        self.book_symbol_name = self.symbols[0]
+        
+        book_dropdown = ttk.Combobox(selector_frame, textvariable=self.book_symbol,
+                                    values=self.symbols, state="readonly")
+        book_dropdown.pack(side=tk.LEFT, padx=10)
+        book_dropdown.bind("<<ComboboxSelected>>", self.change_book_symbol)
+        
+        # Resumo: melhor compra/venda, spread e profundidade
+        summary = tk.Frame(container, bg="white", relief=tk.RAISED, borderwidth=1)
+        summary.pack(fill=tk.X, pady=(0, 10))
+        
+        self.book_labels = {}
+        fields = [("bid", "Melhor Compra:"), ("ask", "Melhor Venda:"),
+                  ("spread", "Spread:"), ("depth", "Profundidade ±1%:")]
+        for column, (key, text) in enumerate(fields):
+            summary.columnconfigure(column, weight=1)
+            tk.Label(summary, text=text, font=("Arial", 10, "bold"), bg="white").grid(
+                row=0, column=column, pady=(5, 0))
+            value = tk.Label(summary, text="Carregando...", font=("Arial", 10), bg="white")
+            value.grid(row=1, column=column, pady=(0, 5))
+            self.book_labels[key] = value
+        
+        # Tabelas de compras e vendas lado a lado
+        tables = tk.Frame(container, bg="#f0f0f0")
+        tables.pack(fill=tk.BOTH, expand=True)
+        tables.columnconfigure(0, weight=1)
+        tables.columnconfigure(1, weight=1)
+        
+        self.book_trees = {}
+        columns = ("Preço", "Quantidade", "Total")
+        for column, (side, title, color) in enumerate([("bids", "Compras", "green"),
+                                                       ("asks", "Vendas", "red")]):
+            frame = tk.Frame(tables, bg="#f0f0f0")
+            frame.grid(row=0, column=column, sticky="nsew", padx=5)
+            tk.Label(frame, text=title, font=("Arial", 10, "bold"), bg="#f0f0f0",
+                     fg=color).pack(pady=(0, 5))
             
-            # Converter para DataFrame
-            df = pd.DataFrame(data, columns=[
-                'open_time', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+            tree = ttk.Treeview(frame, columns=columns, show="headings", height=self.book_levels)
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=100, anchor="center")
+            tree.pack(fill=tk.BOTH, expand=True)
+            self.book_trees[side] = tree
+        
+        self.book_status = tk.Label(container, text="", bg="#f0f0f0", fg="#555555", anchor="w")
+        self.book_status.pack(fill=tk.X, pady=(5, 0))
+
+    def on_tab_changed(self, event=None):
+        if self.tab_control.select() == str(self.book_tab) and not self.book_started:
+            self.start_order_book()
+
+    def start_order_book(self):
+        """Inicia a sincronização dos livros (stream diff-depth ou, sem websocket-client, snapshots)"""
+        self.book_started = True
+        try:
+            self.depth_stream = BinanceStream(self.symbols, self.base_interval,
+                                              on_depth=self.order_books.on_depth,
+                                              on_reconnect=self.order_books.resync,
+                                              ws_url=self.ws_url)
+        except ImportError as e:
+            print(f"{e}. Livro de ofertas atualizado por snapshots a cada {self.book_poll_interval} segundos.")
+            threading.Thread(target=self.poll_order_book, daemon=True).start()
+        else:
+            self.order_books.resync()
+            self.depth_stream.start()
+        self.root.after(self.book_refresh_ms, self.refresh_order_book)
+
+    def change_book_symbol(self, event=None):
+        self.book_symbol_name = self.book_symbol.get()
+        self.draw_order_book(force=True)
+
+    def poll_order_book(self):
+        """Sem stream: recarrega o snapshot da moeda selecionada periodicamente"""
+        while self.is_running:
+            self.order_books.refresh(self.book_symbol_name)
+            time.sleep(self.book_poll_interval)
+
+    def refresh_order_book(self):
+        self.draw_order_book()
+        if self.is_running:
+            self.root.after(self.book_refresh_ms, self.refresh_order_book)
+
+    def draw_order_book(self, force=False):
+        """Redesenha a aba do livro de ofertas se o livro mudou desde o último quadro"""
+        book = self.order_books.get(self.book_symbol.get())
+        with book.lock:
+            version = (book.symbol, book.last_update_id, book.synced)
+            if not force and version == self._book_version:
+                return
+            # Cópias dos níveis do topo; a formatação acontece fora do lock
+            bids = book.bids.cumulative(self.book_levels) + (book.bids.top(self.book_levels)[1].copy(),)
+            asks = book.asks.cumulative(self.book_levels) + (book.asks.top(self.book_levels)[1].copy(),)
+            best_bid, best_ask = book.best_bid(), book.best_ask()
+            spread, depth = book.spread(), book.depth_within(1)
+            synced, updates = book.synced, book.updates
+        
+        self._book_version = version
+        for side, (prices, totals, quantities) in (("bids", bids), ("asks", asks)):
+            self.differ.set_slots(self.book_trees[side], [
+                (format_price(price), f"{qty:.6f}", f"{total:.6f}")
+                for price, qty, total in zip(prices, quantities, totals)
             ])
-            
-            # Converter timestamps para datetime
-            df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-            df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-            
-            # Converter valores numéricos
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
-                
-            return df
         
+        self.differ.set_label(self.book_labels["bid"],
+                              format_price(best_bid[0]) if best_bid else "-", "green")
+        self.differ.set_label(self.book_labels["ask"],
+                              format_price(best_ask[0]) if best_ask else "-", "red")
+        self.differ.set_label(self.book_labels["spread"],
+                              f"{format_price(spread[0])} ({spread[1]:.4f}%)" if spread else "-")
+        self.differ.set_label(self.book_labels["depth"], f"{depth[0]:.4f} / {depth[1]:.4f}")
+        self.differ.set_label(self.book_status,
+                              f"Sincronizado ({updates} atualizações aplicadas)" if synced
+                              else "Sincronizando com o snapshot do /depth...")
+
+    def get_tickers_data(self):
+        """Obtém os tickers de todos os símbolos em requisições agrupadas"""
+        try:
+            return self.client.get_tickers(self.symbols)
+        except Exception as e:
+            print(f"Erro ao obter tickers: {e}")
+            return {}
+    
+    def get_kline_rows(self, symbol):
+        """Obtém os últimos candles (formato /klines), buscando só os novos"""
+        # Só o intervalo base é buscado a cada ciclo; o histórico do intervalo
+        # exibido é buscado uma única vez (o peso do /klines não depende do limit)
+        try:
+            self.aggregator.fetch(self.client, symbol, MAX_KLINES_LIMIT, self.base_history)
+            return self.kline_cache.rows(symbol, self.interval, self.kline_limit)
         except Exception as e:
             print(f"Erro ao obter dados para {symbol}: {e}")
             return None
+    
+    def get_kline_data(self, symbol):
+        """Obtém dados de candles para um símbolo específico"""
+        rows = self.get_kline_rows(symbol)
+        if rows is None:
+            return None
+        return klines_to_dataframe(rows)
+
+    def change_chart_symbol(self, event=None):
+        """Troca o símbolo do gráfico; o gráfico dele é montado sob demanda a partir do cache"""
+        symbol = self.chart_symbol = self.selected_symbol.get()
+        self.renderer.show_message(f"Carregando dados para {symbol}")
+        threading.Thread(target=self.publish_symbol, args=(symbol,), daemon=True).start()
 
     def update_chart(self, event=None):
         symbol = self.selected_symbol.get()
         
-        # Limpar o gráfico anterior
-        self.ax.clear()
+        # Snapshots válidos são desenhados na hora; senão a busca é feita fora da thread do Tk
+        snapshot = self.snapshots.get(symbol)
+        if snapshot is not None and snapshot.chart is not None:
+            self.draw_chart(symbol, snapshot.chart, snapshot.overlays, snapshot.interval)
+            self.show_indicator_values(snapshot.indicators)
+        else:
+            self.renderer.show_message(f"Carregando dados para {symbol}")
+            threading.Thread(target=self.publish_symbol, args=(symbol,), daemon=True).start()
+
+    def draw_chart(self, symbol, df, overlays=None, interval=None):
+        self.renderer.render(symbol, df, overlays, interval)
+
+    def toggle_indicators(self):
+        self.renderer.set_overlays_visible(self.show_indicators.get())
+        self.update_chart()
+
+    def show_indicator_values(self, values):
+        """Exibe RSI, MACD e ATR (fora da escala do preço) ao lado dos controles do gráfico"""
+        if not values or not self.show_indicators.get():
+            self.differ.set_label(self.indicator_label, "")
+            return
+        
+        engine = self.indicators
+        fmt = lambda value: "-" if value != value else f"{value:.4f}"  # NaN: janela incompleta
+        self.differ.set_label(self.indicator_label,
+                              f"RSI({engine.rsi_period}) {fmt(values['rsi'])}  "
+                              f"MACD {fmt(values['macd'])}/{fmt(values['macd_signal'])}  "
+                              f"ATR({engine.atr_period}) {fmt(values['atr'])}")
+
+    def change_chart_style(self, event=None):
+        self.renderer.set_style(self.chart_styles[self.selected_style.get()])
+        self.update_chart()
+
+    def change_interval(self, event=None):
+        """Troca o intervalo exibido; os candles são montados a partir do intervalo base em cache"""
+        interval = self.selected_interval.get()
+        if interval == self.interval:
+            return
+        self.renderer.show_message(f"Carregando candles de {interval} para {self.selected_symbol.get()}")
+        self.status_label.config(text="Atualizando dados...")
         
-        # Buscar dados
-        df = self.get_kline_data(symbol)
+        def switch():
+            # Montar o novo intervalo para todos os símbolos fora da thread do Tk
+            self.aggregator.add_interval(interval)
+            self.interval = interval
+            if self.attach:
+                # Sem acesso à API: republicar o que já foi recebido do coletor
+                with self._stream_lock:
+                    self._pending_klines.update(self.symbols)
+            self._refresh_event.set()
         
-        if df is not None and not df.empty:
-            # Criar gráfico de preço
-            self.ax.plot(df['open_time'], df['close'], label='Preço de Fechamento', color='#3498db')
-            
-            # Configurações do gráfico
-            self.ax.set_title(f"Histórico de Preço para {symbol}")
-            self.ax.set_xlabel('Data/Hora')
-            self.ax.set_ylabel('Preço (USDT)')
-            self.ax.grid(True, linestyle='--', alpha=0.7)
-            
-            # Formatar o eixo x para mostrar apenas algumas datas
-            self.ax.set_xticks(df['open_time'][::5])
-            self.ax.set_xticklabels([d.strftime('%H:%M') for d in df['open_time'][::5]], rotation=45)
-            
-            self.fig.tight_layout()
-            self.canvas.draw()
-        else:
-            self.ax.set_title(f"Erro ao carregar dados para {symbol}")
-            self.canvas.draw()
+        threading.Thread(target=switch, daemon=True).start()
 
     def update_data(self):
+        """Busca todos os símbolos e publica os snapshots (executado fora da thread do Tk)"""
+        # Buscar tickers (agrupados) e candles de todos os símbolos em paralelo
+        calls = [self.get_tickers_data]
+        calls += [partial(self.get_kline_data, symbol) for symbol in self.symbols]
+        results = fetch_concurrently(calls, self.max_workers)
+        tickers = results[0]
+        
+        with self._stream_lock:
+            self._tickers.update(tickers)
+        
+        for symbol, kline_data in zip(self.symbols, results[1:]):
+            chart_data, overlays, indicators = self.chart_fields(symbol, kline_data is not None)
+            self.publish(build_snapshot(symbol, tickers.get(symbol), kline_data, chart_data,
+                                        overlays, indicators, self.interval))
+        
+        if self.streaming:
+            status = self.stream_status
+        else:
+            status = f"Dados atualizados com sucesso. Próxima atualização em {self.update_interval} segundos."
+        self.updates.put(CycleSnapshot(
+            time_text=f"Última atualização: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            status_text=status))
+
+    def publish_symbol(self, symbol):
+        """Publica o snapshot de um único símbolo, buscando os candles só se não estiverem em cache"""
+        kline_data = self.kline_cache.to_dataframe(symbol, self.interval, self.kline_limit)
+        if kline_data.empty:
+            # Conectado a um coletor: usar apenas o que ele já enviou
+            kline_data = None if self.attach else self.get_kline_data(symbol)
+        chart_data, overlays, indicators = self.chart_fields(symbol, kline_data is not None)
+        self.publish(build_snapshot(symbol, kline_data=kline_data, chart_data=chart_data,
+                                    overlays=overlays, indicators=indicators, interval=self.interval))
+
+    def chart_data(self, symbol):
+        """Histórico completo em cache usado pelo gráfico"""
+        return self.kline_cache.to_dataframe(symbol, self.interval, self.chart_history)
+
+    def chart_fields(self, symbol, has_klines=True):
+        """
+        Gráfico, sobreposições e indicadores de um símbolo
+
+        Só o símbolo exibido na aba de gráficos é calculado (DataFrame do
+        histórico completo e séries dos indicadores); os demais recebem None
+        e são montados sob demanda ao serem selecionados (change_chart_symbol).
+
+        Returns:
+            Tupla (chart_data, overlays, indicators)
+        """
+        if not has_klines or symbol != self.chart_symbol:
+            return None, None, None
+        chart_data = self.chart_data(symbol)
+        if chart_data.empty:
+            return None, None, None
+        overlays = self.chart_overlays({symbol: chart_data}).get(symbol)
+        return chart_data, overlays, self.indicator_values(symbol, chart_data)
+
+    def chart_overlays(self, charts):
+        """Séries dos indicadores sobrepostos ao gráfico, calculadas em lote para vários símbolos"""
+        computed = self.indicators.compute_batch(charts)
+        return {symbol: {name: values[name] for name in OVERLAY_STYLES}
+                for symbol, values in computed.items()}
+
+    def indicator_values(self, symbol, chart_data):
+        """Valores mais recentes dos indicadores (atualização O(1) por candle novo)"""
+        if chart_data is None:
+            return None
+        return self.indicators.update((symbol, self.interval), chart_data)
+
+    def publish(self, snapshot):
+        """Armazena o snapshot e o envia para a thread do Tk"""
+        self.snapshots.put(snapshot)
+        # A pirâmide de resoluções do gráfico é calculada aqui, fora da thread do Tk
+        self.renderer.prepare(snapshot.symbol, snapshot.chart, snapshot.interval)
+        self.updates.put(snapshot)
+
+    def publish_stream_updates(self):
+        """Publica os snapshots dos símbolos alterados pelo stream desde o último envio"""
+        with self._stream_lock:
+            tickers = {symbol: self._tickers[symbol] for symbol in self._pending_tickers}
+            klines = set(self._pending_klines)
+            self._pending_tickers.clear()
+            self._pending_klines.clear()
+        
+        changed = [symbol for symbol in self.symbols if symbol in tickers or symbol in klines]
+        for symbol in changed:
+            kline_data = None
+            if symbol in klines:
+                kline_data = self.kline_cache.to_dataframe(symbol, self.interval, self.kline_limit)
+            chart_data, overlays, indicators = self.chart_fields(symbol, symbol in klines)
+            self.publish(build_snapshot(symbol, tickers.get(symbol), kline_data, chart_data,
+                                        overlays, indicators, self.interval))
+        
+        if changed:
+            self.updates.put(CycleSnapshot(
+                time_text=f"Última atualização: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                status_text=self.stream_status))
+
+    def request_update(self):
+        """Pede uma atualização completa imediata à thread de busca"""
         self.status_label.config(text="Atualizando dados...")
-        self.time_label.config(text=f"Última atualização: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        for symbol in self.symbols:
-            # Atualizar ticker data
-            ticker_data = self.get_ticker_data(symbol)
-            if ticker_data:
-                # Atualizar os widgets com os dados
-                frame = self.symbol_frames[symbol]
-                
-                # Formatar o preço com precisão apropriada
-                price = float(ticker_data['lastPrice'])
-                if price < 0.1:
-                    price_str = f"{price:.8f}"
-                elif price < 1:
-                    price_str = f"{price:.6f}"
-                elif price < 100:
-                    price_str = f"{price:.4f}"
-                else:
-                    price_str = f"{price:.2f}"
-                    
-                frame["price"].config(text=price_str)
-                
-                # Variação com cor (verde para positivo, vermelho para negativo)
-                change = float(ticker_data['priceChangePercent'])
-                change_str = f"{change:+.2f}%"
-                if change >= 0:
-                    frame["change"].config(text=change_str, fg="green")
-                else:
-                    frame["change"].config(text=change_str, fg="red")
-                
-                # Outros dados
-                frame["volume"].config(text=f"{float(ticker_data['volume']):.2f}")
-                
-                high = float(ticker_data['highPrice'])
-                if high < 0.1:
-                    high_str = f"{high:.8f}"
-                else:
-                    high_str = f"{high:.4f}"
-                frame["high"].config(text=high_str)
-                
-                low = float(ticker_data['lowPrice'])
-                if low < 0.1:
-                    low_str = f"{low:.8f}"
-                else:
-                    low_str = f"{low:.4f}"
-                frame["low"].config(text=low_str)
+        self._refresh_event.set()
+
+    def poll_updates(self):
+        """Aplica os snapshots da fila sem ultrapassar o orçamento de tempo do quadro"""
+        start = time.perf_counter()
+        deadline = start + self.frame_budget
+        applied = 0
+        
+        while time.perf_counter() < deadline:
+            try:
+                snapshot = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            self.apply_snapshot(snapshot)
+            applied += 1
+        
+        if applied:
+            elapsed = time.perf_counter() - start
+            self.frame_times.append(elapsed)
+            FRAME_SECONDS.observe(elapsed)
+        if self.is_running:
+            self.root.after(self.poll_interval_ms, self.poll_updates)
+
+    def frame_time_stats(self):
+        """Retorna o tempo de quadro (último, médio e máximo) em milissegundos"""
+        if not self.frame_times:
+            return None
+        return {
+            'last': self.frame_times[-1] * 1000,
+            'avg': sum(self.frame_times) / len(self.frame_times) * 1000,
+            'max': max(self.frame_times) * 1000,
+        }
+
+    def apply_snapshot(self, snapshot):
+        if isinstance(snapshot, CycleSnapshot):
+            self.cycles_applied += 1
+            # O intervalo base pode ter sido trocado pelo coletor (on_collector_hello)
+            if tuple(self.interval_dropdown.cget('values')) != tuple(self.chart_intervals):
+                self.interval_dropdown.config(values=self.chart_intervals)
+                self.selected_interval.set(self.interval)
+            self.differ.set_label(self.time_label, snapshot.time_text)
+            stats = self.frame_time_stats()
+            if stats:
+                self.status_label.config(
+                    text=f"{snapshot.status_text} Quadro: {stats['avg']:.1f} ms (máx. {stats['max']:.1f} ms)")
+            else:
+                self.status_label.config(text=snapshot.status_text)
             
-            # Atualizar dados de candles
-            kline_data = self.get_kline_data(symbol)
-            if kline_data is not None and not kline_data.empty:
-                # Limpar a tabela existente
-                tree = self.symbol_frames[symbol]["tree"]
-                for item in tree.get_children():
-                    tree.delete(item)
-                
-                # Adicionar os novos dados (últimos 5 candles)
-                for i in range(min(5, len(kline_data))):
-                    row = kline_data.iloc[i]
-                    time_str = row['open_time'].strftime('%H:%M:%S')
-                    
-                    # Formatar os valores numéricos
-                    values = (
-                        time_str,
-                        f"{row['open']:.6f}",
-                        f"{row['high']:.6f}",
-                        f"{row['low']:.6f}",
-                        f"{row['close']:.6f}",
-                        f"{row['volume']:.2f}"
-                    )
-                    
-                    tree.insert("", 0, values=values)
-        
-        # Atualizar o gráfico se necessário
-        self.update_chart()
+            # Reordenar e refiltrar a visão geral uma vez por ciclo (e não a cada snapshot)
+            if self.sort_options.get(self.sort_by.get()) or any(
+                    limit is not None for limit in self.overview_thresholds()):
+                self.refresh_overview()
+            return
         
-        self.status_label.config(text=f"Dados atualizados com sucesso. Próxima atualização em {self.update_interval} segundos.")
+        # Apenas os símbolos com card visível são atualizados na visão geral
+        card = self.visible_cards.get(snapshot.symbol)
+        if card is not None:
+            self.apply_card(card, snapshot)
+        
+        if snapshot.chart is not None and snapshot.symbol == self.selected_symbol.get():
+            self.draw_chart(snapshot.symbol, snapshot.chart, snapshot.overlays, snapshot.interval)
+            self.show_indicator_values(snapshot.indicators)
 
     def update_loop(self):
+        """Thread produtora: busca e formata os dados fora da thread do Tk"""
+        next_poll = time.monotonic()
         while self.is_running:
             try:
-                # Atualizar dados na thread principal
-                self.root.after(0, self.update_data)
-                # Esperar pelo próximo ciclo
-                time.sleep(self.update_interval)
+                if self.attach:
+                    # Os dados chegam do coletor; nada é buscado na API
+                    self._refresh_event.clear()
+                    self.publish_stream_updates()
+                elif self._refresh_event.is_set() or (not self.streaming and time.monotonic() >= next_poll):
+                    self._refresh_event.clear()
+                    self.update_data()
+                    next_poll = time.monotonic() + self.update_interval
+                elif self.streaming:
+                    self.publish_stream_updates()
+                # Candles fechados do ciclo gravados de uma vez no armazenamento local
+                self.kline_cache.flush()
             except Exception as e:
                 print(f"Erro no loop de atualização: {e}")
+            
+            # Esperar pelo próximo ciclo (ou por um pedido de atualização)
+            if self.streaming or self.attach:
+                timeout = self.stream_flush_interval
+            else:
+                timeout = max(0, next_poll - time.monotonic())
+            self._refresh_event.wait(timeout)
 
     def start_update_thread(self):
         # Iniciar thread para atualização periódica
@@ -381,13 +930,113 @@ class BinanceMonitor:
         self.update_thread.daemon = True
         self.update_thread.start()
     
+    def start_stream(self):
+        # O estado inicial (e a recarga após cada reconexão) vem do update_data via REST
+        self.stream = BinanceStream(self.symbols, self.base_interval,
+                                    on_kline=self.on_stream_kline,
+                                    on_ticker=self.on_stream_ticker,
+                                    on_reconnect=self._refresh_event.set,
+                                    ws_url=self.ws_url)
+        self._refresh_event.set()
+        self.stream.start()
+        self.status_label.config(text="Modo streaming: recebendo atualizações em tempo real.")
+
+    def start_attached(self):
+        # Candles e tickers chegam do coletor e seguem o mesmo caminho do modo streaming
+        self.stream_status = f"Recebendo dados do coletor em {self.attach}."
+        self.subscriber = CollectorSubscriber(self.attach,
+                                              on_klines=self.on_collector_klines,
+                                              on_ticker=self.on_stream_ticker,
+                                              on_hello=self.on_collector_hello)
+        self.subscriber.start()
+        self.status_label.config(text=self.stream_status)
+
+    def on_collector_klines(self, symbol, rows):
+        if self.collector_interval != self.base_interval:
+            return  # Candles de outro intervalo: nunca agregar nem gravar sob o intervalo base
+        self.aggregator.ingest(symbol, rows)
+        self.kline_cache.persist(symbol, self.base_interval, rows)
+        with self._stream_lock:
+            self._pending_klines.add(symbol)
+
+    def on_collector_hello(self, symbols, interval):
+        """Adota o intervalo do coletor como intervalo base (antes de receber os candles)"""
+        self.collector_interval = interval
+        if interval not in INTERVAL_MS:
+            print(f"O coletor publica candles de {interval}, intervalo desconhecido; candles ignorados.")
+            return
+        if interval == self.base_interval:
+            return
+        base_ms = INTERVAL_MS[interval]
+        self.chart_intervals = [interval] + [i for i in self.chart_intervals
+                                             if INTERVAL_MS[i] > base_ms and INTERVAL_MS[i] % base_ms == 0]
+        if self.interval not in self.chart_intervals:
+            self.interval = interval
+        self.base_interval = interval
+        self.kline_cache.clear()
+        self.aggregator = CandleAggregator(self.kline_cache, interval, [self.interval])
+        print(f"O coletor publica candles de {interval}; usando {interval} como intervalo base "
+              f"(intervalos disponíveis: {', '.join(self.chart_intervals)}).")
+
+    def on_stream_kline(self, symbol, row, is_closed):
+        self.aggregator.ingest(symbol, [row])
+        if is_closed:
+            self.kline_cache.persist(symbol, self.base_interval, [row], now_ms=int(row[6]) + 1)
+        with self._stream_lock:
+            self._pending_klines.add(symbol)
+
+    def on_stream_ticker(self, symbol, ticker):
+        with self._stream_lock:
+            self._tickers[symbol] = ticker
+            self._pending_tickers.add(symbol)
+
     def on_closing(self):
         self.is_running = False
+        if self.stream is not None:
+            self.stream.stop()
+        if self.subscriber is not None:
+            self.subscriber.stop()
+        if self.depth_stream is not None:
+            self.depth_stream.stop()
+        self.order_books.close()
+        self.kline_cache.flush()
+        self.client.close()
         self.root.destroy()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monitor gráfico de dados da Binance")
+    parser.add_argument('--stream', action='store_true',
+                        help="Usa os streams WebSocket em vez de polling a cada 5 minutos")
+    parser.add_argument('--ws-url', default=DEFAULT_WS_URL,
+                        help="URL base do servidor WebSocket (ex: servidor local de testes)")
+    parser.add_argument('--store', metavar='DIR',
+                        help="Diretório do histórico local de candles (ver candle_store.py backfill)")
+    parser.add_argument('--attach', nargs='?', const=DEFAULT_ADDRESS, metavar='ENDEREÇO',
+                        help="Recebe os dados de um collector_daemon.py em vez de acessar a API "
+                             f"(padrão: {DEFAULT_ADDRESS})")
+    parser.add_argument('--metrics-port', type=int, nargs='?', const=DEFAULT_METRICS_PORT, metavar='PORTA',
+                        help=f"Exporta métricas no formato Prometheus em http://127.0.0.1:PORTA/metrics "
+                             f"(padrão: {DEFAULT_METRICS_PORT})")
+    parser.add_argument('--chart-history', type=int, default=5000, metavar='CANDLES',
+                        help="Candles mantidos no gráfico por intervalo; com --store, carregados do disco "
+                             "(padrão: 5000, mínimo: 1440; ex: 20160 = duas semanas de 1m)")
+    parser.add_argument('--max-workers', type=int, default=8, metavar='N',
+                        help="Requisições simultâneas por ciclo de atualização (padrão: 8)")
+    args = parser.parse_args()
+    
+    if args.chart_history <= 0:
+        parser.error("--chart-history deve ser um número positivo de candles")
+    if args.max_workers <= 0:
+        parser.error("--max-workers deve ser um número positivo")
+    
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    
     root = tk.Tk()
-    app = BinanceMonitor(root)
+    store = CandleStore(root=args.store) if args.store else None
+    app = BinanceMonitor(root, streaming=args.stream, ws_url=args.ws_url, store=store,
+                         attach=args.attach, chart_history=args.chart_history,
+                         max_workers=args.max_workers)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
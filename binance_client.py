@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from kline_parser import klines_to_columns
+from metrics import REGISTRY
+from rate_limiter import RequestScheduler, request_weight
+
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+]
+
+REQUEST_LATENCY = REGISTRY.histogram('binance_request_duration_seconds',
+                                     'Latência das requisições à API REST', ('endpoint',))
+REQUESTS = REGISTRY.counter('binance_requests_total', 'Respostas recebidas da API REST',
+                            ('endpoint', 'status'))
+RESPONSE_BYTES = REGISTRY.counter('binance_response_bytes_total',
+                                  'Bytes recebidos da API REST (corpo descompactado)', ('endpoint',))
+RETRIES = REGISTRY.counter('binance_request_retries_total',
+                           'Novas tentativas após respostas 429', ('endpoint',))
+USED_WEIGHT = REGISTRY.gauge('binance_used_weight', 'Peso usado na janela de 1 minuto (X-MBX-USED-WEIGHT-1m)')
+
+
+class BinanceClient:
+    def __init__(self, base_url='https://api.binance.com/api/v3', timeout=(3.05, 10),
+                 pool_connections=4, pool_maxsize=16, scheduler=None):
+        """
+        Cliente HTTP compartilhado para a API REST da Binance
+
+        Mantém uma única sessão com conexões keep-alive, evitando um novo
+        handshake TCP+TLS a cada requisição.
+
+        Args:
+            base_url: URL base da API (padrão: API v3 pública da Binance)
+            timeout: Timeout em segundos, ou tupla (conexão, leitura)
+            pool_connections: Número de pools de conexão (um por host)
+            pool_maxsize: Máximo de conexões mantidas abertas por host
+            scheduler: RequestScheduler que controla o peso usado; pode ser
+                compartilhado entre clientes que usam o mesmo IP
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Contadores de latência por endpoint
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def get(self, endpoint, params=None):
+        """
+        Executa um GET no endpoint e retorna o JSON decodificado
+
+        Toda requisição passa pelo scheduler de peso; respostas 429 são
+        repetidas após o Retry-After (com jitter) até `max_retries` vezes.
+        Exceções de rede e HTTP (requests.exceptions.RequestException) são
+        propagadas para que cada chamador decida como tratá-las.
+        """
+        weight = request_weight(endpoint, params)
+
+        for attempt in range(self.scheduler.max_retries + 1):
+            self.scheduler.acquire(weight)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(f"{self.base_url}{endpoint}", params=params,
+                                            timeout=self.timeout)
+            finally:
+                self._record(endpoint, time.perf_counter() - start)
+            self.scheduler.update_from_headers(response.headers)
+            REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+            USED_WEIGHT.set(self.scheduler.used_weight)
+
+            # 429: limite excedido; 418: IP banido temporariamente (não repetir)
+            if response.status_code in (429, 418):
+                delay = self.scheduler.backoff(attempt, response.headers.get('Retry-After'))
+                print(f"Limite de requisições atingido ({response.status_code}) em {endpoint}. "
+                      f"Requisições suspensas por {delay:.1f} segundos.")
+                if response.status_code == 429 and attempt < self.scheduler.max_retries:
+                    RETRIES.inc(endpoint=endpoint)
+                    continue
+
+            response.raise_for_status()
+            RESPONSE_BYTES.inc(len(response.content), endpoint=endpoint)
+            return response.json()
+
+    def get_tickers(self, symbols, chunk_size=20, max_workers=4):
+        """
+        Obtém o ticker 24h de vários símbolos com o parâmetro `symbols`
+
+        Os símbolos são divididos em blocos de `chunk_size`; até 20 símbolos
+        por requisição o peso cobrado pela Binance é o mínimo (2). Se um bloco
+        falhar (ex: um símbolo inválido faz a Binance rejeitar o bloco todo),
+        os símbolos dele são pedidos um a um, sem perder os demais blocos.
+        O erro só é propagado se nenhum ticker for obtido.
+
+        Returns:
+            Dicionário símbolo -> ticker
+        """
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        errors = []
+        calls = [partial(self._get_ticker_chunk, chunk, errors) for chunk in chunks]
+
+        tickers = {}
+        for data in fetch_concurrently(calls, max_workers):
+            for ticker in data:
+                tickers[ticker['symbol']] = ticker
+        if errors and not tickers:
+            raise errors[-1]
+        return tickers
+
+    def _get_ticker_chunk(self, chunk, errors):
+        """Busca um bloco de tickers; em caso de erro, busca cada símbolo separadamente"""
+        try:
+            return self.get('/ticker/24hr', params={'symbols': json.dumps(chunk, separators=(',', ':'))})
+        except requests.exceptions.RequestException as e:
+            errors.append(e)
+            if len(chunk) == 1:
+                print(f"Erro ao obter o ticker de {chunk[0]}: {e}")
+                return []
+            print(f"Erro ao obter tickers de {len(chunk)} símbolos ({e}); buscando um a um")
+
+        data = []
+        for symbol in chunk:
+            try:
+                data.append(self.get('/ticker/24hr', params={'symbol': symbol}))
+            except requests.exceptions.RequestException as e:
+                errors.append(e)
+                print(f"Erro ao obter o ticker de {symbol}: {e}")
+        return data
+
+    def _record(self, endpoint, elapsed):
+        REQUEST_LATENCY.observe(elapsed, endpoint=endpoint)
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, {
+                'count': 0, 'total': 0.0, 'last': 0.0, 'max': 0.0
+            })
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['last'] = elapsed
+            stats['max'] = max(stats['max'], elapsed)
+
+    def stats(self):
+        """Retorna um resumo da latência (em segundos) de cada endpoint"""
+        with self._stats_lock:
+            return {
+                endpoint: dict(stats, avg=stats['total'] / stats['count'])
+                for endpoint, stats in self._stats.items()
+            }
+
+    def close(self):
+        self.session.close()
+
+
+def klines_to_dataframe(data):
+    """Converte a resposta de /klines em um DataFrame com todas as colunas tipadas"""
+    columns = klines_to_columns(data)
+
+    # Converter timestamps para datetime
+    columns['open_time'] = pd.to_datetime(columns['open_time'], unit='ms')
+    columns['close_time'] = pd.to_datetime(columns['close_time'], unit='ms')
+
+    return pd.DataFrame(columns, copy=False)
+
+
+def fetch_concurrently(calls, max_workers=8):
+    """
+    Executa chamadas de rede em paralelo usando um pool de threads
+
+    Args:
+        calls: Lista de funções sem argumentos (ex: functools.partial)
+        max_workers: Limite de requisições simultâneas
+
+    Returns:
+        Lista com os resultados na mesma ordem de `calls`
+    """
+    if not calls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls)))) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
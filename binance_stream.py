@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+
+try:
+    import websocket  # pacote websocket-client
+except ImportError:  # pragma: no cover - dependência opcional
+    websocket = None
+
+DEFAULT_WS_URL = 'wss://stream.binance.com:9443'
+
+
+def kline_event_to_row(k):
+    """Converte o campo `k` de um evento de kline no formato de linha do /klines"""
+    return [
+        k['t'], k['o'], k['h'], k['l'], k['c'], k['v'],
+        k['T'], k['q'], k['n'], k['V'], k['Q'], '0'
+    ]
+
+
+def mini_ticker_to_ticker(data):
+    """Converte um evento miniTicker no formato retornado por /ticker/24hr"""
+    open_price = float(data['o'])
+    last_price = float(data['c'])
+    change = (last_price - open_price) / open_price * 100 if open_price else 0.0
+    return {
+        'symbol': data['s'],
+        'lastPrice': data['c'],
+        'openPrice': data['o'],
+        'highPrice': data['h'],
+        'lowPrice': data['l'],
+        'volume': data['v'],
+        'quoteVolume': data['q'],
+        'priceChangePercent': f"{change:.3f}",
+    }
+
+
+class BinanceStream:
+    def __init__(self, symbols, interval, on_kline=None, on_ticker=None, on_reconnect=None,
+                 ws_url=DEFAULT_WS_URL, reconnect_delay=1, max_reconnect_delay=60,
+                 on_depth=None, depth_speed='100ms'):
+        """
+        Assina os streams combinados de kline, miniTicker e diff-depth da Binance
+
+        Só são assinados os streams que têm callback.
+
+        Args:
+            symbols: Lista de símbolos (ex: ['BTCUSDT', 'ETHUSDT'])
+            interval: Intervalo dos candles (ex: '5m')
+            on_kline: Callback (símbolo, linha no formato /klines, fechado)
+            on_ticker: Callback (símbolo, ticker no formato /ticker/24hr)
+            on_reconnect: Callback chamado após uma reconexão, para
+                preencher a lacuna via REST
+            ws_url: URL base do servidor WebSocket (permite apontar para um
+                servidor local de testes)
+            reconnect_delay: Espera inicial em segundos antes de reconectar
+            max_reconnect_delay: Espera máxima entre tentativas de reconexão
+            on_depth: Callback (símbolo, evento depthUpdate) do stream diff-depth
+            depth_speed: Frequência do stream diff-depth ('100ms' ou '1000ms')
+        """
+        if websocket is None:
+            raise ImportError("O modo streaming requer o pacote websocket-client "
+                              "(pip install websocket-client)")
+
+        self.symbols = symbols
+        self.interval = interval
+        self.on_kline = on_kline
+        self.on_ticker = on_ticker
+        self.on_reconnect = on_reconnect
+        self.on_depth = on_depth
+        self.depth_speed = depth_speed
+        self.ws_url = ws_url.rstrip('/')
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.is_running = False
+        self._ws = None
+        self._thread = None
+        self._connected_once = False
+
+    @property
+    def url(self):
+        streams = []
+        for symbol in self.symbols:
+            name = symbol.lower()
+            if self.on_kline:
+                streams.append(f"{name}@kline_{self.interval}")
+            if self.on_ticker:
+                streams.append(f"{name}@miniTicker")
+            if self.on_depth:
+                streams.append(f"{name}@depth@{self.depth_speed}")
+        return f"{self.ws_url}/stream?streams={'/'.join(streams)}"
+
+    def start(self):
+        """Inicia a conexão em uma thread separada"""
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.is_running = False
+        if self._ws is not None:
+            self._ws.close()
+
+    def _run_forever(self):
+        delay = self.reconnect_delay
+        while self.is_running:
+            started = time.monotonic()
+            self._ws = websocket.WebSocketApp(self.url, on_open=self._on_open,
+                                              on_message=self._on_message,
+                                              on_error=self._on_error)
+            self._ws.run_forever(ping_interval=20, ping_timeout=10)
+
+            if not self.is_running:
+                break
+
+            # Conexões que ficaram estáveis reiniciam o backoff
+            if time.monotonic() - started > self.max_reconnect_delay:
+                delay = self.reconnect_delay
+            print(f"Stream desconectado. Reconectando em {delay} segundos...")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _on_open(self, ws):
+        if self._connected_once and self.on_reconnect:
+            try:
+                self.on_reconnect()
+            except Exception as e:
+                print(f"Erro ao preencher dados após reconexão: {e}")
+        self._connected_once = True
+
+    def _on_error(self, ws, error):
+        print(f"Erro no stream: {error}")
+
+    def _on_message(self, ws, message):
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            event = data.get('e')
+
+            if event == 'kline' and self.on_kline:
+                k = data['k']
+                self.on_kline(data['s'], kline_event_to_row(k), k['x'])
+            elif event == '24hrMiniTicker' and self.on_ticker:
+                self.on_ticker(data['s'], mini_ticker_to_ticker(data))
+            elif event == 'depthUpdate' and self.on_depth:
+                self.on_depth(data['s'], data)
+        except Exception as e:
+            print(f"Erro ao processar mensagem do stream: {e}")
@@ -0,0 +1,223 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - necessário para ler/escrever Parquet
+except ImportError:  # pragma: no cover - dependência opcional
+    pyarrow = None
+
+from binance_client import BinanceClient, fetch_concurrently
+from kline_cache import INTERVAL_MS, MAX_KLINES_LIMIT
+from kline_parser import KLINE_DTYPES, klines_to_columns
+
+# Colunas persistidas (a coluna 'ignore' da API é descartada)
+STORE_COLUMNS = list(KLINE_DTYPES)
+DAY_MS = 86_400_000
+
+
+class CandleStore:
+    def __init__(self, root='data/candles'):
+        """
+        Armazenamento local de candles em arquivos Parquet
+
+        Os arquivos são particionados em <root>/<símbolo>/<intervalo>/<AAAA-MM-DD>.parquet
+        (dia em UTC), com timestamps em int64 (ms) e preços/volumes em float64.
+        Gravações concorrentes do mesmo dia são serializadas por arquivo.
+
+        Args:
+            root: Diretório base do armazenamento
+        """
+        if pyarrow is None:
+            raise ImportError("O armazenamento de candles requer o pacote pyarrow "
+                              "(pip install pyarrow)")
+        self.root = root
+        self._locks = {}  # Caminho do arquivo do dia -> Lock
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, path):
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, symbol, interval)
+
+    def _days(self, symbol, interval):
+        """Lista os dias (nomes de arquivo sem extensão) em ordem cronológica"""
+        path = self._dir(symbol, interval)
+        if not os.path.isdir(path):
+            return []
+        return sorted(name[:-8] for name in os.listdir(path) if name.endswith('.parquet'))
+
+    def _read_day(self, symbol, interval, day, columns=None):
+        path = os.path.join(self._dir(symbol, interval), f"{day}.parquet")
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+
+    def write(self, symbol, interval, rows):
+        """Grava candles (formato /klines), mesclando com os arquivos existentes"""
+        if not rows:
+            return
+
+        df = pd.DataFrame(klines_to_columns(rows))
+
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        for day_start, day_df in df.groupby(df['open_time'] // DAY_MS * DAY_MS):
+            day = datetime.fromtimestamp(day_start / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+            path = os.path.join(self._dir(symbol, interval), f"{day}.parquet")
+
+            # Leitura, mesclagem e troca do arquivo sob o lock do dia: outra thread
+            # gravando o mesmo dia não pode perder as linhas desta
+            with self._lock(path):
+                if os.path.exists(path):
+                    day_df = pd.concat([pd.read_parquet(path), day_df])
+                day_df = (day_df.drop_duplicates('open_time', keep='last')
+                                .sort_values('open_time')
+                                .reset_index(drop=True))
+
+                # Escrita atômica (arquivo temporário único no mesmo diretório) para
+                # não corromper o arquivo em caso de interrupção
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{day}.", suffix='.tmp')
+                os.close(fd)
+                try:
+                    day_df.to_parquet(tmp_path, index=False)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+
+    def load(self, symbol, interval, start=None, end=None, columns=None):
+        """
+        Carrega candles do disco
+
+        Args:
+            symbol: Símbolo do par (ex: 'BTCUSDT')
+            interval: Intervalo dos candles (ex: '1m')
+            start: Primeiro dia (datetime ou 'AAAA-MM-DD', inclusive)
+            end: Último dia (datetime ou 'AAAA-MM-DD', inclusive)
+            columns: Colunas a ler (padrão: todas); open_time é sempre incluída
+
+        Returns:
+            DataFrame com timestamps em int64 (ms), ou DataFrame vazio
+        """
+        if columns is not None and 'open_time' not in columns:
+            columns = ['open_time'] + list(columns)
+
+        start = start.strftime('%Y-%m-%d') if isinstance(start, datetime) else start
+        end = end.strftime('%Y-%m-%d') if isinstance(end, datetime) else end
+        days = [day for day in self._days(symbol, interval)
+                if (start is None or day >= start) and (end is None or day <= end)]
+
+        if not days:
+            return pd.DataFrame(columns=columns or STORE_COLUMNS)
+
+        frames = [self._read_day(symbol, interval, day, columns) for day in days]
+        return pd.concat(frames, ignore_index=True)
+
+    def load_rows(self, symbol, interval, limit):
+        """Retorna os últimos `limit` candles no formato de linha do /klines"""
+        frames = []
+        count = 0
+        for day in reversed(self._days(symbol, interval)):
+            df = self._read_day(symbol, interval, day)
+            frames.append(df)
+            count += len(df)
+            if count >= limit:
+                break
+
+        if not frames:
+            return []
+
+        df = pd.concat(reversed(frames), ignore_index=True).tail(limit)
+        return [list(row) + ['0'] for row in df.itertuples(index=False, name=None)]
+
+    def last_open_time(self, symbol, interval):
+        """Retorna o open_time do último candle gravado, ou None"""
+        days = self._days(symbol, interval)
+        if not days:
+            return None
+        df = self._read_day(symbol, interval, days[-1], columns=['open_time'])
+        return int(df['open_time'].iloc[-1]) if not df.empty else None
+
+    def backfill_symbol(self, client, symbol, interval, start_ms, end_ms=None):
+        """
+        Pagina o /klines a partir de `start_ms` e grava os candles fechados
+
+        Continua de onde o armazenamento parou, se já houver dados gravados.
+
+        Returns:
+            Número de candles gravados
+        """
+        last = self.last_open_time(symbol, interval)
+        if last is not None:
+            start_ms = max(start_ms, last + 1)
+        end_ms = end_ms or int(time.time() * 1000)
+
+        written = 0
+        while start_ms < end_ms:
+            params = {
+                'symbol': symbol,
+                'interval': interval,
+                'startTime': start_ms,
+                'endTime': end_ms,
+                'limit': MAX_KLINES_LIMIT
+            }
+            rows = client.get('/klines', params=params)
+
+            # O candle ainda aberto não é persistido
+            now_ms = int(time.time() * 1000)
+            closed = [row for row in rows if row[6] < now_ms]
+            self.write(symbol, interval, closed)
+            written += len(closed)
+
+            if len(rows) < MAX_KLINES_LIMIT:
+                break
+            start_ms = rows[-1][0] + 1
+
+        return written
+
+    def backfill(self, client, symbols, interval, start_ms, end_ms=None, max_workers=4):
+        """
+        Executa o backfill de vários símbolos em paralelo
+
+        Returns:
+            Dicionário símbolo -> número de candles gravados (None em caso de erro)
+        """
+        def run(symbol):
+            try:
+                return self.backfill_symbol(client, symbol, interval, start_ms, end_ms)
+            except Exception as e:
+                print(f"Erro no backfill de {symbol}: {e}")
+                return None
+
+        results = fetch_concurrently([partial(run, symbol) for symbol in symbols], max_workers)
+        return dict(zip(symbols, results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Armazenamento local de candles da Binance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backfill_parser = subparsers.add_parser('backfill', help="Baixa o histórico de candles para o disco")
+    backfill_parser.add_argument('--symbols', nargs='+',
+                                 default=['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT'])
+    backfill_parser.add_argument('--interval', default='1m', choices=sorted(INTERVAL_MS))
+    backfill_parser.add_argument('--days', type=int, default=30, help="Dias de histórico (padrão: 30)")
+    backfill_parser.add_argument('--root', default='data/candles', help="Diretório do armazenamento")
+    backfill_parser.add_argument('--workers', type=int, default=4, help="Símbolos baixados em paralelo")
+    args = parser.parse_args()
+
+    store = CandleStore(root=args.root)
+    client = BinanceClient(pool_maxsize=max(16, args.workers))
+    start_ms = int(time.time() * 1000) - args.days * DAY_MS
+
+    started = time.perf_counter()
+    results = store.backfill(client, args.symbols, args.interval, start_ms, max_workers=args.workers)
+    for symbol, count in results.items():
+        print(f"{symbol}: {'erro' if count is None else f'{count} candles gravados'}")
+    print(f"Backfill concluído em {time.perf_counter() - started:.1f} segundos.")
@@ -0,0 +1,325 @@
+import time
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.patches import Rectangle
+
+from downsampling import LodCache, lttb_indices
+from metrics import REGISTRY
+
+UP_COLOR = '#27ae60'
+DOWN_COLOR = '#c0392b'
+LINE_COLOR = '#3498db'
+WICK_COLOR = '#7f8c8d'
+
+# Indicadores na mesma escala do preço: nome -> (rótulo, cor, estilo da linha)
+OVERLAY_STYLES = {
+    'sma': ('SMA', '#e67e22', '-'),
+    'ema': ('EMA', '#8e44ad', '-'),
+    'bb_upper': ('Bollinger', '#95a5a6', '--'),
+    'bb_lower': (None, '#95a5a6', '--'),
+    'vwap': ('VWAP', '#16a085', ':'),
+}
+
+RENDER_SECONDS = REGISTRY.histogram('chart_render_seconds',
+                                    'Tempo de desenho do gráfico (blit do último candle ou redesenho completo)',
+                                    ('mode',))
+
+
+class ChartRenderer:
+    def __init__(self, fig, ax, canvas, style='line'):
+        """
+        Desenha o gráfico de preço de forma incremental
+
+        Os artistas são criados uma única vez e atualizados com set_data /
+        set_verts. O histórico é desenhado normalmente; apenas o último candle
+        (ainda aberto) é um artista animado, atualizado por blitting sobre o
+        fundo salvo. O layout só é recalculado quando os eixos mudam de fato.
+
+        Séries longas passam por uma pirâmide de resoluções (LodCache): a
+        resolução é escolhida pela largura em pixels do gráfico e pelo trecho
+        visível, e é recalculada ao aplicar zoom ou deslocar o gráfico.
+
+        Args:
+            fig: Figure do matplotlib
+            ax: Axes onde o gráfico é desenhado
+            canvas: Canvas (ex: FigureCanvasTkAgg) associado à figura
+            style: 'line' (preço de fechamento) ou 'candles'
+
+        Indicadores (OVERLAY_STYLES) podem ser sobrepostos ao histórico; eles
+        são reamostrados nos mesmos x do nível de detalhe exibido.
+        """
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.style = style
+
+        self._symbol = None
+        self._x = None
+        self._close = None
+        self._background = None
+        self._layout_dirty = True
+        self._overlays = None
+        self.show_overlays = False
+
+        # Níveis de detalhe: pirâmide por símbolo e trecho visível escolhido pelo usuário
+        self.lod = LodCache(max_entries=64)
+        self._pyramid = None
+        self._view = None
+        self._setting_limits = False
+        self._view_timer = canvas.new_timer(interval=100)
+        self._view_timer.single_shot = True
+        self._view_timer.add_callback(self._refresh_view)
+
+        # Artistas do histórico (desenhados junto com o resto da figura)
+        (self.line,) = ax.plot([], [], color=LINE_COLOR, label='Preço de Fechamento')
+        self.wicks = LineCollection([], colors=WICK_COLOR, linewidths=1)
+        self.bodies = PolyCollection([], edgecolors='none')
+        ax.add_collection(self.wicks)
+        ax.add_collection(self.bodies)
+        self.overlay_lines = {
+            name: ax.plot([], [], color=color, linestyle=linestyle, linewidth=1,
+                          label=label or '_nolegend_')[0]
+            for name, (label, color, linestyle) in OVERLAY_STYLES.items()
+        }
+        self._legend = None
+
+        # Artistas do último candle (animados, atualizados por blitting)
+        (self.last_line,) = ax.plot([], [], color=LINE_COLOR, animated=True)
+        (self.last_wick,) = ax.plot([], [], color=WICK_COLOR, linewidth=1, animated=True)
+        self.last_body = Rectangle((0, 0), 0, 0, animated=True, edgecolor='none')
+        ax.add_patch(self.last_body)
+        self._animated = (self.last_line, self.last_wick, self.last_body)
+
+        # Configurações fixas dos eixos
+        ax.set_xlabel('Data/Hora')
+        ax.set_ylabel('Preço (USDT)')
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.xaxis_date()
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=8))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+        ax.tick_params(axis='x', labelrotation=45)
+
+        canvas.mpl_connect('draw_event', self._on_draw)
+        canvas.mpl_connect('resize_event', self._on_resize)
+        ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    @staticmethod
+    def series(df):
+        """Extrai os arrays (x, abertura, máxima, mínima, fechamento) de um DataFrame de candles"""
+        return (mdates.date2num(df['open_time'].to_numpy()),
+                df['open'].to_numpy(dtype=float), df['high'].to_numpy(dtype=float),
+                df['low'].to_numpy(dtype=float), df['close'].to_numpy(dtype=float))
+
+    def prepare(self, symbol, df, interval=None):
+        """Pré-calcula a pirâmide de resoluções do símbolo (pode rodar fora da thread do Tk)"""
+        if df is not None and not df.empty:
+            self.lod.get((symbol, interval), *self.series(df))
+
+    def set_style(self, style):
+        """Alterna entre 'line' e 'candles'; o próximo render redesenha tudo"""
+        self.style = style
+        self._x = None
+        self._view = None
+
+    def set_overlays_visible(self, visible):
+        """Mostra ou esconde os indicadores; o próximo render redesenha tudo"""
+        self.show_overlays = visible
+        self._x = None
+        if self._legend is not None:
+            self._legend.remove()
+            self._legend = None
+        if visible:
+            self._legend = self.ax.legend(
+                handles=[self.line] + [line for name, line in self.overlay_lines.items()
+                                       if OVERLAY_STYLES[name][0]],
+                loc='upper left', fontsize='small')
+
+    def show_message(self, text):
+        """Limpa os dados e exibe apenas um título (ex: carregando, erro)"""
+        self._x = None
+        self._symbol = None
+        self._interval = None
+        self._pyramid = None
+        self._overlays = None
+        self.line.set_data([], [])
+        self._set_overlays(None)
+        self.wicks.set_segments([])
+        self.bodies.set_verts([])
+        self._hide_last()
+        self.ax.set_title(text)
+        self._full_draw()
+
+    def render(self, symbol, df, overlays=None, interval=None):
+        """
+        Atualiza o gráfico com os candles de `df` (colunas open_time e OHLC)
+
+        Args:
+            overlays: Dicionário indicador -> array alinhado com `df` (opcional)
+            interval: Intervalo dos candles; cada (símbolo, intervalo) tem sua pirâmide
+        """
+        if df is None or df.empty:
+            self.show_message(f"Erro ao carregar dados para {symbol}")
+            return
+
+        if symbol != self._symbol or interval != self._interval or self._x is None:
+            self._view = None
+            self._x = None
+        self._interval = interval
+        self._pyramid = self.lod.get((symbol, interval), *self.series(df))
+        self._overlays = overlays
+        self._draw_view(symbol)
+
+    def _visible_series(self):
+        """Seleciona o nível de detalhe do trecho visível de acordo com a largura em pixels"""
+        base_x = self._pyramid.levels[0][0]
+        xmin, xmax = self._view or (base_x[0], base_x[-1])
+        pixels = max(int(self.ax.bbox.width), 100)
+
+        # Candles precisam de ~3 pixels cada; a linha é refinada depois pelo LTTB
+        max_points = pixels // 3 if self.style == 'candles' else pixels * 2
+        x, o, h, lo, c = self._pyramid.select(xmin, xmax, max_points)
+
+        if self.style != 'candles' and len(x) > pixels:
+            idx = lttb_indices(x, c, pixels)
+            x, o, h, lo, c = x[idx], o[idx], h[idx], lo[idx], c[idx]
+        return x, o, h, lo, c
+
+    def _draw_view(self, symbol, idle=False):
+        start = time.perf_counter()
+        x, o, h, lo, c = (arr.copy() for arr in self._visible_series())
+
+        # Mesmos candles e histórico inalterado: só o último candle mudou
+        same_series = (
+            symbol == self._symbol and self._x is not None and len(x) == len(self._x)
+            and x[0] == self._x[0] and x[-1] == self._x[-1]
+            and np.array_equal(c[:-1], self._close[:-1])
+        )
+        if symbol != self._symbol:
+            self._layout_dirty = True
+        self._symbol, self._x, self._close = symbol, x, c
+
+        width = self._candle_width(x)
+        self._set_last(x, o, h, lo, c, width)
+
+        if same_series and self._background is not None:
+            ymin, ymax = self.ax.get_ylim()
+            low, high = (lo[-1], h[-1]) if self.style == 'candles' else (c[-1], c[-1])
+            if ymin <= low and high <= ymax:
+                self._blit()
+                RENDER_SECONDS.observe(time.perf_counter() - start, mode='blit')
+                return
+
+        self._set_history(x, o, h, lo, c, width)
+        self._set_overlays(x)
+        self.ax.set_title(f"Histórico de Preço para {symbol}")
+        self._set_limits(x, lo if self.style == 'candles' else c,
+                         h if self.style == 'candles' else c, width)
+        self._full_draw(idle)
+        RENDER_SECONDS.observe(time.perf_counter() - start, mode='full')
+
+    @staticmethod
+    def _candle_width(x):
+        if len(x) > 1:
+            return float(np.median(np.diff(x))) * 0.6
+        return 0.6 / 1440  # 1 minuto em unidades de data do matplotlib
+
+    def _set_history(self, x, o, h, lo, c, width):
+        if self.style == 'candles':
+            self.line.set_data([], [])
+
+            hx, ho, hh, hl, hc = x[:-1], o[:-1], h[:-1], lo[:-1], c[:-1]
+            self.wicks.set_segments(np.stack([np.column_stack([hx, hl]),
+                                              np.column_stack([hx, hh])], axis=1))
+
+            left, right = hx - width / 2, hx + width / 2
+            bottom, top = np.minimum(ho, hc), np.maximum(ho, hc)
+            verts = np.stack([np.column_stack([left, bottom]), np.column_stack([left, top]),
+                              np.column_stack([right, top]), np.column_stack([right, bottom])], axis=1)
+            self.bodies.set_verts(verts)
+            self.bodies.set_facecolors(np.where(hc >= ho, UP_COLOR, DOWN_COLOR))
+        else:
+            self.wicks.set_segments([])
+            self.bodies.set_verts([])
+            self.line.set_data(x[:-1], c[:-1])
+
+    def _set_overlays(self, x):
+        base_x = self._pyramid.levels[0][0] if self._pyramid is not None else None
+        for name, line in self.overlay_lines.items():
+            values = self._overlays.get(name) if self._overlays and self.show_overlays else None
+            if x is None or values is None or len(values) != len(base_x):
+                line.set_data([], [])
+            else:
+                line.set_data(x, np.interp(x, base_x, values))
+
+    def _set_last(self, x, o, h, lo, c, width):
+        self._hide_last()
+        if self.style == 'candles':
+            self.last_wick.set_data([x[-1], x[-1]], [lo[-1], h[-1]])
+            self.last_body.set_bounds(x[-1] - width / 2, min(o[-1], c[-1]), width, abs(c[-1] - o[-1]))
+            self.last_body.set_facecolor(UP_COLOR if c[-1] >= o[-1] else DOWN_COLOR)
+        else:
+            # Segmento que liga o último candle fechado ao candle aberto
+            self.last_line.set_data(x[-2:], c[-2:])
+
+    def _hide_last(self):
+        self.last_line.set_data([], [])
+        self.last_wick.set_data([], [])
+        self.last_body.set_bounds(0, 0, 0, 0)
+
+    def _set_limits(self, x, low, high, width):
+        # Com zoom/deslocamento do usuário o eixo x é mantido; o y se ajusta ao trecho visível
+        if self._view is not None:
+            visible = (x >= self._view[0]) & (x <= self._view[1])
+            if visible.any():
+                low, high = low[visible], high[visible]
+
+        ymin, ymax = float(np.min(low)), float(np.max(high))
+        margin = (ymax - ymin) * 0.05 or abs(ymax) * 0.01 or 1
+
+        self._setting_limits = True
+        try:
+            if self._view is None:
+                self.ax.set_xlim(x[0] - width, x[-1] + width)
+            self.ax.set_ylim(ymin - margin, ymax + margin)
+        finally:
+            self._setting_limits = False
+
+    def _full_draw(self, idle=False):
+        if self._layout_dirty:
+            self.fig.tight_layout()
+            self._layout_dirty = False
+        if idle:
+            self.canvas.draw_idle()
+        else:
+            self.canvas.draw()
+
+    def _on_xlim_changed(self, ax):
+        # Zoom ou deslocamento pelo usuário: escolher de novo o nível de detalhe
+        if self._setting_limits or self._pyramid is None:
+            return
+        self._view = ax.get_xlim()
+        self._view_timer.stop()
+        self._view_timer.start()
+
+    def _refresh_view(self):
+        if self._pyramid is not None and self._symbol is not None:
+            self._x = None
+            self._draw_view(self._symbol, idle=True)
+
+    def _on_draw(self, event):
+        # Salvar o fundo sem os artistas animados e desenhá-los por cima
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self._animated:
+            self.ax.draw_artist(artist)
+
+    def _on_resize(self, event):
+        self._layout_dirty = True
+        self._background = None
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        for artist in self._animated:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
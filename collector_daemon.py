@@ -0,0 +1,448 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import partial
+
+import requests
+
+from binance_client import BinanceClient, fetch_concurrently
+from binance_stream import DEFAULT_WS_URL, BinanceStream
+from candle_store import CandleStore
+from kline_cache import INTERVAL_MS, MAX_KLINES_LIMIT, KlineCache
+from metrics import DEFAULT_METRICS_PORT, REGISTRY, start_http_server
+
+SUBSCRIBERS = REGISTRY.gauge('collector_subscribers', 'Assinantes conectados ao coletor')
+DROPPED = REGISTRY.counter('collector_dropped_subscribers_total',
+                           'Assinantes desconectados por não acompanharem as mensagens')
+
+# Endereço padrão: socket Unix no diretório temporário, ou TCP local onde não há AF_UNIX
+if hasattr(socket, 'AF_UNIX'):
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), 'binance-collector.sock')
+else:  # pragma: no cover - Windows
+    DEFAULT_ADDRESS = '127.0.0.1:8765'
+
+
+def parse_address(address):
+    """
+    Interpreta o endereço do coletor
+
+    'host:porta' (ex: 127.0.0.1:8765) é um endereço TCP; qualquer outro valor
+    é o caminho de um socket Unix.
+
+    Returns:
+        Tupla (família, endereço) para socket.socket / connect / bind
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and os.sep not in host:
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def encode_message(message):
+    """Serializa uma mensagem do protocolo (JSON, uma por linha)"""
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+class _Subscriber:
+    def __init__(self, sock, address, max_queue):
+        self.sock = sock
+        self.address = address
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.closed = False
+
+
+class CollectorDaemon:
+    def __init__(self, symbols, interval='5m', address=DEFAULT_ADDRESS, client=None,
+                 history=MAX_KLINES_LIMIT, store=None, poll_seconds=300, streaming=False,
+                 ws_url=DEFAULT_WS_URL, max_workers=8, max_queue=10000):
+        """
+        Coletor sem interface: busca os dados uma única vez e os publica
+
+        Os assinantes (console, monitor gráfico, scripts) se conectam por um
+        socket local e recebem mensagens JSON delimitadas por linha. Ao
+        conectar, cada assinante recebe o estado completo em cache; depois,
+        apenas os candles e tickers que mudaram. O tráfego com a API não
+        depende do número de assinantes.
+
+        Mensagens enviadas:
+            {"type": "hello", "symbols": [...], "interval": "5m"}
+            {"type": "klines", "symbol": "BTCUSDT", "rows": [[...], ...]}  (formato /klines)
+            {"type": "ticker", "symbol": "BTCUSDT", "ticker": {...}}      (formato /ticker/24hr)
+            {"type": "cycle", "time": "...", "status": "..."}              (fim de um ciclo)
+
+        Args:
+            symbols: Lista de símbolos coletados
+            interval: Intervalo dos candles
+            address: Caminho do socket Unix ou 'host:porta' TCP
+            client: BinanceClient compartilhado (opcional)
+            history: Candles mantidos e enviados a cada novo assinante
+            store: CandleStore opcional com o histórico local de candles
+            poll_seconds: Intervalo entre buscas REST (sem streaming)
+            streaming: Usa os streams WebSocket em vez de polling
+            ws_url: URL base do servidor WebSocket
+            max_workers: Limite de requisições simultâneas por ciclo
+            max_queue: Mensagens pendentes por assinante antes de desconectá-lo
+        """
+        self.symbols = symbols
+        self.interval = interval
+        self.address = address
+        self.history = history
+        self.poll_seconds = poll_seconds
+        self.streaming = streaming
+        self.ws_url = ws_url
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.stream_flush_interval = 0.25
+
+        self.kline_cache = KlineCache(max_length=history, store=store)
+        self.client = client or BinanceClient(pool_maxsize=max(16, max_workers))
+        self.tickers = {}
+
+        self.is_running = False
+        self.stream = None
+        self._server = None
+        self._subscribers = []
+        self._lock = threading.Lock()  # Protege o estado publicado e a lista de assinantes
+        self._refresh_event = threading.Event()
+        self._pending_klines = {}
+        self._pending_tickers = set()
+
+    # Coleta
+
+    def get_kline_rows(self, symbol):
+        """Busca só os candles novos e retorna as linhas recebidas (já no cache)"""
+        try:
+            return self.kline_cache.fetch(self.client, symbol, self.interval, self.history)
+        except requests.exceptions.RequestException as e:
+            print(f"Erro ao obter dados para {symbol}: {e}")
+            return None
+
+    def get_tickers_data(self):
+        try:
+            return self.client.get_tickers(self.symbols)
+        except requests.exceptions.RequestException as e:
+            print(f"Erro ao obter tickers: {e}")
+            return {}
+
+    def collect(self):
+        """Executa um ciclo de busca REST e publica o que mudou"""
+        calls = [self.get_tickers_data]
+        calls += [partial(self.get_kline_rows, symbol) for symbol in self.symbols]
+        results = fetch_concurrently(calls, self.max_workers)
+
+        messages = []
+        for symbol, ticker in results[0].items():
+            messages.append({'type': 'ticker', 'symbol': symbol, 'ticker': ticker})
+        for symbol, rows in zip(self.symbols, results[1:]):
+            if rows:
+                messages.append(self._klines_message(symbol, rows))
+
+        with self._lock:
+            self.tickers.update(results[0])
+        if self.streaming:
+            status = "Modo streaming: recebendo atualizações em tempo real."
+        else:
+            status = f"Dados atualizados pelo coletor. Próxima atualização em {self.poll_seconds} segundos."
+        self.broadcast(messages + [self._cycle_message(status)])
+
+    def flush_stream(self):
+        """Publica os candles e tickers recebidos pelo stream desde o último envio"""
+        with self._lock:
+            klines, self._pending_klines = self._pending_klines, {}
+            tickers = {symbol: self.tickers[symbol] for symbol in self._pending_tickers}
+            self._pending_tickers.clear()
+
+        if not klines and not tickers:
+            return
+        messages = [{'type': 'ticker', 'symbol': symbol, 'ticker': ticker}
+                    for symbol, ticker in tickers.items()]
+        messages += [self._klines_message(symbol, list(rows.values())) for symbol, rows in klines.items()]
+        self.broadcast(messages + [self._cycle_message("Modo streaming: recebendo atualizações em tempo real.")])
+
+    def on_stream_kline(self, symbol, row, is_closed):
+        self.kline_cache.update(symbol, self.interval, [row])
+        if is_closed:
+            self.kline_cache.persist(symbol, self.interval, [row], now_ms=int(row[6]) + 1)
+        with self._lock:
+            # Só a última versão de cada candle é enviada
+            self._pending_klines.setdefault(symbol, {})[row[0]] = row
+
+    def on_stream_ticker(self, symbol, ticker):
+        with self._lock:
+            self.tickers[symbol] = ticker
+            self._pending_tickers.add(symbol)
+
+    def _klines_message(self, symbol, rows):
+        return {'type': 'klines', 'symbol': symbol, 'rows': [list(row) for row in rows]}
+
+    def _cycle_message(self, status):
+        return {'type': 'cycle', 'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'status': status}
+
+    # Publicação
+
+    def broadcast(self, messages):
+        """Serializa as mensagens uma única vez e as enfileira para todos os assinantes"""
+        if not messages:
+            return
+        payload = b''.join(encode_message(message) for message in messages)
+        with self._lock:
+            for subscriber in list(self._subscribers):
+                self._enqueue(subscriber, payload)
+
+    def _enqueue(self, subscriber, payload):
+        try:
+            subscriber.queue.put_nowait(payload)
+        except queue.Full:
+            # Assinante lento: desconectar para não acumular memória no coletor
+            print(f"Assinante {subscriber.address} não acompanha as mensagens. Desconectando.")
+            DROPPED.inc()
+            self._drop(subscriber)
+
+    def _drop(self, subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+            SUBSCRIBERS.set(len(self._subscribers))
+        subscriber.closed = True
+        try:
+            subscriber.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        try:
+            subscriber.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _initial_state(self):
+        """Estado completo enviado a um novo assinante"""
+        messages = [{'type': 'hello', 'symbols': self.symbols, 'interval': self.interval}]
+        for symbol in self.symbols:
+            if symbol in self.tickers:
+                messages.append({'type': 'ticker', 'symbol': symbol, 'ticker': self.tickers[symbol]})
+            rows = self.kline_cache.rows(symbol, self.interval)
+            if rows:
+                messages.append(self._klines_message(symbol, rows))
+        if self.tickers:
+            messages.append(self._cycle_message("Conectado ao coletor."))
+        return b''.join(encode_message(message) for message in messages)
+
+    def _accept_loop(self):
+        while self.is_running:
+            try:
+                sock, address = self._server.accept()
+            except OSError:
+                break
+
+            subscriber = _Subscriber(sock, address or 'local', self.max_queue)
+            # O estado inicial e o registro ficam sob o mesmo lock que o broadcast,
+            # então nenhuma atualização é perdida ou enviada fora de ordem
+            with self._lock:
+                self._subscribers.append(subscriber)
+                SUBSCRIBERS.set(len(self._subscribers))
+                self._enqueue(subscriber, self._initial_state())
+            threading.Thread(target=self._writer, args=(subscriber,), daemon=True).start()
+            print(f"Assinante conectado ({len(self._subscribers)} ativos).")
+
+    def _writer(self, subscriber):
+        try:
+            while not subscriber.closed:
+                payload = subscriber.queue.get()
+                if payload is None:
+                    break
+                subscriber.sock.sendall(payload)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._drop(subscriber)
+                count = len(self._subscribers)
+            subscriber.sock.close()
+            print(f"Assinante desconectado ({count} ativos).")
+
+    # Ciclo de vida
+
+    def start(self):
+        """Abre o socket local e inicia a coleta em threads separadas"""
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)  # Socket deixado por uma execução anterior
+
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen()
+
+        self.is_running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+        if self.streaming:
+            self.stream = BinanceStream(self.symbols, self.interval,
+                                        on_kline=self.on_stream_kline,
+                                        on_ticker=self.on_stream_ticker,
+                                        on_reconnect=self._refresh_event.set,
+                                        ws_url=self.ws_url)
+            self.stream.start()
+        self._refresh_event.set()
+
+    def run(self):
+        """Executa o loop de coleta até Ctrl+C"""
+        self.start()
+        print(f"Coletor publicando {len(self.symbols)} símbolos em {self.address}. Pressione Ctrl+C para sair.")
+        next_poll = time.monotonic()
+        try:
+            while self.is_running:
+                try:
+                    if self._refresh_event.is_set() or (not self.streaming and time.monotonic() >= next_poll):
+                        self._refresh_event.clear()
+                        self.collect()
+                        next_poll = time.monotonic() + self.poll_seconds
+                    elif self.streaming:
+                        self.flush_stream()
+                    # Candles fechados do ciclo gravados de uma vez no armazenamento local
+                    self.kline_cache.flush()
+                except Exception as e:
+                    print(f"Erro no ciclo de coleta: {e}")
+
+                timeout = self.stream_flush_interval if self.streaming else max(0, next_poll - time.monotonic())
+                self._refresh_event.wait(timeout)
+        except KeyboardInterrupt:
+            print("\nColetor encerrado pelo usuário.")
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.is_running = False
+        if self.stream is not None:
+            self.stream.stop()
+        if self._server is not None:
+            self._server.close()
+            family, address = parse_address(self.address)
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.unlink(address)
+        with self._lock:
+            for subscriber in list(self._subscribers):
+                self._drop(subscriber)
+        self.kline_cache.flush()
+        self.client.close()
+
+
+class CollectorSubscriber:
+    def __init__(self, address=DEFAULT_ADDRESS, on_klines=None, on_ticker=None, on_cycle=None,
+                 on_hello=None, reconnect_delay=1, max_reconnect_delay=30):
+        """
+        Assina as mensagens publicadas por um CollectorDaemon
+
+        Os callbacks seguem o formato do BinanceStream, para que as
+        ferramentas possam usar o coletor no lugar da API.
+
+        Args:
+            address: Caminho do socket Unix ou 'host:porta' TCP do coletor
+            on_klines: Callback (símbolo, linhas no formato /klines)
+            on_ticker: Callback (símbolo, ticker no formato /ticker/24hr)
+            on_cycle: Callback (texto do horário, texto de status) ao fim de cada ciclo
+            on_hello: Callback (símbolos, intervalo) a cada conexão
+            reconnect_delay: Espera inicial em segundos antes de reconectar
+            max_reconnect_delay: Espera máxima entre tentativas de reconexão
+        """
+        self.address = address
+        self.on_klines = on_klines
+        self.on_ticker = on_ticker
+        self.on_cycle = on_cycle
+        self.on_hello = on_hello
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.is_running = False
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        """Conecta ao coletor em uma thread separada (com reconexão automática)"""
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.is_running = False
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _run_forever(self):
+        delay = self.reconnect_delay
+        while self.is_running:
+            family, address = parse_address(self.address)
+            try:
+                self._sock = socket.socket(family, socket.SOCK_STREAM)
+                self._sock.connect(address)
+                delay = self.reconnect_delay
+                self._read_messages(self._sock)
+            except OSError as e:
+                if self.is_running:
+                    print(f"Erro na conexão com o coletor em {self.address}: {e}")
+            finally:
+                self._sock.close()
+
+            if not self.is_running:
+                break
+            print(f"Coletor desconectado. Reconectando em {delay} segundos...")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _read_messages(self, sock):
+        with sock.makefile('rb') as stream:
+            for line in stream:
+                try:
+                    self.dispatch(json.loads(line))
+                except Exception as e:
+                    print(f"Erro ao processar mensagem do coletor: {e}")
+
+    def dispatch(self, message):
+        kind = message.get('type')
+        if kind == 'klines' and self.on_klines:
+            self.on_klines(message['symbol'], message['rows'])
+        elif kind == 'ticker' and self.on_ticker:
+            self.on_ticker(message['symbol'], message['ticker'])
+        elif kind == 'cycle' and self.on_cycle:
+            self.on_cycle(message['time'], message['status'])
+        elif kind == 'hello' and self.on_hello:
+            self.on_hello(message['symbols'], message['interval'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coletor de dados da Binance sem interface")
+    parser.add_argument('--symbols', nargs='+',
+                        default=['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT'])
+    parser.add_argument('--interval', default='5m', choices=sorted(INTERVAL_MS))
+    parser.add_argument('--address', default=DEFAULT_ADDRESS,
+                        help=f"Socket Unix ou host:porta TCP para os assinantes (padrão: {DEFAULT_ADDRESS})")
+    parser.add_argument('--poll-seconds', type=int, default=300,
+                        help="Intervalo entre buscas REST sem streaming (padrão: 300)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Usa os streams WebSocket em vez de polling")
+    parser.add_argument('--ws-url', default=DEFAULT_WS_URL,
+                        help="URL base do servidor WebSocket (ex: servidor local de testes)")
+    parser.add_argument('--store', metavar='DIR',
+                        help="Diretório do histórico local de candles (ver candle_store.py backfill)")
+    parser.add_argument('--metrics-port', type=int, nargs='?', const=DEFAULT_METRICS_PORT, metavar='PORTA',
+                        help=f"Exporta métricas no formato Prometheus em http://127.0.0.1:PORTA/metrics "
+                             f"(padrão: {DEFAULT_METRICS_PORT})")
+    args = parser.parse_args()
+    
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+
+    store = CandleStore(root=args.store) if args.store else None
+    daemon = CollectorDaemon(args.symbols, interval=args.interval, address=args.address,
+                             store=store, poll_seconds=args.poll_seconds,
+                             streaming=args.stream, ws_url=args.ws_url)
+    daemon.run()
@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import REGISTRY
+
+LOD_REQUESTS = REGISTRY.counter('lod_cache_requests_total',
+                                'Consultas ao LodCache: só o último candle mudou (hit) ou reconstrução (miss)',
+                                ('result',))
+
+
+def ohlc_aggregate(x, o, h, lo, c, factor):
+    """
+    Agrega candles consecutivos em grupos de `factor`
+
+    Cada grupo mantém o x e a abertura do primeiro candle, a máxima e a
+    mínima do grupo e o fechamento do último candle.
+    """
+    n = len(x)
+    starts = np.arange(0, n, factor)
+    ends = np.minimum(starts + factor, n) - 1
+    return (x[starts], o[starts], np.maximum.reduceat(h, starts),
+            np.minimum.reduceat(lo, starts), c[ends])
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Seleciona `threshold` pontos com o algoritmo Largest-Triangle-Three-Buckets
+
+    Returns:
+        Array de índices (sempre inclui o primeiro e o último ponto)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Limites dos baldes intermediários (o primeiro e o último ponto ficam de fora)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+
+        # Média do próximo balde (ou o último ponto)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Ponto do balde atual que forma o maior triângulo com `a` e a média
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+class LodPyramid:
+    def __init__(self, x, o, h, lo, c, min_points=256):
+        """
+        Pirâmide de resoluções de uma série de candles
+
+        O nível 0 é a série original; cada nível seguinte agrega pares de
+        candles do anterior, até restarem no máximo `min_points` candles.
+        """
+        self.levels = [tuple(np.array(arr, dtype=float) for arr in (x, o, h, lo, c))]
+        while len(self.levels[-1][0]) > min_points:
+            self.levels.append(ohlc_aggregate(*self.levels[-1], 2))
+
+    def update_last(self, o, h, lo, c):
+        """Atualiza o último candle (ainda aberto) em todos os níveis, em O(níveis)"""
+        base = self.levels[0]
+        base[1][-1], base[2][-1], base[3][-1], base[4][-1] = o, h, lo, c
+
+        for k in range(1, len(self.levels)):
+            prev, level = self.levels[k - 1], self.levels[k]
+            start = (len(level[0]) - 1) * 2
+            level[2][-1] = prev[2][start:].max()
+            level[3][-1] = prev[3][start:].min()
+            level[4][-1] = prev[4][-1]
+
+    def select(self, xmin, xmax, max_points):
+        """
+        Retorna o nível mais detalhado cujo trecho visível cabe em `max_points`
+
+        Returns:
+            Tupla (x, o, h, lo, c) do trecho visível, com um candle de margem
+            de cada lado para que as linhas cheguem às bordas do gráfico
+        """
+        for level in self.levels:
+            x = level[0]
+            i0 = max(int(np.searchsorted(x, xmin, 'left')) - 1, 0)
+            i1 = min(int(np.searchsorted(x, xmax, 'right')) + 1, len(x))
+            if i1 - i0 <= max_points or level is self.levels[-1]:
+                return tuple(arr[i0:i1] for arr in level)
+
+
+class LodCache:
+    def __init__(self, max_entries=8, min_points=256):
+        """
+        Pirâmides de resolução por chave (ex: (símbolo, intervalo)), com descarte LRU
+
+        Se a série recebida tem os mesmos candles da anterior, apenas o último
+        candle é atualizado; caso contrário a pirâmide é reconstruída.
+        """
+        self.max_entries = max_entries
+        self.min_points = min_points
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, x, o, h, lo, c):
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is not None and len(entry.levels[0][0]) == len(x)
+                    and entry.levels[0][0][0] == x[0] and entry.levels[0][0][-1] == x[-1]):
+                entry.update_last(o[-1], h[-1], lo[-1], c[-1])
+                LOD_REQUESTS.inc(result='hit')
+            else:
+                entry = LodPyramid(x, o, h, lo, c, self.min_points)
+                self._entries[key] = entry
+                LOD_REQUESTS.inc(result='miss')
+
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
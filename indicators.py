@@ -0,0 +1,368 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Tamanho dos blocos do filtro exponencial vetorizado (mantém os fatores de escala em float64)
+_EMA_BLOCK = 128
+
+
+def _exp_filter(values, alpha, start=0, seed=None):
+    """
+    Suavização exponencial y[t] = alpha * x[t] + (1 - alpha) * y[t-1], vetorizada
+
+    Opera no último eixo (aceita uma matriz símbolos x tempo). Os valores
+    antes de `start` ficam NaN; y[start] recebe `seed` (padrão: x[start]).
+    A recorrência é resolvida em blocos com somas cumulativas escaladas,
+    sem laço por elemento.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    n = values.shape[-1]
+    if start >= n:
+        return out
+
+    prev = values[..., start] if seed is None else np.asarray(seed, dtype=float)
+    out[..., start] = prev
+    if alpha >= 1:
+        out[..., start + 1:] = values[..., start + 1:]
+        return out
+
+    decay = 1.0 - alpha
+    for block_start in range(start + 1, n, _EMA_BLOCK):
+        block = values[..., block_start:block_start + _EMA_BLOCK]
+        k = np.arange(block.shape[-1])
+        scale = decay ** -k
+        weighted = np.cumsum(block * scale, axis=-1)
+        result = decay ** (k + 1) * prev[..., None] + alpha * weighted / scale
+        out[..., block_start:block_start + block.shape[-1]] = result
+        prev = result[..., -1]
+    return out
+
+
+def sma(values, period):
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+    cumsum = np.cumsum(values, axis=-1)
+    out[..., period - 1] = cumsum[..., period - 1]
+    out[..., period:] = cumsum[..., period:] - cumsum[..., :-period]
+    out[..., period - 1:] /= period
+    return out
+
+
+def ema(values, period):
+    """Média móvel exponencial iniciada pela média simples dos primeiros `period` valores"""
+    values = np.asarray(values, dtype=float)
+    if values.shape[-1] < period:
+        return np.full(values.shape, np.nan)
+    seed = values[..., :period].mean(axis=-1)
+    return _exp_filter(values, 2.0 / (period + 1), start=period - 1, seed=seed)
+
+
+def _wilder(values, period, start):
+    """Suavização de Wilder (alpha = 1/period) iniciada pela média simples"""
+    if values.shape[-1] < start + period:
+        return np.full(values.shape, np.nan)
+    seed = values[..., start:start + period].mean(axis=-1)
+    return _exp_filter(values, 1.0 / period, start=start + period - 1, seed=seed)
+
+
+def rsi_components(close, period=14):
+    """Retorna (rsi, média dos ganhos, média das perdas)"""
+    close = np.asarray(close, dtype=float)
+    delta = np.diff(close, axis=-1, prepend=close[..., :1])
+    avg_gain = _wilder(np.clip(delta, 0, None), period, start=1)
+    avg_loss = _wilder(np.clip(-delta, 0, None), period, start=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    rsi[np.isnan(avg_gain)] = np.nan
+    return rsi, avg_gain, avg_loss
+
+
+def rsi(close, period=14):
+    return rsi_components(close, period)[0]
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """Retorna (macd, linha de sinal, histograma)"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = np.full(line.shape, np.nan)
+    valid = slow - 1
+    if line.shape[-1] >= valid + signal:
+        signal_line[..., valid:] = ema(line[..., valid:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period=20, k=2.0):
+    """Retorna (média, banda superior, banda inferior)"""
+    close = np.asarray(close, dtype=float)
+    middle = sma(close, period)
+    std = np.full(close.shape, np.nan)
+    if close.shape[-1] >= period:
+        std[..., period - 1:] = sliding_window_view(close, period, axis=-1).std(axis=-1)
+    return middle, middle + k * std, middle - k * std
+
+
+def true_range(high, low, close):
+    high, low, close = (np.asarray(arr, dtype=float) for arr in (high, low, close))
+    prev_close = np.concatenate([close[..., :1], close[..., :-1]], axis=-1)
+    return np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+
+def atr(high, low, close, period=14):
+    return _wilder(true_range(high, low, close), period, start=0)
+
+
+def vwap(high, low, close, volume):
+    """VWAP acumulado desde o primeiro candle da série"""
+    typical = (np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3.0
+    volume = np.asarray(volume, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.cumsum(typical * volume, axis=-1) / np.cumsum(volume, axis=-1)
+
+
+class IndicatorEngine:
+    def __init__(self, sma_period=20, ema_period=20, rsi_period=14, macd_periods=(12, 26, 9),
+                 bollinger_period=20, bollinger_k=2.0, atr_period=14):
+        """
+        Calcula SMA, EMA, RSI, MACD, Bandas de Bollinger, ATR e VWAP
+
+        compute() e compute_batch() processam séries inteiras de forma
+        vetorizada; update() mantém o estado de cada símbolo e incorpora cada
+        candle novo em O(1), sem recalcular a janela inteira.
+        """
+        self.sma_period = sma_period
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self.macd_periods = macd_periods
+        self.bollinger_period = bollinger_period
+        self.bollinger_k = bollinger_k
+        self.atr_period = atr_period
+        # Candles fechados até todos os valores recursivos (EMA, RSI, MACD, ATR) existirem
+        fast, slow, signal = macd_periods
+        self.warmup = max(sma_period, ema_period, rsi_period + 1, slow + signal,
+                          bollinger_period, atr_period + 1)
+
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def compute_arrays(self, o, h, lo, c, v):
+        """Calcula todos os indicadores (arrays 1D ou matrizes símbolos x tempo)"""
+        macd_line, macd_signal, macd_hist = macd(c, *self.macd_periods)
+        bb_middle, bb_upper, bb_lower = bollinger(c, self.bollinger_period, self.bollinger_k)
+        return {
+            'sma': sma(c, self.sma_period),
+            'ema': ema(c, self.ema_period),
+            'rsi': rsi(c, self.rsi_period),
+            'macd': macd_line,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'bb_middle': bb_middle,
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
+            'atr': atr(h, lo, c, self.atr_period),
+            'vwap': vwap(h, lo, c, v),
+        }
+
+    def compute(self, df):
+        """Indicadores de um DataFrame de candles (colunas open/high/low/close/volume)"""
+        return self.compute_arrays(*_ohlcv(df))
+
+    def compute_batch(self, frames):
+        """
+        Calcula os indicadores de vários símbolos de uma vez
+
+        Séries com o mesmo número de candles são empilhadas em uma matriz e
+        processadas em uma única chamada vetorizada.
+
+        Args:
+            frames: Dicionário símbolo -> DataFrame de candles
+
+        Returns:
+            Dicionário símbolo -> dicionário de indicadores
+        """
+        groups = {}
+        for symbol, df in frames.items():
+            if df is not None and not df.empty:
+                groups.setdefault(len(df), []).append(symbol)
+
+        results = {}
+        for symbols in groups.values():
+            stacked = [np.vstack(arrays) for arrays in zip(*(_ohlcv(frames[s]) for s in symbols))]
+            computed = self.compute_arrays(*stacked)
+            for row, symbol in enumerate(symbols):
+                results[symbol] = {name: values[row] for name, values in computed.items()}
+        return results
+
+    def update(self, key, df, now_ms=None):
+        """
+        Retorna os valores mais recentes dos indicadores de `key`
+
+        Candles fechados ainda não vistos são incorporados ao estado em O(1)
+        cada; o candle aberto é considerado sem alterar o estado. Se o estado
+        não existe, a série não continua a anterior ou o estado ainda não
+        completou o aquecimento (menos de `warmup` candles, valores NaN), ele é
+        recriado a partir do cálculo vetorizado.
+        """
+        if df is None or df.empty:
+            return None
+
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        open_times = df['open_time'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        close_times = df['close_time'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        closed_count = int(np.searchsorted(close_times, now_ms))
+        o, h, lo, c, v = _ohlcv(df)
+
+        with self._lock:
+            state = self._states.get(key)
+            first_new = 0
+            if state is not None:
+                first_new = int(np.searchsorted(open_times, state.last_open_time, 'right'))
+                # A série precisa conter o último candle já incorporado
+                if first_new == 0 or open_times[first_new - 1] != state.last_open_time:
+                    state = None
+                # Os passos O(1) não iniciam um valor NaN: recalcular até o aquecimento
+                elif state.count < self.warmup and first_new < closed_count:
+                    state = None
+
+            if state is None:
+                state = _IncrementalState.seed(self, open_times, o, h, lo, c, v, closed_count)
+                self._states[key] = state
+            else:
+                for i in range(first_new, closed_count):
+                    state.push(open_times[i], o[i], h[i], lo[i], c[i], v[i])
+
+            if closed_count < len(df):
+                return state.peek(h[-1], lo[-1], c[-1], v[-1])
+            return state.values()
+
+
+def _ohlcv(df):
+    return tuple(df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close', 'volume'))
+
+
+def _last(values):
+    return float(values[-1]) if len(values) else float('nan')
+
+
+class _IncrementalState:
+    """Estado O(1) por candle dos indicadores de um símbolo"""
+
+    @classmethod
+    def seed(cls, engine, open_times, o, h, lo, c, v, count):
+        """Inicializa o estado com os `count` primeiros candles (fechados) via cálculo vetorizado"""
+        state = cls()
+        state.engine = engine
+        o, h, lo, c, v = o[:count], h[:count], lo[:count], c[:count], v[:count]
+        state.last_open_time = int(open_times[count - 1]) if count else -1
+        state.count = count
+
+        fast, slow, signal = engine.macd_periods
+        _, avg_gain, avg_loss = rsi_components(c, engine.rsi_period)
+        macd_line, macd_signal, _ = macd(c, fast, slow, signal)
+
+        window = max(engine.sma_period, engine.bollinger_period)
+        state.window = deque(c[-window:].tolist(), maxlen=window)
+        state.ema = _last(ema(c, engine.ema_period))
+        state.ema_fast = _last(ema(c, fast))
+        state.ema_slow = _last(ema(c, slow))
+        state.macd_signal = _last(macd_signal)
+        state.macd_line = _last(macd_line)
+        state.avg_gain = _last(avg_gain)
+        state.avg_loss = _last(avg_loss)
+        state.atr = _last(atr(h, lo, c, engine.atr_period))
+        state.prev_close = _last(c)
+        state.cum_pv = float(np.sum((h + lo + c) / 3.0 * v))
+        state.cum_v = float(np.sum(v))
+        state.latest = state._compute(None, None, None, None)
+        return state
+
+    def push(self, open_time, o, h, lo, c, v):
+        """Incorpora um candle fechado"""
+        values = self._compute(h, lo, c, v, commit=True)
+        self.last_open_time = int(open_time)
+        self.count += 1
+        self.latest = values
+
+    def peek(self, h, lo, c, v):
+        """Valores considerando o candle aberto, sem alterar o estado"""
+        return self._compute(h, lo, c, v)
+
+    def values(self):
+        return self.latest
+
+    def _compute(self, h, lo, c, v, commit=False):
+        engine = self.engine
+        window = list(self.window)
+        ema_value, ema_fast, ema_slow = self.ema, self.ema_fast, self.ema_slow
+        macd_signal, avg_gain, avg_loss = self.macd_signal, self.avg_gain, self.avg_loss
+        atr_value, cum_pv, cum_v = self.atr, self.cum_pv, self.cum_v
+
+        if c is not None:
+            fast, slow, signal = engine.macd_periods
+            window = (window + [c])[-self.window.maxlen:]
+            ema_value = _ema_step(ema_value, c, engine.ema_period)
+            ema_fast = _ema_step(ema_fast, c, fast)
+            ema_slow = _ema_step(ema_slow, c, slow)
+            macd_signal = _ema_step(macd_signal, ema_fast - ema_slow, signal)
+
+            delta = c - self.prev_close
+            avg_gain = _wilder_step(avg_gain, max(delta, 0.0), engine.rsi_period)
+            avg_loss = _wilder_step(avg_loss, max(-delta, 0.0), engine.rsi_period)
+            tr = max(h, self.prev_close) - min(lo, self.prev_close)
+            atr_value = _wilder_step(atr_value, tr, engine.atr_period)
+            cum_pv += (h + lo + c) / 3.0 * v
+            cum_v += v
+
+            if commit:
+                self.window.append(c)
+                self.ema, self.ema_fast, self.ema_slow = ema_value, ema_fast, ema_slow
+                self.macd_signal, self.avg_gain, self.avg_loss = macd_signal, avg_gain, avg_loss
+                self.atr, self.prev_close = atr_value, c
+                self.cum_pv, self.cum_v = cum_pv, cum_v
+
+        sma_window = window[-engine.sma_period:]
+        bb_window = np.array(window[-engine.bollinger_period:])
+        nan = float('nan')
+        bb_ready = len(bb_window) == engine.bollinger_period
+        bb_middle = float(bb_window.mean()) if bb_ready else nan
+        bb_std = float(bb_window.std()) if bb_ready else nan
+
+        if np.isnan(avg_gain) or np.isnan(avg_loss):
+            rsi_value = nan
+        elif avg_loss == 0:
+            rsi_value = 100.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        macd_value = ema_fast - ema_slow
+        return {
+            'sma': sum(sma_window) / len(sma_window) if len(sma_window) == engine.sma_period else nan,
+            'ema': ema_value,
+            'rsi': rsi_value,
+            'macd': macd_value,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_value - macd_signal,
+            'bb_middle': bb_middle,
+            'bb_upper': bb_middle + engine.bollinger_k * bb_std,
+            'bb_lower': bb_middle - engine.bollinger_k * bb_std,
+            'atr': atr_value,
+            'vwap': cum_pv / cum_v if cum_v else nan,
+        }
+
+
+def _ema_step(prev, value, period):
+    if np.isnan(prev):
+        return prev
+    alpha = 2.0 / (period + 1)
+    return alpha * value + (1 - alpha) * prev
+
+
+def _wilder_step(prev, value, period):
+    if np.isnan(prev):
+        return prev
+    return (value + (period - 1) * prev) / period
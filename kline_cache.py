@@ -0,0 +1,213 @@
+import threading
+import time
+from itertools import islice
+
+from binance_client import klines_to_dataframe
+from metrics import REGISTRY
+
+# Duração de cada intervalo suportado pela Binance, em milissegundos
+INTERVAL_MS = {
+    '1s': 1000,
+    '1m': 60_000,
+    '3m': 3 * 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '30m': 30 * 60_000,
+    '1h': 3_600_000,
+    '2h': 2 * 3_600_000,
+    '4h': 4 * 3_600_000,
+    '6h': 6 * 3_600_000,
+    '8h': 8 * 3_600_000,
+    '12h': 12 * 3_600_000,
+    '1d': 86_400_000,
+    '3d': 3 * 86_400_000,
+    '1w': 7 * 86_400_000,
+}
+
+# Máximo de candles por requisição ao /klines
+MAX_KLINES_LIMIT = 1000
+
+CACHE_REQUESTS = REGISTRY.counter('kline_cache_requests_total',
+                                  'Buscas ao /klines: incrementais (hit) ou completas (miss)', ('result',))
+
+
+def coerce_kline_row(row):
+    """Converte uma linha do /klines (strings) para tipos numéricos"""
+    return [
+        int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]),
+        float(row[5]), int(row[6]), float(row[7]), int(row[8]), float(row[9]),
+        float(row[10]), row[11] if len(row) > 11 else '0'
+    ]
+
+
+class KlineCache:
+    def __init__(self, max_length=500, store=None):
+        """
+        Cache em memória de candles por (símbolo, intervalo)
+
+        Os candles são indexados pelo open_time: o candle ainda aberto é
+        substituído no lugar e os mais antigos são descartados quando o
+        cache ultrapassa `max_length`.
+
+        Args:
+            max_length: Número máximo de candles mantidos por (símbolo, intervalo)
+            store: CandleStore opcional usado para carregar o histórico do disco
+                na primeira busca de cada par
+        """
+        self.max_length = max_length
+        self.store = store
+        self._unsaved = {}  # (símbolo, intervalo) -> {open_time: linha} ainda não gravados
+        self._candles = {}
+        self._lock = threading.RLock()
+
+    def update(self, symbol, interval, rows):
+        """Insere ou substitui candles (formato /klines) no cache"""
+        with self._lock:
+            candles = self._candles.setdefault((symbol, interval), {})
+            last = next(reversed(candles)) if candles else None
+            unordered = False
+
+            for row in rows:
+                row = coerce_kline_row(row)
+                open_time = row[0]
+                if open_time not in candles and last is not None and open_time < last:
+                    unordered = True
+                candles[open_time] = row
+                if last is None or open_time > last:
+                    last = open_time
+
+            if unordered:
+                candles = dict(sorted(candles.items()))
+                self._candles[(symbol, interval)] = candles
+
+            # Descartar os candles mais antigos
+            while len(candles) > self.max_length:
+                del candles[next(iter(candles))]
+
+    def rows(self, symbol, interval, limit=None):
+        """Retorna os últimos `limit` candles (ou todos) em ordem cronológica"""
+        with self._lock:
+            candles = self._candles.get((symbol, interval), {})
+            if not limit:
+                return list(candles.values())
+            return list(islice(reversed(candles.values()), limit))[::-1]
+
+    def to_dataframe(self, symbol, interval, limit=None):
+        return klines_to_dataframe(self.rows(symbol, interval, limit))
+
+    def last_closed_open_time(self, symbol, interval, now_ms=None):
+        """Retorna o open_time do último candle já fechado, ou None"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        with self._lock:
+            candles = self._candles.get((symbol, interval), {})
+            for open_time in reversed(candles):
+                if candles[open_time][6] < now_ms:
+                    return open_time
+        return None
+
+    def fetch_params(self, symbol, interval, limit):
+        """
+        Monta os parâmetros do /klines para buscar apenas os candles novos
+
+        Se o cache está vazio, ou a lacuna até agora não cabe em uma única
+        página do /klines, o cache do par é descartado e os últimos `limit`
+        candles são buscados normalmente. Com um CandleStore, a lacuna é
+        mantida: a busca começa no último candle gravado e deve ser paginada
+        (ver fetch()).
+        """
+        params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+
+        if self.store is not None and (symbol, interval) not in self:
+            self.update(symbol, interval, self.store.load_rows(symbol, interval, self.max_length))
+
+        since = self.last_closed_open_time(symbol, interval)
+        if since is None:
+            CACHE_REQUESTS.inc(result='miss')
+            return params
+
+        interval_ms = INTERVAL_MS.get(interval)
+        stale = interval_ms is None or time.time() * 1000 - since > MAX_KLINES_LIMIT * interval_ms
+        if stale and (self.store is None or interval_ms is None):
+            self.clear(symbol, interval)
+            CACHE_REQUESTS.inc(result='miss')
+            return params
+
+        CACHE_REQUESTS.inc(result='hit')
+
+        # O peso do /klines não depende do limit; a resposta traz só os candles novos
+        params['startTime'] = since + 1
+        params['limit'] = MAX_KLINES_LIMIT
+        return params
+
+    def fetch(self, client, symbol, interval, limit, update=None):
+        """
+        Busca no /klines os candles que faltam no cache e marca os fechados para o store (ver flush())
+
+        Lacunas maiores que uma página (ex: histórico do disco de dias atrás)
+        e primeiras buscas com `limit` acima de MAX_KLINES_LIMIT são paginadas.
+        Erros de rede são propagados (RequestException).
+
+        Args:
+            client: BinanceClient usado nas requisições
+            symbol: Símbolo buscado
+            interval: Intervalo dos candles
+            limit: Candles desejados quando o cache está vazio
+            update: Função chamada com cada página (padrão: self.update do par)
+
+        Returns:
+            Lista com todas as linhas recebidas
+        """
+        update = update or (lambda rows: self.update(symbol, interval, rows))
+        params = self.fetch_params(symbol, interval, min(limit, MAX_KLINES_LIMIT))
+        if 'startTime' not in params and limit > MAX_KLINES_LIMIT:
+            start_ms = int(time.time() * 1000) - limit * INTERVAL_MS[interval]
+            params.update(startTime=start_ms, limit=MAX_KLINES_LIMIT)
+
+        received = []
+        while True:
+            rows = client.get('/klines', params=params)
+            update(rows)
+            self.persist(symbol, interval, rows)
+            received += rows
+            if 'startTime' not in params or len(rows) < MAX_KLINES_LIMIT:
+                return received
+            params = dict(params, startTime=rows[-1][0] + 1)
+
+    def persist(self, symbol, interval, rows, now_ms=None):
+        """
+        Marca para gravação no store (se houver) os candles já fechados de `rows`
+
+        Os candles são acumulados e gravados por flush(), uma vez por ciclo,
+        em vez de regravar o arquivo do dia a cada página ou mensagem do stream.
+        """
+        if self.store is None or not rows:
+            return
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        with self._lock:
+            pending = self._unsaved.setdefault((symbol, interval), {})
+            for row in rows:
+                if int(row[6]) < now_ms:
+                    pending[int(row[0])] = row
+
+    def flush(self):
+        """Grava no store os candles fechados acumulados por persist()"""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+        for (symbol, interval), rows in unsaved.items():
+            if not rows:
+                continue
+            try:
+                self.store.write(symbol, interval, [rows[open_time] for open_time in sorted(rows)])
+            except Exception as e:
+                print(f"Erro ao gravar candles de {symbol} no armazenamento local: {e}")
+
+    def clear(self, symbol=None, interval=None):
+        with self._lock:
+            if symbol is None:
+                self._candles.clear()
+            else:
+                self._candles.pop((symbol, interval), None)
+
+    def __contains__(self, key):
+        with self._lock:
+            return bool(self._candles.get(key))
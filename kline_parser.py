@@ -0,0 +1,95 @@
+import json
+import time
+
+import numpy as np
+
+from metrics import REGISTRY
+
+# Colunas numéricas do /klines e seus tipos (a coluna 'ignore' é descartada)
+KLINE_DTYPES = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64,
+    'number_of_trades': np.int64,
+    'taker_buy_base_asset_volume': np.float64,
+    'taker_buy_quote_asset_volume': np.float64,
+}
+
+PARSE_SECONDS = REGISTRY.histogram('kline_parse_seconds', 'Tempo de conversão de uma resposta do /klines',
+                                   buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+
+
+def klines_to_columns(data):
+    """
+    Converte a resposta do /klines em arrays NumPy tipados, sem pandas
+
+    Toda a matriz é convertida para float64 em uma única passada (os
+    timestamps em ms cabem exatamente em float64) e as colunas inteiras são
+    então convertidas para int64.
+
+    Args:
+        data: Lista de linhas já decodificada, ou o corpo JSON (str/bytes)
+
+    Returns:
+        Dicionário nome da coluna -> array NumPy
+    """
+    start = time.perf_counter()
+    if isinstance(data, (str, bytes, bytearray)):
+        data = json.loads(data)
+
+    if len(data) == 0:
+        return {col: np.empty(0, dtype=dtype) for col, dtype in KLINE_DTYPES.items()}
+
+    matrix = np.array(data, dtype=np.float64)
+    columns = {
+        col: matrix[:, i].astype(dtype) if dtype is np.int64 else matrix[:, i]
+        for i, (col, dtype) in enumerate(KLINE_DTYPES.items())
+    }
+    PARSE_SECONDS.observe(time.perf_counter() - start)
+    return columns
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: caminho antigo (DataFrame genérico + pd.to_numeric) x caminho vetorizado
+    import timeit
+
+    import pandas as pd
+
+    from binance_client import KLINE_COLUMNS, klines_to_dataframe
+
+    def legacy_klines_to_dataframe(data):
+        df = pd.DataFrame(data, columns=KLINE_COLUMNS)
+        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+        df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            df[col] = pd.to_numeric(df[col])
+        return df
+
+    start = 1_700_000_000_000
+    page = [
+        [start + i * 60_000, f"{100 + i * 0.01:.8f}", f"{101 + i * 0.01:.8f}",
+         f"{99 + i * 0.01:.8f}", f"{100.5 + i * 0.01:.8f}", "12.34500000",
+         start + (i + 1) * 60_000 - 1, "1234.56780000", 321, "6.17250000",
+         "617.28390000", "0"]
+        for i in range(1000)
+    ]
+    payload = json.dumps(page)
+
+    runs = 200
+    cases = [
+        ("antigo (DataFrame + to_numeric)", lambda: legacy_klines_to_dataframe(json.loads(payload))),
+        ("vetorizado (DataFrame)", lambda: klines_to_dataframe(json.loads(payload))),
+        ("vetorizado (colunar, sem pandas)", lambda: klines_to_columns(payload)),
+    ]
+
+    print(f"Página de {len(page)} candles, {runs} execuções por caso")
+    baseline = None
+    for name, func in cases:
+        elapsed = min(timeit.repeat(func, number=runs, repeat=3)) / runs
+        baseline = baseline or elapsed
+        print(f"{name:<36} {elapsed * 1e3:8.3f} ms  ({baseline / elapsed:5.1f}x)")
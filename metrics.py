@@ -0,0 +1,264 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites (em segundos) dos histogramas de latência
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_METRICS_PORT = 9108
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera os rótulos {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Valor que só aumenta (ex: requisições, bytes, novas tentativas)"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Valor que sobe e desce (ex: peso usado, tamanho de cache)"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+
+class Histogram(_Metric):
+    """Distribuição de valores em baldes cumulativos (ex: latências em segundos)"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self, **labels):
+        """Retorna (contagens por balde, soma, total) de uma série, ou None"""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return None if entry is None else (list(entry[0]), entry[1], entry[2])
+
+    def series(self):
+        with self._lock:
+            return {key: (list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()}
+
+    def quantile(self, q, **labels):
+        """Estimativa de um quantil por interpolação linear dentro do balde"""
+        snapshot = self.snapshot(**labels)
+        return None if snapshot is None else self._quantile(q, snapshot)
+
+    def _quantile(self, q, snapshot):
+        counts, _, total = snapshot
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-2]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total_sum, total) in sorted(self.series().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, {'le': _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Conjunto de métricas exportadas no formato texto do Prometheus
+
+        counter()/gauge()/histogram() retornam a métrica existente com o mesmo
+        nome, então os módulos podem declarar suas métricas na importação.
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"A métrica {name} já existe com outro tipo")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get(Counter, name, help_text, labelnames=labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get(Gauge, name, help_text, labelnames=labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labelnames=labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Todas as métricas no formato de exposição texto do Prometheus"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registro usado pelos módulos do projeto
+REGISTRY = MetricsRegistry()
+
+
+def start_http_server(port=DEFAULT_METRICS_PORT, host='127.0.0.1', registry=REGISTRY):
+    """
+    Serve as métricas em http://host:porta/metrics (formato texto do Prometheus)
+
+    Returns:
+        O ThreadingHTTPServer, já atendendo em uma thread separada
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            payload = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _hit_rate(counter):
+    if counter is None:
+        return None
+    hits = sum(value for key, value in counter._values.items() if key[-1] == 'hit')
+    total = sum(counter._values.values())
+    return hits / total if total else None
+
+
+def format_summary(registry=REGISTRY):
+    """
+    Resumo legível das principais métricas, para exibição no terminal
+
+    Returns:
+        Lista de linhas de texto
+    """
+    lines = []
+    latency = registry.get('binance_request_duration_seconds')
+    received = registry.get('binance_response_bytes_total')
+    retries = registry.get('binance_request_retries_total')
+    if latency is not None:
+        for (endpoint,), snapshot in sorted(latency.series().items()):
+            counts, total_sum, total = snapshot
+            p95 = latency._quantile(0.95, snapshot)
+            size = received.value(endpoint=endpoint) if received is not None else 0
+            retried = retries.value(endpoint=endpoint) if retries is not None else 0
+            lines.append(f"{endpoint:<14} {total:>6} req  média {total_sum / total * 1000:7.1f} ms  "
+                         f"p95 {p95 * 1000:7.1f} ms  {size / 1024:9.1f} KB  {retried} repetições")
+
+    parts = []
+    weight = registry.get('binance_used_weight')
+    if weight is not None and weight.value() is not None:
+        parts.append(f"peso usado {weight.value()}")
+    parse = registry.get('kline_parse_seconds')
+    if parse is not None and parse.snapshot():
+        _, total_sum, total = parse.snapshot()
+        parts.append(f"parsing {total_sum / total * 1000:.2f} ms/página")
+    for name, label in (('kline_cache_requests_total', 'cache de candles'),
+                        ('snapshot_store_requests_total', 'snapshots'),
+                        ('lod_cache_requests_total', 'pirâmides LOD')):
+        rate = _hit_rate(registry.get(name))
+        if rate is not None:
+            parts.append(f"{label} {rate:.0%} acertos")
+    render = registry.get('chart_render_seconds')
+    if render is not None:
+        for (mode,), (_, total_sum, total) in sorted(render.series().items()):
+            parts.append(f"render {mode} {total_sum / total * 1000:.1f} ms")
+    if parts:
+        lines.append(" | ".join(parts))
+    return lines
@@ -0,0 +1,333 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+# Níveis por lado mantidos no livro local (o mesmo limite do snapshot)
+DEFAULT_DEPTH_LIMIT = 1000
+
+# Eventos guardados por símbolo enquanto o snapshot não chega
+MAX_BUFFERED_EVENTS = 10000
+
+
+def parse_levels(levels):
+    """Converte uma lista [[preço, quantidade], ...] (strings) em dois arrays float64"""
+    if not levels:
+        return np.empty(0), np.empty(0)
+    arr = np.array(levels, dtype=float).reshape(-1, 2)
+    return arr[:, 0], arr[:, 1]
+
+
+class BookSide:
+    def __init__(self, descending=False, max_levels=DEFAULT_DEPTH_LIMIT):
+        """
+        Um lado do livro (compras ou vendas) em arrays ordenados por preço
+
+        Os preços ficam em ordem crescente; para as compras o melhor nível é
+        o último, para as vendas o primeiro. Atualizações são mescladas com
+        searchsorted/np.insert/np.delete, sem dicionários de strings.
+
+        Args:
+            descending: True para o lado de compras (melhor preço = maior)
+            max_levels: Níveis mantidos; os mais distantes do topo são descartados
+        """
+        self.descending = descending
+        self.max_levels = max_levels
+        self.prices = np.empty(0)
+        self.quantities = np.empty(0)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def load(self, prices, quantities):
+        """Substitui o lado inteiro (snapshot)"""
+        order = np.argsort(prices, kind='stable')
+        keep = quantities[order] > 0
+        self.prices = prices[order][keep]
+        self.quantities = quantities[order][keep]
+        self._trim()
+
+    def apply(self, prices, quantities):
+        """
+        Aplica um lote de atualizações: quantidade 0 remove o nível, qualquer
+        outra substitui (ou cria) o nível daquele preço
+        """
+        if not len(prices):
+            return
+
+        # Preços repetidos no mesmo lote: vale a última ocorrência
+        if len(prices) > 1:
+            reversed_unique, index = np.unique(prices[::-1], return_index=True)
+            prices, quantities = reversed_unique, quantities[::-1][index]
+        else:
+            prices, quantities = prices.copy(), quantities.copy()
+
+        idx = np.searchsorted(self.prices, prices)
+        found = idx < len(self.prices)
+        found[found] = self.prices[idx[found]] == prices[found]
+
+        # Níveis existentes: atualizar no lugar ou remover
+        update = found & (quantities > 0)
+        self.quantities[idx[update]] = quantities[update]
+        remove = found & (quantities == 0)
+        if remove.any():
+            self.prices = np.delete(self.prices, idx[remove])
+            self.quantities = np.delete(self.quantities, idx[remove])
+
+        # Níveis novos (remoções de níveis inexistentes são ignoradas)
+        insert = ~found & (quantities > 0)
+        if insert.any():
+            positions = np.searchsorted(self.prices, prices[insert])
+            self.prices = np.insert(self.prices, positions, prices[insert])
+            self.quantities = np.insert(self.quantities, positions, quantities[insert])
+            self._trim()
+
+    def _trim(self):
+        excess = len(self.prices) - self.max_levels
+        if excess > 0:
+            if self.descending:
+                self.prices, self.quantities = self.prices[excess:], self.quantities[excess:]
+            else:
+                self.prices, self.quantities = self.prices[:-excess], self.quantities[:-excess]
+
+    def best(self):
+        """Retorna (preço, quantidade) do melhor nível, ou None"""
+        if not len(self.prices):
+            return None
+        i = -1 if self.descending else 0
+        return float(self.prices[i]), float(self.quantities[i])
+
+    def top(self, count):
+        """Retorna (preços, quantidades) dos `count` melhores níveis, do melhor ao pior"""
+        if self.descending:
+            return self.prices[::-1][:count], self.quantities[::-1][:count]
+        return self.prices[:count], self.quantities[:count]
+
+    def cumulative(self, count=None):
+        """Retorna (preços, quantidade acumulada) a partir do melhor nível"""
+        prices, quantities = self.top(len(self.prices) if count is None else count)
+        return prices, np.cumsum(quantities)
+
+    def depth_within(self, price):
+        """Quantidade total entre o melhor nível e `price` (inclusive)"""
+        if self.descending:
+            start = np.searchsorted(self.prices, price, 'left')
+            return float(self.quantities[start:].sum())
+        end = np.searchsorted(self.prices, price, 'right')
+        return float(self.quantities[:end].sum())
+
+
+class OrderBook:
+    def __init__(self, symbol, max_levels=DEFAULT_DEPTH_LIMIT):
+        """
+        Livro de ofertas local de um símbolo
+
+        Mantido a partir de um snapshot do /depth e dos eventos do stream
+        diff-depth, seguindo o procedimento de sincronização da Binance pelos
+        números de sequência (lastUpdateId, U e u).
+        """
+        self.symbol = symbol
+        self.bids = BookSide(descending=True, max_levels=max_levels)
+        self.asks = BookSide(descending=False, max_levels=max_levels)
+        self.last_update_id = None
+        self.synced = False
+        self.updates = 0
+        self.lock = threading.Lock()
+
+    def load_snapshot(self, snapshot):
+        """Carrega um snapshot do /depth (lastUpdateId, bids, asks)"""
+        self.bids.load(*parse_levels(snapshot['bids']))
+        self.asks.load(*parse_levels(snapshot['asks']))
+        self.last_update_id = snapshot['lastUpdateId']
+        self.synced = False
+
+    def apply_event(self, event):
+        """
+        Aplica um evento depthUpdate
+
+        Returns:
+            True se aplicado, False se descartado (já contido no snapshot) e
+            None se a sequência foi quebrada e o livro precisa de um novo snapshot
+        """
+        first_id, final_id = event['U'], event['u']
+        if self.last_update_id is None:
+            return None
+        if final_id <= self.last_update_id:
+            return False
+
+        if self.synced:
+            # Cada evento deve continuar exatamente o anterior
+            if first_id != self.last_update_id + 1:
+                self.synced = False
+                return None
+        elif not first_id <= self.last_update_id + 1 <= final_id:
+            # O primeiro evento após o snapshot precisa cobrir lastUpdateId + 1
+            return None
+
+        self.bids.apply(*parse_levels(event['b']))
+        self.asks.apply(*parse_levels(event['a']))
+        self.last_update_id = final_id
+        self.synced = True
+        self.updates += 1
+        return True
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def spread(self):
+        """Retorna (spread absoluto, spread em % do preço médio), ou None"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        mid = (bid[0] + ask[0]) / 2
+        return ask[0] - bid[0], (ask[0] - bid[0]) / mid * 100
+
+    def depth_within(self, percent):
+        """Quantidade (compras, vendas) até `percent`% de distância do preço médio"""
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return 0.0, 0.0
+        mid = (bid[0] + ask[0]) / 2
+        return (self.bids.depth_within(mid * (1 - percent / 100)),
+                self.asks.depth_within(mid * (1 + percent / 100)))
+
+
+class OrderBookManager:
+    def __init__(self, client, symbols, limit=DEFAULT_DEPTH_LIMIT, max_workers=4):
+        """
+        Sincroniza os livros de ofertas de vários símbolos
+
+        Os eventos do stream diff-depth chegam por on_depth(). Enquanto um
+        livro não está sincronizado os eventos ficam em buffer e o snapshot
+        é buscado em segundo plano; ao chegar, os eventos do buffer são
+        aplicados a partir de lastUpdateId + 1. Uma quebra de sequência
+        descarta o livro e dispara uma nova sincronização.
+
+        Args:
+            client: BinanceClient usado para os snapshots do /depth
+            symbols: Lista de símbolos
+            limit: Níveis por lado pedidos no snapshot (peso 50 até 1000)
+            max_workers: Snapshots buscados simultaneamente
+        """
+        self.client = client
+        self.limit = limit
+        self.books = {symbol: OrderBook(symbol, max_levels=limit) for symbol in symbols}
+        self._buffers = {symbol: [] for symbol in symbols}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def get(self, symbol):
+        return self.books.get(symbol)
+
+    def on_depth(self, symbol, event):
+        """Callback do stream para eventos depthUpdate"""
+        book = self.books.get(symbol)
+        if book is None:
+            return
+
+        with book.lock:
+            if book.last_update_id is not None:
+                # Com snapshot carregado, apply_event decide entre aplicar, descartar
+                # (evento já contido no snapshot) ou acusar uma lacuna
+                if book.apply_event(event) is not None:
+                    return
+                book.last_update_id = None
+            # Livro ainda sem snapshot ou com a sequência quebrada
+            buffer = self._buffers[symbol]
+            buffer.append(event)
+            if len(buffer) > MAX_BUFFERED_EVENTS:
+                del buffer[0]
+        self._request_snapshot(symbol)
+
+    def resync(self, symbols=None):
+        """Descarta os livros e busca novos snapshots (ex: após uma reconexão do stream)"""
+        for symbol in symbols or list(self.books):
+            book = self.books[symbol]
+            with book.lock:
+                book.synced = False
+                book.last_update_id = None
+                self._buffers[symbol].clear()
+            self._request_snapshot(symbol)
+
+    def refresh(self, symbol):
+        """Recarrega o livro apenas pelo snapshot (sem stream)"""
+        snapshot = self.fetch_snapshot(symbol)
+        if snapshot is None:
+            return False
+        book = self.books[symbol]
+        with book.lock:
+            book.load_snapshot(snapshot)
+            book.synced = True
+        return True
+
+    def fetch_snapshot(self, symbol):
+        try:
+            return self.client.get('/depth', params={'symbol': symbol, 'limit': self.limit})
+        except requests.exceptions.RequestException as e:
+            print(f"Erro ao obter livro de ofertas para {symbol}: {e}")
+            return None
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _request_snapshot(self, symbol):
+        with self._lock:
+            if symbol in self._pending:
+                return
+            self._pending.add(symbol)
+        self._executor.submit(self._sync, symbol)
+
+    def _sync(self, symbol):
+        book = self.books[symbol]
+        try:
+            snapshot = self.fetch_snapshot(symbol)
+            with book.lock:
+                buffer = self._buffers[symbol]
+                # Snapshot mais antigo que o primeiro evento: o próximo evento pede outro
+                if snapshot is None or (buffer and snapshot['lastUpdateId'] + 1 < buffer[0]['U']):
+                    return
+                book.load_snapshot(snapshot)
+                # Se nenhum evento do buffer cobre lastUpdateId + 1, o livro fica
+                # não sincronizado até on_depth receber o evento que o cobre
+                for event in buffer:
+                    if book.apply_event(event) is None:
+                        # Lacuna entre o snapshot e o buffer: descartar e recomeçar
+                        book.last_update_id = None
+                        break
+                buffer.clear()
+        finally:
+            with self._lock:
+                self._pending.discard(symbol)
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: eventos diff-depth sintéticos aplicados a um livro de 1000 níveis
+    import time
+
+    rng = np.random.default_rng(0)
+    book = OrderBook('BTCUSDT')
+    book.load_snapshot({
+        'lastUpdateId': 1,
+        'bids': [[f"{30000 - i * 0.5:.2f}", "1.0"] for i in range(1000)],
+        'asks': [[f"{30000.5 + i * 0.5:.2f}", "1.0"] for i in range(1000)],
+    })
+
+    def random_levels(base, sign):
+        offsets = rng.integers(0, 200, size=10) * 0.5
+        quantities = np.where(rng.random(10) < 0.3, 0, rng.random(10) * 5)
+        return [[f"{base + sign * off:.2f}", f"{qty:.8f}"] for off, qty in zip(offsets, quantities)]
+
+    events = [{'U': i + 2, 'u': i + 2, 'b': random_levels(30000, -1), 'a': random_levels(30000.5, 1)}
+              for i in range(20000)]
+
+    start = time.perf_counter()
+    for event in events:
+        book.apply_event(event)
+    elapsed = time.perf_counter() - start
+    print(f"{len(events)} eventos em {elapsed:.3f} s ({len(events) / elapsed:,.0f} eventos/s)")
+    print(f"Melhor compra: {book.best_bid()}  Melhor venda: {book.best_ask()}  Spread: {book.spread()}")
@@ -0,0 +1,165 @@
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from metrics import REGISTRY
+
+# Limite de peso por minuto por IP da API spot da Binance
+DEFAULT_WEIGHT_LIMIT = 6000
+
+THROTTLE_SECONDS = REGISTRY.counter('binance_throttle_seconds_total',
+                                    'Tempo total de espera por saldo de peso ou Retry-After')
+
+
+def request_weight(endpoint, params=None):
+    """Retorna o peso cobrado pela Binance para uma requisição"""
+    params = params or {}
+
+    if endpoint == '/klines':
+        return 2
+
+    if endpoint == '/ticker/24hr':
+        if 'symbol' in params:
+            return 2
+        if 'symbols' in params:
+            count = params['symbols'].count(',') + 1
+            if count <= 20:
+                return 2
+            if count <= 100:
+                return 40
+        return 80
+
+    if endpoint == '/depth':
+        limit = int(params.get('limit', 100))
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+
+    return 1
+
+
+def parse_retry_after(value):
+    """
+    Converte o cabeçalho Retry-After em segundos de espera
+
+    O cabeçalho pode trazer segundos ou uma data HTTP (RFC 7231).
+
+    Returns:
+        Segundos de espera (>= 0), ou None se o valor for inválido
+    """
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        pass
+    else:
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    try:
+        date = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date is None:
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RequestScheduler:
+    def __init__(self, weight_limit=DEFAULT_WEIGHT_LIMIT, window=60, safety_margin=0.9,
+                 max_retries=3, backoff_base=1.0, max_backoff=60):
+        """
+        Controla o ritmo das requisições de acordo com o limite de peso da Binance
+
+        Um token bucket com capacidade de `weight_limit * safety_margin` é
+        reabastecido continuamente ao longo de `window` segundos. O peso usado
+        informado pelo cabeçalho X-MBX-USED-WEIGHT-1m corrige o saldo local, e
+        respostas 429/418 suspendem todas as requisições até o Retry-After.
+
+        Args:
+            weight_limit: Peso máximo por janela
+            window: Duração da janela em segundos
+            safety_margin: Fração do limite efetivamente usada
+            max_retries: Número de novas tentativas após um 429
+            backoff_base: Espera base em segundos do backoff exponencial
+            max_backoff: Espera máxima em segundos entre tentativas
+        """
+        self.capacity = weight_limit * safety_margin
+        self.rate = self.capacity / window
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+
+        self.tokens = self.capacity
+        self.used_weight = 0
+        self.throttled = 0
+        self._blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight):
+        """Bloqueia até haver saldo de peso disponível para a requisição"""
+        weight = min(weight, self.capacity)
+        started = None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self.tokens >= weight:
+                    self.tokens -= weight
+                    if started is not None:
+                        THROTTLE_SECONDS.inc(now - started)
+                    return
+                else:
+                    wait = (weight - self.tokens) / self.rate
+                if started is None:
+                    started = now
+                self._cond.wait(wait)
+
+    def update_from_headers(self, headers):
+        """Sincroniza o saldo local com o peso usado informado pela Binance"""
+        used = headers.get('X-MBX-USED-WEIGHT-1m') or headers.get('X-MBX-USED-WEIGHT-1M')
+        if used is None:
+            return
+
+        with self._cond:
+            self.used_weight = int(used)
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, self.capacity - self.used_weight)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Registra um 429/418 e suspende as requisições com jitter
+
+        Sem Retry-After (ou com um valor inválido), a espera segue o backoff
+        exponencial.
+
+        Returns:
+            Tempo de espera em segundos
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff_base * 2 ** attempt)
+        delay += random.uniform(0, self.backoff_base)
+
+        with self._cond:
+            self.throttled += 1
+            self.tokens = 0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self._cond.notify_all()
+        return delay
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+
+from metrics import REGISTRY
+
+STORE_REQUESTS = REGISTRY.counter('snapshot_store_requests_total',
+                                  'Leituras do SnapshotStore (hit, miss ou expired)', ('result',))
+
+
+@dataclass(frozen=True)
+class SymbolSnapshot:
+    """
+    Dados de um símbolo já formatados para exibição
+
+    Produzido pelas threads de busca e aplicado pela thread do Tk sem
+    nenhum processamento adicional. Campos None não são atualizados.
+    """
+    symbol: str
+    ticker: tuple = None   # ((campo, texto, cor), ...)
+    candles: tuple = None  # ((open_time em ms, valores da linha), ...), do mais recente ao mais antigo
+    chart: object = None   # DataFrame de candles usado pelo gráfico (somente leitura)
+    change: float = None   # Variação 24h (%) e volumes 24h, usados para ordenar e filtrar a visão geral
+    volume: float = None
+    quote_volume: float = None  # Volume 24h na moeda de cotação (comparável entre pares)
+    overlays: dict = None    # Indicador -> array alinhado com `chart` (sobreposto ao gráfico)
+    indicators: dict = None  # Valores mais recentes dos indicadores (IndicatorEngine.update)
+    interval: str = None     # Intervalo dos candles de `chart`
+
+
+@dataclass(frozen=True)
+class CycleSnapshot:
+    """Fim de um ciclo de atualização (textos do cabeçalho e da barra de status)"""
+    time_text: str
+    status_text: str
+
+
+def format_price(price):
+    """Formata o preço com precisão apropriada"""
+    if price < 0.1:
+        return f"{price:.8f}"
+    elif price < 1:
+        return f"{price:.6f}"
+    elif price < 100:
+        return f"{price:.4f}"
+    return f"{price:.2f}"
+
+
+def format_ticker(ticker_data):
+    """Converte um ticker /ticker/24hr nos textos (e cores) exibidos no card"""
+    if not ticker_data:
+        return None
+
+    # Variação com cor (verde para positivo, vermelho para negativo)
+    change = float(ticker_data['priceChangePercent'])
+    change_color = "green" if change >= 0 else "red"
+
+    high = float(ticker_data['highPrice'])
+    low = float(ticker_data['lowPrice'])
+    return (
+        ("price", format_price(float(ticker_data['lastPrice'])), None),
+        ("change", f"{change:+.2f}%", change_color),
+        ("volume", f"{float(ticker_data['volume']):.2f}", None),
+        ("high", f"{high:.8f}" if high < 0.1 else f"{high:.4f}", None),
+        ("low", f"{low:.8f}" if low < 0.1 else f"{low:.4f}", None),
+    )
+
+
+def format_candles(kline_data, count=5):
+    """
+    Formata os últimos `count` candles para a tabela, do mais recente ao mais antigo
+
+    Cada linha é identificada pelo open_time em ms (único em qualquer
+    intervalo); candles de 1 dia ou mais exibem a data em vez da hora.
+    """
+    if kline_data is None or kline_data.empty:
+        return None
+
+    recent = kline_data.tail(count)
+    span = (recent['close_time'].iloc[-1] - recent['open_time'].iloc[-1]).total_seconds()
+    time_format = '%Y-%m-%d' if span >= 86_399 else '%H:%M:%S'
+    keys = recent['open_time'].to_numpy().astype('datetime64[ms]').astype('int64')
+    rows = zip(keys, recent['open_time'].dt.strftime(time_format), recent['open'], recent['high'],
+               recent['low'], recent['close'], recent['volume'])
+    return tuple(reversed([
+        (int(key), (time_str, f"{open_:.6f}", f"{high:.6f}", f"{low:.6f}", f"{close:.6f}", f"{volume:.2f}"))
+        for key, time_str, open_, high, low, close, volume in rows
+    ]))
+
+
+def passes_thresholds(snapshot, min_change=None, min_volume=None):
+    """
+    Verifica os filtros de variação e volume da visão geral
+
+    Args:
+        snapshot: SymbolSnapshot do símbolo (ou None, se ainda não há dados)
+        min_change: Variação 24h mínima em valor absoluto (%), ou None
+        min_volume: Volume 24h mínimo na moeda de cotação, ou None
+
+    Returns:
+        True se o símbolo atende aos limites informados; sem dados, só
+        atende quando nenhum limite é informado
+    """
+    if min_change is None and min_volume is None:
+        return True
+    if snapshot is None:
+        return False
+    if min_change is not None and (snapshot.change is None or abs(snapshot.change) < min_change):
+        return False
+    if min_volume is not None and (snapshot.quote_volume is None or snapshot.quote_volume < min_volume):
+        return False
+    return True
+
+
+def build_snapshot(symbol, ticker_data=None, kline_data=None, chart_data=None,
+                   overlays=None, indicators=None, interval=None):
+    """
+    Monta o snapshot de um símbolo
+
+    Args:
+        chart_data: Histórico usado pelo gráfico (None: o gráfico anterior é mantido)
+        overlays: Séries de indicadores alinhadas com `chart_data`
+        indicators: Valores mais recentes dos indicadores
+        interval: Intervalo dos candles (chave da pirâmide de resoluções do gráfico)
+    """
+    return SymbolSnapshot(
+        symbol=symbol,
+        ticker=format_ticker(ticker_data),
+        candles=format_candles(kline_data),
+        chart=chart_data if chart_data is not None and not chart_data.empty else None,
+        change=float(ticker_data['priceChangePercent']) if ticker_data else None,
+        volume=float(ticker_data['volume']) if ticker_data else None,
+        quote_volume=float(ticker_data['quoteVolume']) if ticker_data else None,
+        overlays=overlays,
+        indicators=indicators,
+        interval=interval,
+    )
+
+
+class SnapshotStore:
+    def __init__(self, ttl=300, max_entries=256):
+        """
+        Último snapshot de cada símbolo, compartilhado por tabelas e gráfico
+
+        Snapshots parciais são mesclados com o anterior (campos None mantêm o
+        valor já armazenado). Entradas mais antigas que `ttl` segundos são
+        consideradas vencidas e as menos usadas são descartadas além de
+        `max_entries`.
+
+        Args:
+            ttl: Validade de um snapshot em segundos
+            max_entries: Número máximo de símbolos mantidos
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, snapshot):
+        """Armazena (mesclando) um snapshot e retorna o resultado"""
+        with self._lock:
+            entry = self._entries.get(snapshot.symbol)
+            if entry is not None:
+                changes = {field.name: getattr(snapshot, field.name) for field in fields(snapshot)
+                           if getattr(snapshot, field.name) is not None}
+                snapshot = replace(entry[0], **changes)
+
+            self._entries[snapshot.symbol] = (snapshot, time.monotonic())
+            self._entries.move_to_end(snapshot.symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return snapshot
+
+    def get(self, symbol):
+        """Retorna o snapshot do símbolo se ainda estiver válido, ou None"""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                STORE_REQUESTS.inc(result='miss')
+                return None
+            if time.monotonic() - entry[1] > self.ttl:
+                del self._entries[symbol]
+                STORE_REQUESTS.inc(result='expired')
+                return None
+            self._entries.move_to_end(symbol)
+            STORE_REQUESTS.inc(result='hit')
+            return entry[0]
+
+    def peek(self, symbol):
+        """
+        Como get(), mas sem contar nas métricas nem alterar a ordem LRU
+
+        Para leituras em massa que não são consultas ao cache (ex: ordenar
+        a visão geral a cada ciclo).
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                return None
+            return entry[0]
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregation import CandleAggregator
+from kline_cache import MAX_KLINES_LIMIT, KlineCache
+
+MINUTE = 60_000
+HOUR = 60 * MINUTE
+
+
+def kline(open_time):
+    return [open_time, "1", "2", "0.5", "1.5", "10", open_time + MINUTE - 1, "15", 3, "5", "7", "0"]
+
+
+class StubStore:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def load_rows(self, symbol, interval, limit):
+        return self.rows[-limit:]
+
+    def write(self, symbol, interval, rows):
+        pass
+
+
+class StubClient:
+    """/klines de 1m a partir de startTime; os intervalos derivados não têm histórico"""
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+
+    def get(self, endpoint, params=None):
+        if params['interval'] != '1m':
+            return []
+        current = self.now_ms - self.now_ms % MINUTE
+        limit = min(params['limit'], MAX_KLINES_LIMIT)
+        if 'startTime' in params:
+            first = params['startTime'] + (-params['startTime']) % MINUTE
+        else:
+            first = current - (limit - 1) * MINUTE
+        last = min(current, first + (limit - 1) * MINUTE)
+        return [kline(t) for t in range(first, last + 1, MINUTE)]
+
+
+def test_intervals_are_derived_from_stored_history():
+    now_ms = int(time.time() * 1000)
+    start = now_ms - now_ms % HOUR - 24 * HOUR
+    current = now_ms - now_ms % MINUTE
+    store = StubStore([kline(t) for t in range(start, current, MINUTE)])
+    aggregator = CandleAggregator(KlineCache(max_length=20_000, store=store), '1m', ['1h'])
+
+    aggregator.fetch(StubClient(now_ms), 'BTCUSDT', 5)
+
+    # As 24 horas fechadas vêm do disco, sem passar por ingest()
+    hours = aggregator.rows('BTCUSDT', '1h')
+    assert hours[0][0] == start
+    assert len(hours) == 25
+    assert all(row[7] == 15 * 60 for row in hours[:-1])
+
+
+def test_incremental_aggregation_matches_groupby():
+    rng = np.random.default_rng(0)
+    start = 1_700_006_400_000 - 37 * MINUTE  # Começa no meio de um período de 1h
+    rows = []
+    for i in range(300):
+        o = 100 + rng.normal()
+        c = o + rng.normal()
+        rows.append([start + i * MINUTE, o, max(o, c) + rng.random(), min(o, c) - rng.random(), c,
+                     rng.random() * 10, start + (i + 1) * MINUTE - 1, rng.random() * 1000,
+                     int(rng.integers(1, 50)), rng.random(), rng.random(), '0'])
+
+    aggregator = CandleAggregator(KlineCache(max_length=1000), '1m', ['15m', '1h'])
+    # Candles chegando um a um, com o último ainda aberto sendo reenviado
+    for row in rows:
+        aggregator.ingest('BTCUSDT', [row])
+        aggregator.ingest('BTCUSDT', [row])
+
+    df = pd.DataFrame([row[:11] for row in rows],
+                      columns=['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+                               'quote', 'trades', 'taker_base', 'taker_quote'])
+    for interval, ms in (('15m', 15 * MINUTE), ('1h', HOUR)):
+        groups = df.groupby(df['open_time'] // ms * ms)
+        expected = groups.agg(open=('open', 'first'), high=('high', 'max'), low=('low', 'min'),
+                              close=('close', 'last'), volume=('volume', 'sum'), trades=('trades', 'sum'),
+                              count=('open', 'size'))
+        # O período incompleto do início não é montado
+        expected = expected[expected.index >= df['open_time'].iloc[0]]
+        expected = expected[(expected.index == expected.index[-1]) | (expected['count'] == ms // MINUTE)]
+
+        derived = aggregator.rows('BTCUSDT', interval)
+        assert [row[0] for row in derived] == expected.index.tolist()
+        for row, (_, candle) in zip(derived, expected.iterrows()):
+            assert row[1] == candle['open'] and row[4] == candle['close']
+            assert row[2] == candle['high'] and row[3] == candle['low']
+            assert row[5] == pytest.approx(candle['volume']) and row[8] == candle['trades']
+            assert row[6] == row[0] + ms - 1
@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binance_client import BinanceClient
+
+
+def fake_get(invalid=(), down=False):
+    """/ticker/24hr da Binance: um símbolo inválido faz o bloco inteiro falhar"""
+    def get(endpoint, params=None):
+        if down:
+            raise requests.exceptions.ConnectionError("sem conexão")
+        symbols = json.loads(params['symbols']) if 'symbols' in params else [params['symbol']]
+        if any(symbol in invalid for symbol in symbols):
+            raise requests.exceptions.HTTPError("400 Client Error: Invalid symbol.")
+        tickers = [{'symbol': symbol, 'lastPrice': '1.0'} for symbol in symbols]
+        return tickers if 'symbols' in params else tickers[0]
+    return get
+
+
+def test_failed_chunk_falls_back_to_single_symbols():
+    client = BinanceClient()
+    client.get = fake_get(invalid={'XXXUSDT'})
+    symbols = [f"S{i}USDT" for i in range(45)] + ['XXXUSDT']
+
+    tickers = client.get_tickers(symbols)
+
+    assert set(tickers) == set(symbols) - {'XXXUSDT'}
+    client.close()
+
+
+def test_error_is_raised_when_no_ticker_is_fetched():
+    client = BinanceClient()
+    client.get = fake_get(down=True)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get_tickers(['BTCUSDT', 'ETHUSDT'])
+    client.close()
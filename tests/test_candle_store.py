@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_store import DAY_MS, CandleStore
+
+MINUTE = 60_000
+DAY_START = 1_700_006_400_000  # 2023-11-15 00:00 UTC
+
+
+def kline(open_time, close=1.5):
+    return [open_time, "1", "2", "0.5", str(close), "10", open_time + MINUTE - 1, "15", 3, "5", "7", "0"]
+
+
+def test_write_and_load_round_trip(tmp_path):
+    store = CandleStore(root=str(tmp_path))
+    rows = [kline(DAY_START - 30 * MINUTE + i * MINUTE) for i in range(60)]  # Dois dias (UTC)
+
+    store.write('BTCUSDT', '1m', rows)
+    # Regravar um candle substitui a versão anterior
+    store.write('BTCUSDT', '1m', [kline(rows[-1][0], close=9.0)])
+
+    assert sorted(os.listdir(tmp_path / 'BTCUSDT' / '1m')) == ['2023-11-14.parquet', '2023-11-15.parquet']
+    df = store.load('BTCUSDT', '1m')
+    assert df['open_time'].tolist() == [row[0] for row in rows]
+    assert str(df['open_time'].dtype) == 'int64' and str(df['close'].dtype) == 'float64'
+    assert df['close'].iloc[-1] == 9.0
+
+    loaded = store.load_rows('BTCUSDT', '1m', 10)
+    assert [row[0] for row in loaded] == [row[0] for row in rows[-10:]]
+    assert loaded[0][1:6] == [1.0, 2.0, 0.5, 1.5, 10.0] and loaded[0][8] == 3
+    assert store.last_open_time('BTCUSDT', '1m') == rows[-1][0]
+    assert store.load('BTCUSDT', '1m', start='2023-11-15')['open_time'].min() == DAY_START
+
+
+def test_concurrent_writes_to_the_same_day_keep_every_row(tmp_path):
+    store = CandleStore(root=str(tmp_path))
+    threads = [threading.Thread(target=store.write,
+                                args=('BTCUSDT', '1m', [kline(DAY_START + (t * 10 + i) * MINUTE) for i in range(10)]))
+               for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    df = store.load('BTCUSDT', '1m')
+    assert len(df) == 80
+    assert df['open_time'].is_monotonic_increasing
+    # Nenhum arquivo temporário sobra no diretório do dia
+    assert os.listdir(tmp_path / 'BTCUSDT' / '1m') == ['2023-11-15.parquet']
+    assert df['open_time'].max() < DAY_START + DAY_MS
@@ -0,0 +1,102 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collector_daemon import CollectorDaemon, CollectorSubscriber, encode_message, parse_address
+
+MINUTE = 60_000
+
+
+class StubClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, endpoint, params=None):
+        self.calls += 1
+        now = int(time.time() * 1000)
+        current = now - now % MINUTE
+        return [[t, "1", "2", "0.5", "1.5", "10", t + MINUTE - 1, "15", 3, "5", "7", "0"]
+                for t in range(current - 2 * MINUTE, current + 1, MINUTE)]
+
+    def get_tickers(self, symbols):
+        return {symbol: {'symbol': symbol, 'lastPrice': '1.5'} for symbol in symbols}
+
+    def close(self):
+        pass
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_parse_address():
+    assert parse_address('127.0.0.1:8765') == (socket.AF_INET, ('127.0.0.1', 8765))
+    assert parse_address(':9000') == (socket.AF_INET, ('127.0.0.1', 9000))
+    assert parse_address('/tmp/collector.sock')[1] == '/tmp/collector.sock'
+
+
+def test_messages_are_json_lines_dispatched_to_callbacks():
+    received = []
+    subscriber = CollectorSubscriber(on_klines=lambda *args: received.append(('klines',) + args),
+                                     on_ticker=lambda *args: received.append(('ticker',) + args),
+                                     on_cycle=lambda *args: received.append(('cycle',) + args),
+                                     on_hello=lambda *args: received.append(('hello',) + args))
+    messages = [
+        {'type': 'hello', 'symbols': ['BTCUSDT'], 'interval': '1m'},
+        {'type': 'klines', 'symbol': 'BTCUSDT', 'rows': [[1, "2"]]},
+        {'type': 'ticker', 'symbol': 'BTCUSDT', 'ticker': {'lastPrice': '1'}},
+        {'type': 'cycle', 'time': '12:00', 'status': 'ok'},
+        {'type': 'desconhecido'},
+    ]
+    payload = b''.join(encode_message(message) for message in messages)
+    assert payload.count(b'\n') == len(messages)
+
+    for line in payload.splitlines():
+        subscriber.dispatch(json.loads(line))
+
+    assert received == [('hello', ['BTCUSDT'], '1m'), ('klines', 'BTCUSDT', [[1, "2"]]),
+                        ('ticker', 'BTCUSDT', {'lastPrice': '1'}), ('cycle', '12:00', 'ok')]
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="requer sockets Unix")
+def test_subscriber_receives_initial_state_and_updates(tmp_path):
+    address = str(tmp_path / 'collector.sock')
+    client = StubClient()
+    daemon = CollectorDaemon(['BTCUSDT', 'ETHUSDT'], interval='1m', address=address, client=client)
+    daemon.collect()
+
+    hello, klines, cycles = [], {}, []
+    lock = threading.Lock()
+
+    def on_klines(symbol, rows):
+        with lock:
+            klines.setdefault(symbol, []).append(rows)
+
+    subscriber = CollectorSubscriber(address, on_klines=on_klines,
+                                     on_hello=lambda symbols, interval: hello.append((symbols, interval)),
+                                     on_cycle=lambda time_text, status: cycles.append(status))
+    daemon.start()
+    try:
+        subscriber.start()
+        # Estado completo ao conectar: hello, candles em cache e um ciclo
+        assert wait_for(lambda: cycles)
+        assert hello == [(['BTCUSDT', 'ETHUSDT'], '1m')]
+        assert {symbol: len(batches[0]) for symbol, batches in klines.items()} == {'BTCUSDT': 3, 'ETHUSDT': 3}
+
+        # Cada novo ciclo é publicado para os assinantes já conectados
+        daemon.collect()
+        assert wait_for(lambda: len(cycles) == 2)
+        assert all(len(batches) == 2 for batches in klines.values())
+    finally:
+        subscriber.stop()
+        daemon.stop()
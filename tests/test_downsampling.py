@@ -0,0 +1,87 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downsampling import LOD_REQUESTS, LodCache, LodPyramid, lttb_indices, ohlc_aggregate
+
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    c = 100 + np.cumsum(rng.normal(size=n))
+    o = np.concatenate(([100.0], c[:-1]))
+    h = np.maximum(o, c) + rng.random(n)
+    lo = np.minimum(o, c) - rng.random(n)
+    return np.arange(n, dtype=float), o, h, lo, c
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[437] = 10  # Pico isolado
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    assert 437 in indices
+    # Poucos pontos: a série é devolvida inteira
+    assert np.array_equal(lttb_indices(x[:50], y[:50], 100), np.arange(50))
+
+
+def test_ohlc_aggregate_with_partial_last_group():
+    x, o, h, lo, c = series(5)
+
+    ax, ao, ah, al, ac = ohlc_aggregate(x, o, h, lo, c, 2)
+
+    assert ax.tolist() == [0, 2, 4]
+    assert ao.tolist() == [o[0], o[2], o[4]]
+    assert ah.tolist() == [max(h[0:2]), max(h[2:4]), h[4]]
+    assert al.tolist() == [min(lo[0:2]), min(lo[2:4]), lo[4]]
+    assert ac.tolist() == [c[1], c[3], c[4]]
+
+
+def test_pyramid_update_last_matches_a_rebuild():
+    x, o, h, lo, c = series(1001)
+    pyramid = LodPyramid(x, o, h, lo, c, min_points=64)
+    assert len(pyramid.levels[-1][0]) <= 64
+
+    h2, lo2, c2 = h.copy(), lo.copy(), c.copy()
+    h2[-1], lo2[-1], c2[-1] = h[-1] + 50, lo[-1] - 50, c[-1] + 1
+    pyramid.update_last(o[-1], h2[-1], lo2[-1], c2[-1])
+
+    rebuilt = LodPyramid(x, o, h2, lo2, c2, min_points=64)
+    for level, expected in zip(pyramid.levels, rebuilt.levels):
+        for values, expected_values in zip(level, expected):
+            np.testing.assert_array_equal(values, expected_values)
+
+
+def test_select_picks_the_finest_level_that_fits():
+    pyramid = LodPyramid(*series(4096), min_points=64)
+
+    x = pyramid.select(0, 4095, 600)[0]
+    assert len(x) <= 600
+    assert x[0] == 0 and x[-1] >= 4032
+
+    # Um trecho estreito usa o nível original, com um candle de margem
+    x = pyramid.select(100, 199, 600)[0]
+    assert x.tolist() == list(range(99, 201))
+
+
+def test_cache_is_keyed_by_symbol_and_interval():
+    cache = LodCache(max_entries=2, min_points=64)
+    minute, hour = series(500), series(200, seed=1)
+
+    first = cache.get(('BTCUSDT', '1m'), *minute)
+    cache.get(('BTCUSDT', '1h'), *hour)
+    # Mesmos candles: só o último é atualizado, sem reconstruir
+    assert cache.get(('BTCUSDT', '1m'), *minute) is first
+
+    cache.get(('ETHUSDT', '1m'), *minute)  # Descarta o menos usado ('BTCUSDT', '1h')
+    assert cache.get(('BTCUSDT', '1m'), *minute) is first
+    misses = LOD_REQUESTS.value(result='miss')
+    cache.get(('BTCUSDT', '1h'), *hour)
+    assert LOD_REQUESTS.value(result='miss') == misses + 1
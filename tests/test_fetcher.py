@@ -0,0 +1,61 @@
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+spec = importlib.util.spec_from_file_location('binance_api_data_fetcher',
+                                              os.path.join(ROOT, 'binance-api-data-fetcher.py'))
+fetcher_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetcher_module)
+
+MINUTE = 60_000
+
+
+def kline(open_time, minutes):
+    return [open_time, "1", "2", "0.5", "1.5", "10", open_time + minutes * MINUTE - 1,
+            "15", 3, "5", "7", "0"]
+
+
+class StubStore:
+    def __init__(self):
+        self.written = []
+
+    def load_rows(self, symbol, interval, limit):
+        return []
+
+    def write(self, symbol, interval, rows):
+        self.written.append((symbol, interval, len(rows)))
+
+
+def test_attach_adopts_the_collector_interval():
+    store = StubStore()
+    fetcher = fetcher_module.BinanceDataFetcher(symbols=['BTCUSDT'], store=store, intervals=['1m', '5m', '1h'])
+    assert fetcher.base_interval == '1m'
+
+    fetcher.on_collector_hello(['BTCUSDT'], '5m')
+    fetcher.on_collector_klines('BTCUSDT', [kline(i * 5 * MINUTE, 5) for i in range(24)])
+    fetcher.kline_cache.flush()
+
+    assert fetcher.base_interval == '5m'
+    assert fetcher.intervals == ['5m', '1h']
+    assert fetcher.interval == '5m'
+    assert '1m' in fetcher.notice
+    assert fetcher.kline_cache.rows('BTCUSDT', '1m') == []
+    assert len(fetcher.kline_cache.rows('BTCUSDT', '5m')) == 24
+    assert len(fetcher.kline_cache.rows('BTCUSDT', '1h')) == 2
+    assert {interval for _, interval, _ in store.written} == {'5m'}
+
+
+def test_candles_of_an_unknown_interval_are_ignored():
+    store = StubStore()
+    fetcher = fetcher_module.BinanceDataFetcher(symbols=['BTCUSDT'], store=store, intervals=['1m'])
+
+    fetcher.on_collector_hello(['BTCUSDT'], '7m')
+    fetcher.on_collector_klines('BTCUSDT', [kline(i * 7 * MINUTE, 7) for i in range(3)])
+    fetcher.kline_cache.flush()
+
+    assert fetcher.notice
+    assert fetcher.kline_cache.rows('BTCUSDT', '1m') == []
+    assert store.written == []
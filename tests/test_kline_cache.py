@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kline_cache import MAX_KLINES_LIMIT, KlineCache
+
+MINUTE = 60_000
+
+
+def kline(open_time):
+    return [open_time, "1", "2", "0.5", "1.5", "10", open_time + MINUTE - 1, "15", 3, "5", "7", "0"]
+
+
+class StubStore:
+    def __init__(self, rows):
+        self.rows = rows
+        self.written = {}
+
+    def load_rows(self, symbol, interval, limit):
+        return self.rows[-limit:]
+
+    def write(self, symbol, interval, rows):
+        for row in rows:
+            self.written[row[0]] = row
+
+
+class StubClient:
+    """Responde ao /klines como a Binance: no máximo `limit` candles a partir de startTime"""
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+        self.calls = 0
+
+    def get(self, endpoint, params=None):
+        self.calls += 1
+        current = self.now_ms - self.now_ms % MINUTE
+        limit = min(params['limit'], MAX_KLINES_LIMIT)
+        if 'startTime' in params:
+            first = params['startTime'] + (-params['startTime']) % MINUTE
+        else:
+            first = current - (limit - 1) * MINUTE
+        last = min(current, first + (limit - 1) * MINUTE)
+        return [kline(t) for t in range(first, last + 1, MINUTE)]
+
+
+def test_week_old_store_is_extended_by_paging():
+    now_ms = int(time.time() * 1000)
+    week_ago = now_ms - now_ms % MINUTE - 7 * 1440 * MINUTE
+    store = StubStore([kline(week_ago + i * MINUTE) for i in range(10)])
+    client = StubClient(now_ms)
+    cache = KlineCache(max_length=20_000, store=store)
+
+    cache.fetch(client, 'BTCUSDT', '1m', 5)
+    assert store.written == {}
+    cache.flush()
+
+    rows = cache.rows('BTCUSDT', '1m')
+    open_times = [row[0] for row in rows]
+    assert open_times[0] == week_ago
+    assert open_times[-1] == now_ms - now_ms % MINUTE
+    assert all(b - a == MINUTE for a, b in zip(open_times, open_times[1:]))
+    assert client.calls == len(rows) // MAX_KLINES_LIMIT + 1
+
+    # Os candles fechados recebidos são gravados; os já gravados e o candle aberto não
+    assert min(store.written) == week_ago + 10 * MINUTE
+    assert max(store.written) == open_times[-2]
+    assert len(store.written) == len(rows) - 10 - 1
+
+
+def test_stale_cache_without_store_is_reloaded():
+    now_ms = int(time.time() * 1000)
+    cache = KlineCache(max_length=500)
+    cache.update('BTCUSDT', '1m', [kline(now_ms - now_ms % MINUTE - 2000 * MINUTE)])
+    client = StubClient(now_ms)
+
+    cache.fetch(client, 'BTCUSDT', '1m', 5)
+
+    assert client.calls == 1
+    assert len(cache.rows('BTCUSDT', '1m')) == 5
@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binance_client import KLINE_COLUMNS, klines_to_dataframe
+from kline_parser import KLINE_DTYPES, klines_to_columns
+
+START = 1_700_000_000_000
+PAGE = [
+    [START + i * 60_000, f"{100 + i * 0.01:.8f}", f"{101 + i * 0.01:.8f}", f"{99 + i * 0.01:.8f}",
+     f"{100.5 + i * 0.01:.8f}", "12.34500000", START + (i + 1) * 60_000 - 1, "1234.56780000",
+     321 + i, "6.17250000", "617.28390000", "0"]
+    for i in range(50)
+]
+
+
+def test_columns_match_the_generic_dataframe_path():
+    columns = klines_to_columns(PAGE)
+
+    assert list(columns) == list(KLINE_DTYPES)
+    for name, dtype in KLINE_DTYPES.items():
+        assert columns[name].dtype == dtype
+
+    legacy = pd.DataFrame(PAGE, columns=KLINE_COLUMNS)
+    for name, dtype in KLINE_DTYPES.items():
+        np.testing.assert_array_equal(columns[name], pd.to_numeric(legacy[name]).to_numpy(dtype=dtype))
+
+
+def test_raw_json_body_and_empty_page():
+    columns = klines_to_columns(json.dumps(PAGE).encode())
+    assert columns['open_time'][-1] == PAGE[-1][0]
+    assert columns['number_of_trades'][-1] == 370
+
+    empty = klines_to_columns("[]")
+    assert all(len(values) == 0 and values.dtype == KLINE_DTYPES[name] for name, values in empty.items())
+
+
+def test_dataframe_has_datetime_timestamps():
+    df = klines_to_dataframe(PAGE)
+
+    assert pd.api.types.is_datetime64_any_dtype(df['open_time'])
+    assert df['open_time'].iloc[0] == pd.Timestamp(START, unit='ms')
+    assert df['close'].iloc[-1] == float(PAGE[-1][4])
+    assert 'ignore' not in df.columns
+    assert klines_to_dataframe([]).empty
@@ -0,0 +1,69 @@
+import os
+import sys
+from urllib.request import urlopen
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsRegistry, format_summary, start_http_server
+
+
+def test_summary_lists_endpoints_and_hit_rates():
+    registry = MetricsRegistry()
+    latency = registry.histogram('binance_request_duration_seconds', 'Latência', ('endpoint',))
+    received = registry.counter('binance_response_bytes_total', 'Bytes', ('endpoint',))
+    retries = registry.counter('binance_request_retries_total', 'Repetições', ('endpoint',))
+    for _ in range(19):
+        latency.observe(0.02, endpoint='/klines')
+    latency.observe(3.0, endpoint='/klines')
+    received.inc(2048, endpoint='/klines')
+    retries.inc(endpoint='/klines')
+    registry.gauge('binance_used_weight', 'Peso').set(42)
+    cache = registry.counter('kline_cache_requests_total', 'Cache', ('result',))
+    cache.inc(3, result='hit')
+    cache.inc(result='miss')
+
+    lines = format_summary(registry)
+
+    assert len(lines) == 2
+    assert lines[0].startswith('/klines')
+    assert '20 req' in lines[0] and '2.0 KB' in lines[0] and '1 repetições' in lines[0]
+    assert 'média   169.0 ms' in lines[0]
+    assert lines[1] == 'peso usado 42 | cache de candles 75% acertos'
+
+
+def test_empty_registry_has_no_summary():
+    assert format_summary(MetricsRegistry()) == []
+
+
+def test_histogram_quantile_and_exposition_format():
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latência', ('endpoint',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        latency.observe(value, endpoint='/a"b')
+
+    assert latency.quantile(0.5, endpoint='/a"b') == pytest.approx(0.1)
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{endpoint="/a\\"b",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="/a\\"b",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{endpoint="/a\\"b"} 4' in text
+
+    # O mesmo nome devolve a mesma métrica; outro tipo é um erro
+    assert registry.histogram('latency_seconds', 'Latência', ('endpoint',)) is latency
+    with pytest.raises(ValueError):
+        registry.counter('latency_seconds', 'Latência')
+
+
+def test_http_server_exposes_the_registry():
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'Requisições').inc(5)
+    server = start_http_server(port=0, registry=registry)
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as response:
+            body = response.read().decode()
+        assert 'requests_total 5' in body
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_book import OrderBookManager
+
+
+class StubClient:
+    def __init__(self, last_update_id):
+        self.last_update_id = last_update_id
+        self.calls = 0
+
+    def get(self, endpoint, params=None):
+        self.calls += 1
+        return {
+            'lastUpdateId': self.last_update_id,
+            'bids': [["99.0", "1.0"], ["98.0", "2.0"]],
+            'asks': [["101.0", "1.0"], ["102.0", "2.0"]],
+        }
+
+
+def event(first_id, final_id, bids=(), asks=()):
+    return {'U': first_id, 'u': final_id, 'b': [list(level) for level in bids],
+            'a': [list(level) for level in asks]}
+
+
+def wait_pending(manager, timeout=5):
+    deadline = time.monotonic() + timeout
+    while manager._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_snapshot_newer_than_buffer_syncs_on_overlapping_event():
+    client = StubClient(1000)
+    manager = OrderBookManager(client, ['BTCUSDT'])
+    try:
+        manager._sync('BTCUSDT')
+        book = manager.get('BTCUSDT')
+        assert not book.synced
+        assert book.last_update_id == 1000
+
+        # O primeiro evento cobre lastUpdateId + 1 e deve ser aplicado, sem novo snapshot
+        manager.on_depth('BTCUSDT', event(991, 1010, bids=[("99.5", "3.0")]))
+        manager.on_depth('BTCUSDT', event(1011, 1040, asks=[("101.0", "0")]))
+        wait_pending(manager)
+
+        assert client.calls == 1
+        assert book.synced
+        assert book.last_update_id == 1040
+        assert book.updates == 2
+        assert book.best_bid() == (99.5, 3.0)
+        assert book.best_ask() == (102.0, 2.0)
+    finally:
+        manager.close()
+
+
+def test_stale_events_after_snapshot_are_dropped():
+    client = StubClient(1000)
+    manager = OrderBookManager(client, ['BTCUSDT'])
+    try:
+        manager._sync('BTCUSDT')
+        manager.on_depth('BTCUSDT', event(980, 990))
+        wait_pending(manager)
+
+        book = manager.get('BTCUSDT')
+        assert client.calls == 1
+        assert book.last_update_id == 1000
+        assert book.updates == 0
+    finally:
+        manager.close()
+
+
+def test_gap_requests_new_snapshot():
+    client = StubClient(1000)
+    manager = OrderBookManager(client, ['BTCUSDT'])
+    try:
+        manager._sync('BTCUSDT')
+        manager.on_depth('BTCUSDT', event(1001, 1010))
+        assert manager.get('BTCUSDT').synced
+
+        # Lacuna (1011..1019 perdidos): o livro é descartado e um snapshot é pedido
+        client.last_update_id = 1030
+        manager.on_depth('BTCUSDT', event(1020, 1030))
+        wait_pending(manager)
+        manager.on_depth('BTCUSDT', event(1031, 1035))
+
+        book = manager.get('BTCUSDT')
+        assert client.calls == 2
+        assert book.synced
+        assert book.last_update_id == 1035
+    finally:
+        manager.close()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import RequestScheduler, parse_retry_after, request_weight
+
+
+@pytest.mark.parametrize('endpoint, params, weight', [
+    ('/klines', {'symbol': 'BTCUSDT', 'limit': 1000}, 2),
+    ('/ticker/24hr', {'symbol': 'BTCUSDT'}, 2),
+    ('/ticker/24hr', {'symbols': '["A","B"]'}, 2),
+    ('/ticker/24hr', {'symbols': '[' + ','.join(['"A"'] * 21) + ']'}, 40),
+    ('/ticker/24hr', {'symbols': '[' + ','.join(['"A"'] * 101) + ']'}, 80),
+    ('/ticker/24hr', None, 80),
+    ('/depth', {'symbol': 'BTCUSDT'}, 5),
+    ('/depth', {'symbol': 'BTCUSDT', 'limit': 500}, 25),
+    ('/depth', {'symbol': 'BTCUSDT', 'limit': 1000}, 50),
+    ('/depth', {'symbol': 'BTCUSDT', 'limit': 5000}, 250),
+    ('/ping', None, 1),
+])
+def test_request_weight(endpoint, params, weight):
+    assert request_weight(endpoint, params) == weight
+
+
+def test_acquire_waits_for_the_bucket_to_refill():
+    # 100 de peso por segundo: 20 além do saldo inicial custam ~0,2 s
+    scheduler = RequestScheduler(weight_limit=100, window=1, safety_margin=1.0)
+    started = time.monotonic()
+    scheduler.acquire(100)
+    assert time.monotonic() - started < 0.05
+
+    scheduler.acquire(20)
+    assert 0.15 <= time.monotonic() - started < 1.0
+
+
+def test_used_weight_header_reduces_the_local_balance():
+    scheduler = RequestScheduler(weight_limit=1000, window=60, safety_margin=1.0)
+    scheduler.update_from_headers({'X-MBX-USED-WEIGHT-1m': '900'})
+
+    assert scheduler.used_weight == 900
+    assert scheduler.tokens == pytest.approx(100, abs=1)
+
+    # Um valor menor não devolve saldo já consumido localmente
+    scheduler.tokens = 50
+    scheduler.update_from_headers({'X-MBX-USED-WEIGHT-1M': '10'})
+    assert scheduler.used_weight == 10
+    assert scheduler.tokens == pytest.approx(50, abs=1)
+
+    scheduler.update_from_headers({})
+    assert scheduler.used_weight == 10
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('amanhã') is None
+    assert parse_retry_after('inf') is None
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(later, usegmt=True)) <= 31
+    past = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_backoff_with_an_invalid_header_uses_exponential_delay():
+    scheduler = RequestScheduler(backoff_base=0.01, max_backoff=1)
+
+    delay = scheduler.backoff(2, 'Wed, 99 Foo 2024 nonsense')
+
+    assert 0.04 <= delay <= 0.05
+    assert scheduler.throttled == 1
+    assert scheduler.tokens == 0
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshots import STORE_REQUESTS, SnapshotStore, SymbolSnapshot, build_snapshot, passes_thresholds
+
+
+def test_peek_does_not_count_requests():
+    store = SnapshotStore()
+    store.put(SymbolSnapshot('BTCUSDT', change=1.0))
+    hits = STORE_REQUESTS.value(result='hit')
+    misses = STORE_REQUESTS.value(result='miss')
+
+    assert store.peek('BTCUSDT').change == 1.0
+    assert store.peek('ETHUSDT') is None
+    assert STORE_REQUESTS.value(result='hit') == hits
+    assert STORE_REQUESTS.value(result='miss') == misses
+
+    assert store.get('BTCUSDT') is not None
+    assert STORE_REQUESTS.value(result='hit') == hits + 1
+
+
+def test_thresholds_filter_by_absolute_change_and_quote_volume():
+    ticker = {'lastPrice': '100', 'priceChangePercent': '-3.5', 'volume': '10',
+              'quoteVolume': '1000', 'highPrice': '110', 'lowPrice': '90'}
+    snapshot = build_snapshot('BTCUSDT', ticker_data=ticker)
+
+    assert snapshot.quote_volume == 1000.0
+    assert passes_thresholds(snapshot)
+    assert passes_thresholds(snapshot, min_change=3)
+    assert not passes_thresholds(snapshot, min_change=4)
+    assert passes_thresholds(snapshot, min_volume=1000)
+    assert not passes_thresholds(snapshot, min_change=3, min_volume=1001)
+
+    # Sem dados: só aparece quando nenhum limite é informado
+    assert passes_thresholds(None)
+    assert not passes_thresholds(None, min_volume=0)
@@ -0,0 +1,50 @@
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binance_client import klines_to_dataframe
+from snapshots import format_candles
+from widget_diff import WidgetDiffer
+
+
+class FakeTree:
+    """Imita o subconjunto do ttk.Treeview usado pelo WidgetDiffer"""
+
+    def __init__(self):
+        self.items = []
+        self.values = {}
+        self._ids = itertools.count()
+
+    def insert(self, parent, index, values=()):
+        item = f"I{next(self._ids)}"
+        self.items.insert(len(self.items) if index == "end" else index, item)
+        self.values[item] = tuple(values)
+        return item
+
+    def item(self, item, values=()):
+        self.values[item] = tuple(values)
+
+    def delete(self, item):
+        self.items.remove(item)
+        del self.values[item]
+
+
+def daily_rows(first_day, count):
+    day = 86_400_000
+    return [[(first_day + i) * day, "1", "2", "0.5", "1.5", "10", (first_day + i + 1) * day - 1,
+             "15", 3, "5", "7", "0"] for i in range(count)]
+
+
+def test_daily_candles_keep_table_size():
+    differ = WidgetDiffer()
+    tree = FakeTree()
+    for cycle in range(4):
+        candles = format_candles(klines_to_dataframe(daily_rows(20000 + cycle, 10)))
+        differ.set_rows(tree, candles)
+        assert len(tree.items) == 5
+
+    # Do mais recente ao mais antigo, com a data (e não 00:00:00) na primeira coluna
+    assert [tree.values[item][0] for item in tree.items] == [
+        '2024-10-16', '2024-10-15', '2024-10-14', '2024-10-13', '2024-10-12']
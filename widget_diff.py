@@ -0,0 +1,88 @@
+class WidgetDiffer:
+    def __init__(self):
+        """
+        Camada de atualização por diferença para widgets do Tk
+
+        Guarda o último texto/cor aplicado a cada Label e as linhas de cada
+        Treeview, e só chama config/item/insert/delete quando algo mudou.
+        """
+        self._labels = {}
+        self._trees = {}
+
+    def set_label(self, widget, text, fg=None):
+        """Atualiza o texto (e a cor, se informada) de um Label apenas se mudou"""
+        last = self._labels.get(widget)
+        if last is not None and last[0] == text and (fg is None or last[1] == fg):
+            return False
+
+        if fg is None:
+            widget.config(text=text)
+            fg = last[1] if last is not None else None
+        else:
+            widget.config(text=text, fg=fg)
+        self._labels[widget] = (text, fg)
+        return True
+
+    def set_rows(self, tree, rows):
+        """
+        Sincroniza um Treeview com `rows` (do mais recente ao mais antigo)
+
+        Cada linha é um par (chave, valores); a chave (ex: open_time em ms)
+        identifica a linha. Linhas novas são inseridas no topo, as que mudaram
+        são atualizadas no lugar e as mais antigas que saíram da janela são
+        removidas.
+        """
+        rows = list(rows)
+        current = self._trees.get(tree, [])
+
+        # Sem linha em comum com o estado atual: recriar a tabela
+        if not {key for key, _, _ in current} & {key for key, _ in rows}:
+            for _, item, _ in current:
+                tree.delete(item)
+            self._trees[tree] = [(key, tree.insert("", "end", values=row), row) for key, row in rows]
+            return
+
+        by_key = {key: (item, values) for key, item, values in current}
+        state = []
+        for index, (key, row) in enumerate(rows):
+            entry = by_key.pop(key, None)
+            if entry is None:
+                item = tree.insert("", index, values=row)
+            else:
+                item, values = entry
+                if values != row:
+                    tree.item(item, values=row)
+            state.append((key, item, row))
+
+        # Candles que saíram da janela
+        for item, _ in by_key.values():
+            tree.delete(item)
+        self._trees[tree] = state
+
+    def set_slots(self, tree, rows):
+        """
+        Sincroniza um Treeview de linhas em posições fixas (ex: níveis de preço)
+
+        A linha i da tabela sempre mostra rows[i]; apenas as linhas cujo
+        conteúdo mudou são reconfiguradas e as sobras são removidas do fim.
+        """
+        rows = list(rows)
+        slots = self._trees.get(tree, [])
+
+        for index, row in enumerate(rows):
+            if index < len(slots):
+                _, item, values = slots[index]
+                if values != row:
+                    tree.item(item, values=row)
+                    slots[index] = (index, item, row)
+            else:
+                slots.append((index, tree.insert("", "end", values=row), row))
+
+        for _, item, _ in slots[len(rows):]:
+            tree.delete(item)
+        self._trees[tree] = slots[:len(rows)]
+
+    def forget(self, widget):
+        """Descarta o estado guardado de um widget (ex: ao destruí-lo)"""
+        self._labels.pop(widget, None)
+        self._trees.pop(widget, None)